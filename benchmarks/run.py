@@ -0,0 +1,366 @@
+import argparse
+import importlib
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Генератор данных и схема берутся из текущего дерева, а замеряемые классы -
+# из текущего дерева или из каталога --code (например, исходной версии)
+from database import synthetic_data
+from database.migrations import MIGRATIONS
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Шаги миграций, которые создают таблицы в том виде, в каком они были до перехода на миграции
+LEGACY_SCHEMA_VERSION = 2
+
+
+# Размеры синтетической базы: партнеры, продукция, продажи
+SCALES = {
+    'small': (100, 1000, 10000),
+    'medium': (1000, 50000, 500000),
+    'large': (1000, 50000, 5000000),
+}
+
+DEFAULT_REPEAT = 5
+
+# Методы, которые не выполняют рабочих запросов и не измеряются
+SKIPPED_METHODS = {
+    'DatabaseManager': {'get_connection', 'create_test_table', 'get_data_version',
+                        # Исправления схемы в исходной версии, теперь их выполняют миграции
+                        'add_partner_id_to_products_table', 'fix_partner_table_structure'},
+    'AuthManager': {'get_connection'},
+}
+
+
+def _same(*args):
+    """Вызов с одинаковыми аргументами на каждом повторе"""
+    return lambda number: args
+
+
+def _database_calls(partners, products, sales):
+    """
+    Вызовы всех публичных методов DatabaseManager: (имя, аргументы(номер повтора)).
+    Методы, добавляющие записи, получают на каждом повторе новый ключ,
+    а удаляющие - удаляют именно эти записи.
+    """
+    inn = synthetic_data.partner_inn(1)
+    article = synthetic_data.product_article(1)
+
+    def new_inn(number):
+        return synthetic_data.partner_inn(partners + 1 + number)
+
+    def new_article(number, suffix=''):
+        return synthetic_data.product_article(products + 1 + number) + suffix
+
+    def partner_data(number):
+        return {
+            'PartnerType': 'ООО',
+            'PartnerName': f'Замер {number}',
+            'Director': 'Директор',
+            'Phone': '900 000 00 00',
+            'Email': 'bench@example.ru',
+            'LegalAddress': 'Адрес',
+            'INN': new_inn(number),
+            'Rating': 5,
+        }
+
+    def product_data(number, suffix=''):
+        return {
+            'ProductName': f'Ламинат замер {number}',
+            'ProductTypeID': '1',
+            'ArticleNumber': new_article(number, suffix),
+            'MinPartnerPrice': 1234.5,
+        }
+
+    lines = [(1 + i % 4, 1 + i % 5, 1 + i % 100, 2.5, 1.2) for i in range(10000)]
+
+    # Сначала чтение, затем изменение данных, удаление - в самом конце
+    return [
+        ('is_inn_exists', _same(inn)),
+        ('get_all_partners', _same()),
+        ('get_partners_with_discounts', _same()),
+        ('get_discount_tiers', _same()),
+        ('get_partner_by_inn', _same(inn)),
+        ('get_partner_name_by_inn', _same(inn)),
+        ('get_partner_name_by_id', _same(2)),
+        ('get_partner_id_by_inn', _same(inn)),
+        ('get_partner_products', _same(inn, 'Дуб')),
+        ('get_partner_products_by_inn', _same(inn, 'Дуб')),
+        ('get_partner_products_by_partner_id', _same(inn, 'Дуб')),
+        ('get_product_by_article', _same(article)),
+        ('get_partner_sales_history', _same(inn)),
+        ('get_sales_statistics', _same(inn)),
+        ('get_sales_history_snapshot', _same(inn, '', None, None, None, 200)),
+        ('get_partner_sales_page', _same(inn, '', None, 200)),
+        ('iter_sales_export', _same(inn)),
+        ('iter_partner_report', _same()),
+        ('calculate_material', _same(1, 2, 100, 2.5, 1.2)),
+        ('calculate_materials_batch', _same(lines)),
+        ('get_partner_products_for_sale', _same(inn)),
+        ('get_sale_by_id', _same(1)),
+        ('add_partner', lambda number: (partner_data(number),)),
+        ('update_partner', lambda number: (new_inn(0), partner_data(0))),
+        ('add_product', lambda number: (product_data(number, 'a'),)),
+        ('add_product_with_partner_id', lambda number: (product_data(number), new_inn(0))),
+        ('update_product', lambda number: (new_article(0), product_data(0))),
+        ('update_products_with_null_partner_id', _same(new_inn(0))),
+        ('add_sale', _same({'ProductID': 1, 'PartnerID': 1, 'Quantity': 10})),
+        ('update_sale', _same({'SaleID': 1, 'ProductID': 2, 'PartnerID': 1, 'Quantity': 20})),
+        ('delete_sale', lambda number: (sales - number,)),
+        ('delete_product', lambda number: (new_article(number, 'a'),)),
+        ('delete_partner', lambda number: (new_inn(number),)),
+    ]
+
+
+def _auth_calls():
+    """Вызовы всех публичных методов AuthManager"""
+    return [
+        ('hash_password', _same('admin123')),
+        ('init_users_table', _same()),
+        ('create_default_users', _same()),
+        ('authenticate_user', _same('admin', 'admin123', 'admin')),
+        ('user_exists', _same('admin')),
+        ('get_user_info', _same('admin')),
+        ('get_all_users', _same()),
+        ('register_user', lambda number: (f'bench{number}', 'password0', 'user')),
+        ('change_password', lambda number: ('bench0', f'password{number}', f'password{number + 1}')),
+        ('deactivate_user', _same('bench0')),
+        ('activate_user', _same('bench0')),
+    ]
+
+
+def load_code(code=None):
+    """
+    Возвращает модули database.db_manager и database.auth_manager текущего дерева
+    или каталога code (исходная версия: git archive 4a09a41 | tar -x -C каталог).
+    """
+    if code:
+        # Пакет database загружается заново и только из code: модули, которых
+        # в той версии нет, не должны подхватываться из текущего дерева
+        for name in [name for name in sys.modules if name == 'database' or name.startswith('database.')]:
+            del sys.modules[name]
+        sys.path[:] = [os.path.abspath(code)] + [
+            path for path in sys.path if os.path.abspath(path or '.') != ROOT]
+    return importlib.import_module('database.db_manager'), importlib.import_module('database.auth_manager')
+
+
+def _optional(module_name, attribute):
+    """Функция замеряемой версии или None, если в этой версии ее еще нет"""
+    try:
+        return getattr(importlib.import_module(module_name), attribute)
+    except (ImportError, AttributeError):
+        return None
+
+
+def _check_coverage(cls, calls):
+    methods = {
+        name for name, _ in inspect.getmembers(cls, inspect.isfunction)
+        if not name.startswith('_')
+    } - SKIPPED_METHODS[cls.__name__]
+    uncovered = methods - {name for name, _ in calls}
+    if uncovered:
+        raise RuntimeError(f"Нет замеров для методов {cls.__name__}: {', '.join(sorted(uncovered))}")
+
+
+def _reset_caches(manager):
+    """Холодный старт: новые соединения (пустой кэш страниц SQLite) и пустые кэши приложения"""
+    connection_manager = getattr(manager, 'connection_manager', None)
+    if connection_manager is not None:
+        connection_manager.close_all()
+    partner_cache = getattr(manager, 'partner_cache', None)
+    if partner_cache is not None:
+        partner_cache.invalidate()
+    invalidate_material_calculator = _optional('database.materials', 'invalidate_material_calculator')
+    if invalidate_material_calculator is not None:
+        invalidate_material_calculator()
+
+
+def _call(method, args):
+    started = time.perf_counter()
+    result = method(*args)
+    if inspect.isgenerator(result):
+        result = list(result)
+    seconds = time.perf_counter() - started
+    return seconds, len(result) if isinstance(result, list) else None
+
+
+def _measure(manager, calls, repeat, missing):
+    """Замеры методов; методы, которых нет в замеряемой версии, добавляются в missing"""
+    results = {}
+    for name, arguments in calls:
+        method = getattr(manager, name, None)
+        if method is None:
+            missing.append(f"{type(manager).__name__}.{name}")
+            continue
+
+        _reset_caches(manager)
+        cold, rows = _call(method, arguments(0))
+        warm = [_call(method, arguments(number))[0] for number in range(1, repeat + 1)]
+
+        results[f"{type(manager).__name__}.{name}"] = {
+            'cold_ms': round(cold * 1000, 3),
+            'warm_ms': {
+                'min': round(min(warm) * 1000, 3),
+                'median': round(statistics.median(warm) * 1000, 3),
+                'mean': round(statistics.mean(warm) * 1000, 3),
+            } if warm else None,
+            'rows': rows,
+        }
+    return results
+
+
+def build_database(path, partners, products, sales, seed=42):
+    """
+    Создает базу с синтетическими данными в формате до миграций (user_version 0):
+    ее читает исходная версия, а текущая при открытии обновляет, как базу пользователя.
+    Возвращает время генерации в секундах.
+    """
+    started = time.perf_counter()
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.cursor()
+        for version, description, step in MIGRATIONS:
+            if version > LEGACY_SCHEMA_VERSION:
+                break
+            step(cursor)
+        conn.commit()
+        synthetic_data.generate(conn, partners=partners, products=products, sales=sales, seed=seed,
+                                legacy=True)
+    finally:
+        conn.close()
+    return time.perf_counter() - started
+
+
+def run_benchmarks(partners, products, sales, repeat=DEFAULT_REPEAT, seed=42, template=None, code=None):
+    """
+    Замеряет все публичные методы DatabaseManager и AuthManager на синтетической базе.
+    template - готовая база того же размера: копируется вместо повторной генерации.
+    code - каталог другой версии приложения, классы которой замеряются вместо текущих.
+    Возвращает словарь для сохранения в JSON.
+    """
+    db_module, auth_module = load_code(code)
+    DatabaseManager = db_module.DatabaseManager
+    AuthManager = auth_module.AuthManager
+    database_calls = _database_calls(partners, products, sales)
+    auth_calls = _auth_calls()
+    _check_coverage(DatabaseManager, database_calls)
+    _check_coverage(AuthManager, auth_calls)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'benchmark.db')
+        if template:
+            if not os.path.exists(template):
+                build_database(template, partners, products, sales, seed)
+            shutil.copyfile(template, db_path)
+            generate_seconds = None
+        else:
+            generate_seconds = build_database(db_path, partners, products, sales, seed)
+
+        # Текущая версия при открытии приводит схему к актуальной (миграции)
+        started = time.perf_counter()
+        db_manager = DatabaseManager(db_path)
+        open_seconds = time.perf_counter() - started
+        auth_manager = AuthManager(db_path)
+        missing = []
+        try:
+            methods = _measure(db_manager, database_calls, repeat, missing)
+            methods.update(_measure(auth_manager, auth_calls, repeat, missing))
+        finally:
+            _reset_caches(db_manager)
+
+    get_instrumentation = _optional('database.instrumentation', 'get_instrumentation')
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'partners': partners,
+            'products': products,
+            'sales': sales,
+            'seed': seed,
+            'repeat': repeat,
+            'code': os.path.abspath(code) if code else 'рабочее дерево',
+            'generate_seconds': round(generate_seconds, 2) if generate_seconds is not None else None,
+            'open_seconds': round(open_seconds, 2),
+            'missing_methods': missing,
+            'instrumentation': get_instrumentation().enabled if get_instrumentation else None,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+        },
+        'methods': methods,
+    }
+
+
+def compare(result, baseline):
+    """Строки сравнения медианы теплых вызовов с базовым замером"""
+    lines = [f"{'Метод':<55} {'было мс':>10} {'стало мс':>10} {'изменение':>10}"]
+    for name, current in sorted(result['methods'].items()):
+        previous = baseline['methods'].get(name)
+        if not previous or not previous['warm_ms'] or not current['warm_ms']:
+            lines.append(f"{name:<55} {'-':>10} {current['warm_ms']['median'] if current['warm_ms'] else '-':>10}")
+            continue
+        before = previous['warm_ms']['median']
+        after = current['warm_ms']['median']
+        change = f"{after / before:.2f}x" if before else '-'
+        lines.append(f"{name:<55} {before:>10.3f} {after:>10.3f} {change:>10}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Замер времени всех методов DatabaseManager и AuthManager на синтетических данных")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help="размер базы")
+    parser.add_argument('--partners', type=int, help="число партнеров (вместо --scale)")
+    parser.add_argument('--products', type=int, help="число продуктов (вместо --scale)")
+    parser.add_argument('--sales', type=int, help="число продаж (вместо --scale)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="число теплых повторов")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--template', help="файл готовой базы: создается при первом запуске, "
+                                           "затем копируется (для больших размеров)")
+    parser.add_argument('--output', help="файл JSON с результатами")
+    parser.add_argument('--compare', help="файл JSON предыдущего замера для сравнения, "
+                                          "например benchmarks/baseline/small.json")
+    parser.add_argument('--code', help="каталог другой версии приложения (для базового замера)")
+    parser.add_argument('--label', help="метка замера в JSON, например коммит замеряемой версии")
+    args = parser.parse_args(argv)
+
+    partners, products, sales = SCALES[args.scale]
+    partners = args.partners or partners
+    products = args.products or products
+    sales = args.sales or sales
+
+    result = run_benchmarks(partners, products, sales, args.repeat, args.seed, args.template, args.code)
+    result['meta']['scale'] = args.scale if not (args.partners or args.products or args.sales) else 'custom'
+    result['meta']['label'] = args.label
+
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"{result['meta']['scale']}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(result, file, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        print('\n'.join(compare(result, baseline)))
+    else:
+        for name, timings in sorted(result['methods'].items()):
+            warm = timings['warm_ms']['median'] if timings['warm_ms'] else 0
+            print(f"{name:<55} холодный {timings['cold_ms']:>10.3f} мс   теплый {warm:>10.3f} мс")
+    print(f"Результаты: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.run --compare benchmarks/baseline/small.json
+    sys.exit(main())
@@ -1,10 +1,19 @@
-import sqlite3
-import hashlib
 import os
+from database import passwords
+from database.connection import get_connection_manager
+from database.instrumentation import instrumented
+from database.logger import get_logger
 
 
+logger = get_logger(__name__)
+
+# Ключ настройки с числом итераций PBKDF2, подобранным при создании базы
+PASSWORD_COST_KEY = 'pbkdf2_iterations'
+
+
+@instrumented
 class AuthManager:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, create_defaults=True):
         if db_path is None:
             # Если путь не передан, используем стандартный путь
             self.db_path = "database/masterpol.db"
@@ -16,16 +25,48 @@ class AuthManager:
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
 
+        self.connection_manager = get_connection_manager(self.db_path)
+
         self.init_users_table()
-        self.create_default_users()
+        self.iterations = self._load_password_cost()
+        if create_defaults:
+            self.create_default_users()
 
     def get_connection(self):
-        """Получает соединение с базой данных"""
-        return sqlite3.connect(self.db_path)
+        """Получает долгоживущее соединение текущего потока"""
+        return self.connection_manager.get_connection()
 
     def hash_password(self, password):
-        """Хеширует пароль с использованием SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Хеширует пароль PBKDF2-SHA256 с солью и подобранным числом итераций"""
+        return passwords.hash_password(password, self.iterations)
+
+    def _load_password_cost(self):
+        """Читает число итераций PBKDF2; при первом запуске подбирает его и сохраняет"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT Value FROM AuthSettings WHERE Key = ?", (PASSWORD_COST_KEY,))
+            row = cursor.fetchone()
+            if row:
+                return int(row[0])
+
+            iterations = passwords.calibrate_iterations()
+            with conn:
+                cursor.execute("INSERT OR IGNORE INTO AuthSettings (Key, Value) VALUES (?, ?)",
+                               (PASSWORD_COST_KEY, str(iterations)))
+            logger.info("Число итераций PBKDF2: %d (около %d мс на проверку пароля)",
+                        iterations, passwords.TARGET_MS)
+            return iterations
+
+        except Exception as e:
+            logger.exception("Ошибка чтения стоимости хеширования паролей")
+            return passwords.MIN_ITERATIONS
+
+    def _update_password_hash(self, cursor, user_id, password):
+        with cursor.connection:
+            cursor.execute("UPDATE Users SET Password = ? WHERE UserID = ?",
+                           (self.hash_password(password), user_id))
 
     def init_users_table(self):
         """Создает таблицу пользователей, если она не существует"""
@@ -33,26 +74,31 @@ class AuthManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS Users (
-                    UserID INTEGER PRIMARY KEY AUTOINCREMENT,
-                    Username TEXT UNIQUE NOT NULL,
-                    Password TEXT NOT NULL,
-                    UserType TEXT NOT NULL CHECK (UserType IN ('admin', 'user')),
-                    FullName TEXT,
-                    Email TEXT,
-                    CreatedDate TEXT DEFAULT CURRENT_TIMESTAMP,
-                    IsActive INTEGER DEFAULT 1
-                )
-            ''')
+            with conn:
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS Users (
+                        UserID INTEGER PRIMARY KEY AUTOINCREMENT,
+                        Username TEXT UNIQUE NOT NULL,
+                        Password TEXT NOT NULL,
+                        UserType TEXT NOT NULL CHECK (UserType IN ('admin', 'user')),
+                        FullName TEXT,
+                        Email TEXT,
+                        CreatedDate TEXT DEFAULT CURRENT_TIMESTAMP,
+                        IsActive INTEGER DEFAULT 1
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS AuthSettings (
+                        Key TEXT PRIMARY KEY,
+                        Value TEXT NOT NULL
+                    )
+                ''')
 
-            conn.commit()
-            conn.close()
-            print("Таблица пользователей успешно создана/проверена")
+            logger.debug("Таблица пользователей успешно создана/проверена")
             return True
 
         except Exception as e:
-            print(f"Ошибка создания таблицы пользователей: {e}")
+            logger.exception("Ошибка создания таблицы пользователей")
             return False
 
     def create_default_users(self):
@@ -66,53 +112,59 @@ class AuthManager:
             count = cursor.fetchone()[0]
 
             if count == 0:
-                # Создаем администратора по умолчанию
-                admin_password = self.hash_password("admin123")
-                cursor.execute('''
-                    INSERT INTO Users (Username, Password, UserType, FullName, Email)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', ("admin", admin_password, "admin", "Администратор системы", "admin@masterpol.ru"))
-
-                # Создаем пользователя по умолчанию
-                user_password = self.hash_password("user123")
-                cursor.execute('''
-                    INSERT INTO Users (Username, Password, UserType, FullName, Email)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', ("user", user_password, "user", "Пользователь системы", "user@masterpol.ru"))
-
-                conn.commit()
-                print("Созданы пользователи по умолчанию")
+                with conn:
+                    # Создаем администратора по умолчанию
+                    admin_password = self.hash_password("admin123")
+                    cursor.execute('''
+                        INSERT INTO Users (Username, Password, UserType, FullName, Email)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', ("admin", admin_password, "admin", "Администратор системы", "admin@masterpol.ru"))
+
+                    # Создаем пользователя по умолчанию
+                    user_password = self.hash_password("user123")
+                    cursor.execute('''
+                        INSERT INTO Users (Username, Password, UserType, FullName, Email)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', ("user", user_password, "user", "Пользователь системы", "user@masterpol.ru"))
+
+                logger.info("Созданы пользователи по умолчанию")
             else:
-                print("Пользователи уже существуют в базе данных")
+                logger.debug("Пользователи уже существуют в базе данных")
 
-            conn.close()
             return True
 
         except Exception as e:
-            print(f"Ошибка создания пользователей по умолчанию: {e}")
+            logger.exception("Ошибка создания пользователей по умолчанию")
             return False
 
     def authenticate_user(self, username, password, user_type):
-        """Аутентифицирует пользователя"""
+        """
+        Аутентифицирует пользователя. Проверка PBKDF2 занимает около
+        passwords.TARGET_MS, поэтому интерфейс вызывает метод в фоновом потоке.
+        Хеш прежнего формата (SHA-256) при успешном входе заменяется на PBKDF2.
+        """
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            hashed_password = self.hash_password(password)
-
             cursor.execute('''
-                SELECT UserID, Username, UserType, FullName, IsActive 
-                FROM Users 
-                WHERE Username = ? AND Password = ? AND UserType = ? AND IsActive = 1
-            ''', (username, hashed_password, user_type))
+                SELECT UserID, Password
+                FROM Users
+                WHERE Username = ? AND UserType = ? AND IsActive = 1
+            ''', (username, user_type))
 
             user_data = cursor.fetchone()
-            conn.close()
+            if user_data is None or not passwords.verify_password(password, user_data[1]):
+                return False
 
-            return user_data is not None
+            if passwords.needs_rehash(user_data[1], self.iterations):
+                self._update_password_hash(cursor, user_data[0], password)
+                logger.info("Хеш пароля пользователя %s обновлен", username)
+
+            return True
 
         except Exception as e:
-            print(f"Ошибка аутентификации: {e}")
+            logger.exception("Ошибка аутентификации")
             return False
 
     def register_user(self, username, password, user_type, full_name="", email=""):
@@ -126,13 +178,11 @@ class AuthManager:
 
             hashed_password = self.hash_password(password)
 
-            cursor.execute('''
-                INSERT INTO Users (Username, Password, UserType, FullName, Email)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (username, hashed_password, user_type, full_name, email))
-
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor.execute('''
+                    INSERT INTO Users (Username, Password, UserType, FullName, Email)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (username, hashed_password, user_type, full_name, email))
 
             return True, "Пользователь успешно зарегистрирован"
 
@@ -147,7 +197,6 @@ class AuthManager:
 
             cursor.execute("SELECT COUNT(*) FROM Users WHERE Username = ?", (username,))
             count = cursor.fetchone()[0]
-            conn.close()
 
             return count > 0
 
@@ -162,12 +211,11 @@ class AuthManager:
 
             cursor.execute('''
                 SELECT UserID, Username, UserType, FullName, Email, CreatedDate
-                FROM Users 
+                FROM Users
                 WHERE Username = ? AND IsActive = 1
             ''', (username,))
 
             user_data = cursor.fetchone()
-            conn.close()
 
             if user_data:
                 return {
@@ -190,26 +238,17 @@ class AuthManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            old_hashed = self.hash_password(old_password)
             cursor.execute('''
-                SELECT UserID FROM Users 
-                WHERE Username = ? AND Password = ? AND IsActive = 1
-            ''', (username, old_hashed))
+                SELECT UserID, Password FROM Users
+                WHERE Username = ? AND IsActive = 1
+            ''', (username,))
 
-            if not cursor.fetchone():
-                conn.close()
+            user_data = cursor.fetchone()
+            if user_data is None or not passwords.verify_password(old_password, user_data[1]):
                 return False, "Неверный текущий пароль"
 
             # Обновляем пароль
-            new_hashed = self.hash_password(new_password)
-            cursor.execute('''
-                UPDATE Users 
-                SET Password = ? 
-                WHERE Username = ? AND IsActive = 1
-            ''', (new_hashed, username))
-
-            conn.commit()
-            conn.close()
+            self._update_password_hash(cursor, user_data[0], new_password)
 
             return True, "Пароль успешно изменен"
 
@@ -224,12 +263,11 @@ class AuthManager:
 
             cursor.execute('''
                 SELECT UserID, Username, UserType, FullName, Email, CreatedDate, IsActive
-                FROM Users 
+                FROM Users
                 ORDER BY CreatedDate DESC
             ''')
 
             users = cursor.fetchall()
-            conn.close()
 
             return users
 
@@ -242,15 +280,13 @@ class AuthManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute('''
-                UPDATE Users 
-                SET IsActive = 0 
-                WHERE Username = ?
-            ''', (username,))
-
-            conn.commit()
+            with conn:
+                cursor.execute('''
+                    UPDATE Users
+                    SET IsActive = 0
+                    WHERE Username = ?
+                ''', (username,))
             rowcount = cursor.rowcount
-            conn.close()
 
             return rowcount > 0
 
@@ -263,15 +299,13 @@ class AuthManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute('''
-                UPDATE Users 
-                SET IsActive = 1 
-                WHERE Username = ?
-            ''', (username,))
-
-            conn.commit()
+            with conn:
+                cursor.execute('''
+                    UPDATE Users
+                    SET IsActive = 1
+                    WHERE Username = ?
+                ''', (username,))
             rowcount = cursor.rowcount
-            conn.close()
 
             return rowcount > 0
 
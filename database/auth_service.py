@@ -0,0 +1,89 @@
+import threading
+from database.auth_manager import AuthManager
+
+
+class Session:
+    """Вошедший пользователь: создается при входе и хранится в памяти до выхода"""
+
+    def __init__(self, user_id, username, user_type, full_name=""):
+        self.user_id = user_id
+        self.username = username
+        self.user_type = user_type  # "admin" или "user"
+        self.full_name = full_name or ""
+
+    @property
+    def is_admin(self):
+        return self.user_type == "admin"
+
+    @property
+    def display_name(self):
+        return self.full_name or self.username
+
+    @property
+    def access_level_text(self):
+        return "Администратор" if self.is_admin else "Пользователь"
+
+    def __repr__(self):
+        return f"Session({self.username!r}, {self.user_type!r})"
+
+
+class AuthService:
+    """
+    Один AuthManager на процесс: таблица пользователей проверяется и стоимость
+    хеширования читается один раз при запуске, а не при каждом показе окна входа.
+    Хранит сессию текущего пользователя, экраны проверяют права по ней.
+    Пользователи по умолчанию создаются в фоновом потоке (ensure_default_users):
+    хеширование их паролей заняло бы поток интерфейса при запуске.
+    """
+
+    def __init__(self, db_path=None):
+        self.manager = AuthManager(db_path, create_defaults=False)
+        self.session = None
+        self._defaults_lock = threading.Lock()
+        self._defaults_ready = False
+
+    def ensure_default_users(self):
+        """Создает пользователей по умолчанию один раз за запуск; вызывается в фоновом потоке"""
+        with self._defaults_lock:
+            if not self._defaults_ready:
+                self._defaults_ready = self.manager.create_default_users()
+            return self._defaults_ready
+
+    def login(self, username, password, user_type):
+        """
+        Проверяет пароль и начинает сессию; возвращает Session или None.
+        Проверка пароля долгая, метод вызывается в фоновом потоке.
+        """
+        self.ensure_default_users()
+        if not self.manager.authenticate_user(username, password, user_type):
+            return None
+        user_info = self.manager.get_user_info(username)
+        if user_info is None:
+            return None
+        self.session = Session(user_info['user_id'], user_info['username'],
+                               user_info['user_type'], user_info['full_name'])
+        return self.session
+
+    def register_user(self, username, password, user_type, full_name="", email=""):
+        """
+        Регистрирует пользователя; возвращает (успех, сообщение).
+        Хеширование пароля долгое, метод вызывается в фоновом потоке.
+        """
+        self.ensure_default_users()
+        return self.manager.register_user(username, password, user_type, full_name, email)
+
+    def logout(self):
+        self.session = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_auth_service(db_path=None):
+    """Возвращает службу авторизации процесса, создавая ее при первом обращении"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AuthService(db_path)
+        return _service
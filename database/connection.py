@@ -0,0 +1,157 @@
+import os
+import sqlite3
+import threading
+from database.instrumentation import get_instrumentation
+from database.migrations import migrate
+from database.product_search import casefold
+
+
+# PRAGMA-настройки, применяемые один раз при открытии соединения
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,  # отрицательное значение - размер в КиБ (~16 МБ)
+    'mmap_size': 134217728,  # 128 МБ
+    'temp_store': 'MEMORY',
+}
+
+
+class ConnectionManager:
+    """
+    Хранит одно долгоживущее соединение с базой данных на каждый поток.
+    Соединения хранятся по threading.get_ident(), а не в threading.local:
+    QThreadPool выполняет каждую задачу с новым состоянием потока Python,
+    и данные threading.local при этом теряются.
+    """
+
+    def __init__(self, db_path, pragmas=None):
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+
+        self._lock = threading.Lock()
+        self._connections = {}  # идентификатор потока -> соединение
+        self._traced = {}  # идентификатор потока -> установлена ли функция трассировки
+        self._opened = 0
+        self._reused = 0
+        # Изменения строк уже закрытых соединений (см. get_change_count)
+        self._closed_changes = 0
+        self._schema_ready = False
+
+    def get_connection(self):
+        """Возвращает соединение текущего потока, открывая его при первом обращении"""
+        thread_id = threading.get_ident()
+        tracing = get_instrumentation().enabled
+        with self._lock:
+            conn = self._connections.get(thread_id)
+            if conn is not None:
+                self._reused += 1
+                if self._traced[thread_id] == tracing:
+                    return conn
+                self._traced[thread_id] = tracing
+
+        if conn is None:
+            conn = self._open_connection()
+            with self._lock:
+                self._connections[thread_id] = conn
+                self._traced[thread_id] = tracing
+                self._opened += 1
+        # Трассировку меняет поток-владелец соединения, когда сбор статистики
+        # включают или выключают; выключенный сбор не платит за вызов на каждый запрос
+        conn.set_trace_callback(get_instrumentation().trace if tracing else None)
+        return conn
+
+    def ensure_schema(self):
+        """Один раз за время жизни менеджера приводит схему базы к актуальной версии"""
+        if self._schema_ready:
+            return
+        # Повторный запуск из другого потока безопасен: migrate() перечитывает
+        # версию схемы под блокировкой записи
+        migrate(self.get_connection())
+        self._schema_ready = True
+
+    def _open_connection(self):
+        # check_same_thread=False нужен для close_all() при завершении и для потока,
+        # получившего идентификатор завершенного: одновременно соединение использует один поток
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        cursor = conn.cursor()
+        for name, value in self.pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+            # journal_mode возвращает строку с результатом, которую нужно выбрать
+            cursor.fetchall()
+        cursor.close()
+        # LOWER() в SQLite не переводит кириллицу в нижний регистр
+        conn.create_function('casefold', 1, casefold, deterministic=True)
+        return conn
+
+    def close(self):
+        """Закрывает соединение текущего потока"""
+        with self._lock:
+            conn = self._connections.pop(threading.get_ident(), None)
+            self._traced.pop(threading.get_ident(), None)
+            if conn is None:
+                return
+            self._closed_changes += conn.total_changes
+        conn.close()
+
+    def close_all(self):
+        """Закрывает все открытые соединения (при завершении приложения)"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections = {}
+            self._traced = {}
+            self._closed_changes += sum(conn.total_changes for conn in connections)
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def get_change_count(self):
+        """
+        Число строк, измененных через все соединения менеджера с момента его создания.
+        Растет после каждой записи в базу из этого процесса, в любом потоке.
+        """
+        with self._lock:
+            return self._closed_changes + sum(conn.total_changes for conn in self._connections.values())
+
+    def get_stats(self):
+        """Возвращает статистику открытых и повторно использованных соединений"""
+        with self._lock:
+            return {
+                'db_path': self.db_path,
+                'opened': self._opened,
+                'reused': self._reused,
+                'active': len(self._connections),
+            }
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path, pragmas=None):
+    """Возвращает общий менеджер соединений для файла базы данных"""
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = ConnectionManager(db_path, pragmas)
+            _managers[key] = manager
+        return manager
+
+
+def close_all_connections():
+    """Закрывает соединения всех менеджеров"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.close_all()
+
+
+def get_connection_stats():
+    """Возвращает статистику соединений по всем базам данных"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    return [manager.get_stats() for manager in managers]
@@ -0,0 +1,59 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from datetime import date, datetime
+
+
+def price_to_kopecks(value):
+    """
+    Переводит цену в рублях в целое число копеек.
+    Принимает числа и строки вида '4456,9', '4 456.90', '3'.
+    """
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        amount = value
+    elif isinstance(value, (int, float)):
+        amount = Decimal(str(value))
+    else:
+        text = str(value).replace('₽', '').replace(' ', '').replace('\xa0', '').replace(',', '.')
+        try:
+            amount = Decimal(text)
+        except InvalidOperation:
+            raise ValueError(f"Некорректная цена: {value!r}")
+    return int((amount * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def kopecks_to_rubles(kopecks):
+    """Переводит целое число копеек в рубли"""
+    if kopecks is None:
+        return None
+    return kopecks / 100
+
+
+# Форматы, в которых даты продаж могли быть записаны до перехода на ISO 8601
+LEGACY_DATE_FORMATS = ['%d.%m.%Y', '%d/%m/%Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S']
+
+
+def sale_date_to_iso(value):
+    """
+    Приводит дату продажи к строке ISO 8601 'yyyy-mm-dd'.
+    Принимает date/datetime и строки в форматах LEGACY_DATE_FORMATS.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+
+    text = str(value).strip()
+    for fmt in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f"Некорректная дата: {value!r}")
+
+
+def format_sale_date(iso_date):
+    """Форматирует дату 'yyyy-mm-dd' для отображения как 'dd.mm.yyyy' без разбора строки"""
+    if not iso_date:
+        return ""
+    return f"{iso_date[8:10]}.{iso_date[5:7]}.{iso_date[0:4]}"
@@ -1,14 +1,68 @@
-import sqlite3
-import os
-from datetime import datetime
+from datetime import date
+from database.connection import get_connection_manager
+from database.conversions import price_to_kopecks, sale_date_to_iso
+from database.discounts import DISCOUNT_SQL
+from database.instrumentation import instrumented
+from database.logger import get_logger, log_rows
+from database.materials import INVALID, get_material_calculator
+from database.partner_cache import get_partner_cache
+from database.product_search import build_match_query, has_product_search
 
 
+logger = get_logger(__name__)
+
+
+@instrumented
 class DatabaseManager:
     def __init__(self, db_path="database/masterpol.db"):
         self.db_path = db_path
+        self.connection_manager = get_connection_manager(db_path)
+        self.connection_manager.ensure_schema()
+        self.partner_cache = get_partner_cache(db_path)
+        # Без FTS5 поиск продукции выполняется через casefold() и LIKE
+        self.use_product_search = has_product_search(self.get_connection().cursor())
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """Возвращает долгоживущее соединение текущего потока"""
+        return self.connection_manager.get_connection()
+
+    def get_data_version(self):
+        """
+        Версия данных: меняется после каждой записи в базу из этого процесса.
+        Экраны сравнивают ее, чтобы не перечитывать данные, которые не менялись.
+        """
+        return self.connection_manager.get_change_count()
+
+    def _load_partner(self, inn):
+        """Читает PartnerID и название партнера по ИНН и сохраняет их в кэш"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT PartnerID, PartnerName FROM Partners_Import WHERE INN = ?", (inn,))
+        result = cursor.fetchone()
+        if not result:
+            return None, None
+        self.partner_cache.put(inn, result[0], result[1])
+        return result
+
+    def _product_search_filter(self, rowid_column, name_column, search_text):
+        """Возвращает условие поиска продукции и его параметры: (' AND ...', [...])"""
+        if self.use_product_search:
+            match_query = build_match_query(search_text)
+            if match_query is None:
+                return "", []
+            return (f" AND {rowid_column} IN "
+                    f"(SELECT rowid FROM ProductSearch WHERE ProductSearch MATCH ?)", [match_query])
+        return f" AND casefold({name_column}) LIKE ?", [f"%{search_text.casefold()}%"]
+
+    def _resolve_partner_id(self, partner_inn, partner_id=None):
+        """Возвращает переданный PartnerID или находит его по ИНН через кэш"""
+        if partner_id is not None:
+            return partner_id
+        if not partner_inn:
+            return None
+        partner_id = self.partner_cache.get_id(partner_inn)
+        if partner_id is None:
+            partner_id = self._load_partner(partner_inn)[0]
+        return partner_id
 
     def create_test_table(self):
         conn = self.get_connection()
@@ -34,14 +88,12 @@ class DatabaseManager:
             ('ООО', 'Паркет 29', 'Петров Василий', '987 123 56 78', 'vpetrov@vl.ru', '164500, Арханг...', '3333888520', 7.00)
         ]
 
-        cursor.executemany('''
-        INSERT OR REPLACE INTO Partners_Import 
-        (PartnerType, PartnerName, Director, Phone, Email, LegalAddress, INN, Rating)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', test_data)
-
-        conn.commit()
-        conn.close()
+        with conn:
+            cursor.executemany('''
+            INSERT OR REPLACE INTO Partners_Import 
+            (PartnerType, PartnerName, Director, Phone, Email, LegalAddress, INN, Rating)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', test_data)
 
     def is_inn_exists(self, inn):
         """Проверяет, существует ли партнер с таким ИНН"""
@@ -50,7 +102,6 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM Partners_Import WHERE INN = ?", (inn,))
             count = cursor.fetchone()[0]
-            conn.close()
             return count > 0
         except Exception as e:
             return False
@@ -88,15 +139,15 @@ class DatabaseManager:
                 partner_data['Rating']
             )
 
-            cursor.execute(query, values)
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor.execute(query, values)
+            self.partner_cache.invalidate(inn)
 
-            print(f"Добавлен партнер с PartnerID: {next_id}, ИНН: {inn}")
+            logger.info("Добавлен партнер с PartnerID: %s, ИНН: %s", next_id, inn)
             return True, "Партнер успешно добавлен"
 
         except Exception as e:
-            print(f"Ошибка при добавлении партнера: {str(e)}")
+            logger.exception("Ошибка при добавлении партнера")
             return False, f"Ошибка при добавлении партнера: {str(e)}"
 
     def get_all_partners(self):
@@ -112,16 +163,50 @@ class DatabaseManager:
 
         cursor.execute(query)
         partners = cursor.fetchall()
-        conn.close()
         return partners
 
+    def get_partners_with_discounts(self):
+        """
+        Получает всех партнеров вместе с общим количеством проданной продукции
+        и скидкой по таблице порогов DiscountTiers - одним запросом
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            query = f"""
+            SELECT p.PartnerType, p.PartnerName, p.Director, p.Phone,
+                   p.Email, p.LegalAddress, p.INN, p.Rating,
+                   COALESCE(s.TotalQuantity, 0) AS TotalQuantity,
+                   {DISCOUNT_SQL.format(quantity='COALESCE(s.TotalQuantity, 0)')} AS Discount
+            FROM Partners_Import p
+            LEFT JOIN PartnerSalesSummary s ON s.PartnerID = p.PartnerID
+            ORDER BY p.PartnerName
+            """
+
+            cursor.execute(query)
+            return cursor.fetchall()
+
+        except Exception as e:
+            return []
+
+    def get_discount_tiers(self):
+        """Получает пороги скидок: список (минимальное количество, скидка в %)"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT MinQuantity, DiscountPercent FROM DiscountTiers ORDER BY MinQuantity")
+            return cursor.fetchall()
+        except Exception as e:
+            return []
+
     def delete_partner(self, inn):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM Partners_Import WHERE INN = ?", (inn,))
-        conn.commit()
+        with conn:
+            cursor.execute("DELETE FROM Partners_Import WHERE INN = ?", (inn,))
+        self.partner_cache.invalidate(inn)
         rowcount = cursor.rowcount
-        conn.close()
         return rowcount > 0
 
     def get_partner_by_inn(self, inn):
@@ -136,7 +221,6 @@ class DatabaseManager:
                 WHERE INN = ?
             """, (inn,))
             result = cursor.fetchone()
-            conn.close()
             return result
         except Exception as e:
             return None
@@ -146,24 +230,24 @@ class DatabaseManager:
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE Partners_Import 
-                SET PartnerType = ?, PartnerName = ?, Director = ?, 
-                    Phone = ?, Email = ?, LegalAddress = ?, Rating = ?
-                WHERE INN = ?
-            """, (
-                partner_data['PartnerType'],
-                partner_data['PartnerName'],
-                partner_data['Director'],
-                partner_data['Phone'],
-                partner_data['Email'],
-                partner_data['LegalAddress'],
-                partner_data['Rating'],
-                inn
-            ))
-            conn.commit()
+            with conn:
+                cursor.execute("""
+                    UPDATE Partners_Import 
+                    SET PartnerType = ?, PartnerName = ?, Director = ?, 
+                        Phone = ?, Email = ?, LegalAddress = ?, Rating = ?
+                    WHERE INN = ?
+                """, (
+                    partner_data['PartnerType'],
+                    partner_data['PartnerName'],
+                    partner_data['Director'],
+                    partner_data['Phone'],
+                    partner_data['Email'],
+                    partner_data['LegalAddress'],
+                    partner_data['Rating'],
+                    inn
+                ))
+            self.partner_cache.invalidate(inn)
             rowcount = cursor.rowcount
-            conn.close()
             return rowcount > 0
         except Exception as e:
             return False
@@ -175,7 +259,8 @@ class DatabaseManager:
             cursor = conn.cursor()
 
             base_query = """
-            SELECT DISTINCT p.ProductName, p.ArticleNumber, p.ProductTypeID as ProductType, p.MinPartnerPrice
+            SELECT DISTINCT p.ProductName, p.ArticleNumber, p.ProductTypeID as ProductType,
+                   p.MinPartnerPrice / 100.0 AS MinPartnerPrice
             FROM Products_Import p
             WHERE 1=1
             """
@@ -183,14 +268,15 @@ class DatabaseManager:
             params = []
 
             if search_text:
-                base_query += " AND LOWER(p.ProductName) LIKE LOWER(?)"
-                params.append(f"%{search_text}%")
+                search_filter, search_params = self._product_search_filter(
+                    "p.ROWID", "p.ProductName", search_text)
+                base_query += search_filter
+                params.extend(search_params)
 
             base_query += " ORDER BY p.ProductName"
 
             cursor.execute(base_query, params)
             products = cursor.fetchall()
-            conn.close()
             return products
 
         except Exception as e:
@@ -199,12 +285,28 @@ class DatabaseManager:
     def get_partner_name_by_inn(self, inn):
         """Получает название партнера по ИНН"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT PartnerName FROM Partners_Import WHERE INN = ?", (inn,))
+            partner_id = self.partner_cache.get_id(inn)
+            name = self.partner_cache.get_name(partner_id) if partner_id is not None else None
+            if name is None:
+                name = self._load_partner(inn)[1]
+            return name if name is not None else "Неизвестный партнер"
+        except Exception as e:
+            return "Неизвестный партнер"
+
+    def get_partner_name_by_id(self, partner_id):
+        """Получает название партнера по PartnerID"""
+        try:
+            name = self.partner_cache.get_name(partner_id)
+            if name is not None:
+                return name
+
+            cursor = self.get_connection().cursor()
+            cursor.execute("SELECT INN, PartnerName FROM Partners_Import WHERE PartnerID = ?", (partner_id,))
             result = cursor.fetchone()
-            conn.close()
-            return result[0] if result else "Неизвестный партнер"
+            if not result:
+                return "Неизвестный партнер"
+            self.partner_cache.put(result[0], partner_id, result[1])
+            return result[1]
         except Exception as e:
             return "Неизвестный партнер"
 
@@ -220,24 +322,19 @@ class DatabaseManager:
             VALUES (?, ?, ?, ?)
             """
 
-            price = product_data['MinPartnerPrice']
-            if isinstance(price, (int, float)):
-                price_str = str(price).replace('.', ',')
-            else:
-                price_str = str(price)
+            # Цена хранится в копейках, целым числом
+            price_kopecks = price_to_kopecks(product_data['MinPartnerPrice'])
 
             values = (
                 product_data['ProductName'],
                 product_data['ProductTypeID'],
                 product_data['ArticleNumber'],
-                price_str
+                price_kopecks
             )
 
-            cursor.execute(query, values)
-            product_id = cursor.lastrowid
-            conn.commit()
+            with conn:
+                cursor.execute(query, values)
             rowcount = cursor.rowcount
-            conn.close()
 
             return rowcount > 0
 
@@ -251,21 +348,22 @@ class DatabaseManager:
             cursor = conn.cursor()
 
             base_query = """
-            SELECT DISTINCT ProductName, ArticleNumber, ProductTypeID, MinPartnerPrice
+            SELECT DISTINCT ProductName, ArticleNumber, ProductTypeID, MinPartnerPrice / 100.0 AS MinPartnerPrice
             FROM Products_Import
             WHERE 1=1
             """
             params = []
 
             if search_text:
-                base_query += " AND LOWER(ProductName) LIKE LOWER(?)"
-                params.append(f"%{search_text}%")
+                search_filter, search_params = self._product_search_filter(
+                    "ROWID", "ProductName", search_text)
+                base_query += search_filter
+                params.extend(search_params)
 
             base_query += " ORDER BY ProductName"
 
             cursor.execute(base_query, params)
             products = cursor.fetchall()
-            conn.close()
             return products
 
         except Exception as e:
@@ -276,67 +374,31 @@ class DatabaseManager:
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM Products_Import WHERE ArticleNumber = ?", (article_number,))
-            conn.commit()
+            with conn:
+                cursor.execute("DELETE FROM Products_Import WHERE ArticleNumber = ?", (article_number,))
             rowcount = cursor.rowcount
-            conn.close()
             return rowcount > 0
         except Exception as e:
             return False
 
-    def add_partner_id_to_products_table(self):
-        """Добавляет поле PartnerID в таблицу Products_Import"""
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("PRAGMA table_info(Products_Import)")
-            columns = [col[1] for col in cursor.fetchall()]
-
-            if 'PartnerID' not in columns:
-                cursor.execute("ALTER TABLE Products_Import ADD COLUMN PartnerID INTEGER")
-
-            conn.commit()
-            conn.close()
-            return True
-
-        except Exception as e:
-            return False
-
-    def add_product_with_partner_id(self, product_data, partner_inn=None):
+    def add_product_with_partner_id(self, product_data, partner_inn=None, partner_id=None):
         """Добавляет новый продукт с указанием партнера"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            # Проверяем, что таблица Products_Import имеет колонку PartnerID
-            cursor.execute("PRAGMA table_info(Products_Import)")
-            columns = [col[1] for col in cursor.fetchall()]
-
-            if 'PartnerID' not in columns:
-                print("Добавляем колонку PartnerID в таблицу Products_Import")
-                cursor.execute("ALTER TABLE Products_Import ADD COLUMN PartnerID INTEGER")
-                conn.commit()
-
-            partner_id = None
-            if partner_inn:
+            if partner_inn and partner_id is None:
                 # Получаем PartnerID по ИНН
-                cursor.execute("SELECT PartnerID FROM Partners_Import WHERE INN = ?", (partner_inn,))
-                partner_result = cursor.fetchone()
-                if partner_result:
-                    partner_id = partner_result[0]
-                    print(f"Найден партнер с ID: {partner_id} для ИНН: {partner_inn}")
-                else:
-                    print(f"Партнер с ИНН {partner_inn} не найден!")
-                    conn.close()
+                partner_id = self._resolve_partner_id(partner_inn)
+                if partner_id is None:
+                    logger.warning("Партнер с ИНН %s не найден", partner_inn)
                     return False
 
             # Проверяем, что артикул уникален
             cursor.execute("SELECT COUNT(*) FROM Products_Import WHERE ArticleNumber = ?",
                            (product_data['ArticleNumber'],))
             if cursor.fetchone()[0] > 0:
-                print(f"Продукт с артикулом {product_data['ArticleNumber']} уже существует!")
-                conn.close()
+                logger.warning("Продукт с артикулом %s уже существует", product_data['ArticleNumber'])
                 return False
 
             # Добавляем продукт
@@ -346,94 +408,69 @@ class DatabaseManager:
             VALUES (?, ?, ?, ?, ?)
             """
 
-            price = product_data['MinPartnerPrice']
-            if isinstance(price, (int, float)):
-                price_str = str(price).replace('.', ',')
-            else:
-                price_str = str(price)
+            # Цена хранится в копейках, целым числом
+            price_kopecks = price_to_kopecks(product_data['MinPartnerPrice'])
 
             values = (
                 product_data['ProductName'],
                 product_data['ProductTypeID'],
                 product_data['ArticleNumber'],
-                price_str,
+                price_kopecks,
                 partner_id
             )
 
-            print(f"Добавляем продукт: {values}")
-            cursor.execute(query, values)
+            with conn:
+                cursor.execute(query, values)
             product_id = cursor.lastrowid
-            conn.commit()
             rowcount = cursor.rowcount
-            conn.close()
 
-            print(f"Продукт добавлен с ID: {product_id}, затронуто строк: {rowcount}")
+            logger.info("Продукт добавлен с ID: %s, партнер: %s", product_id, partner_id)
             return rowcount > 0
 
         except Exception as e:
-            print(f"Ошибка в add_product_with_partner_id: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Ошибка в add_product_with_partner_id")
             return False
 
-    def get_partner_products_by_partner_id(self, partner_inn, search_text=""):
+    def get_partner_products_by_partner_id(self, partner_inn=None, search_text="", partner_id=None):
         """Получает продукцию конкретного партнера по PartnerID"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            print(f"Ищем продукты для партнера с ИНН: {partner_inn}")
-
             # Получаем PartnerID партнера
-            cursor.execute("SELECT PartnerID FROM Partners_Import WHERE INN = ?", (partner_inn,))
-            partner_result = cursor.fetchone()
+            partner_id = self._resolve_partner_id(partner_inn, partner_id)
 
-            if not partner_result:
-                print(f"Партнер с ИНН {partner_inn} не найден!")
-                conn.close()
-                return []
-
-            partner_id = partner_result[0]
-            print(f"Найден партнер с ID: {partner_id}")
-
-            # Проверяем, есть ли колонка PartnerID в таблице Products_Import
-            cursor.execute("PRAGMA table_info(Products_Import)")
-            columns = [col[1] for col in cursor.fetchall()]
-
-            if 'PartnerID' not in columns:
-                print("Колонка PartnerID не найдена в таблице Products_Import")
-                conn.close()
+            if partner_id is None:
+                logger.warning("Партнер с ИНН %s не найден", partner_inn)
                 return []
 
             # Получаем продукты партнера
             base_query = """
-            SELECT DISTINCT ProductName, ArticleNumber, ProductTypeID, MinPartnerPrice
+            SELECT DISTINCT ProductName, ArticleNumber, ProductTypeID, MinPartnerPrice / 100.0 AS MinPartnerPrice
             FROM Products_Import
             WHERE PartnerID = ?
             """
             params = [partner_id]
 
             if search_text:
-                base_query += " AND LOWER(ProductName) LIKE LOWER(?)"
-                params.append(f"%{search_text}%")
+                search_filter, search_params = self._product_search_filter(
+                    "ROWID", "ProductName", search_text)
+                base_query += search_filter
+                params.extend(search_params)
 
             base_query += " ORDER BY ProductName"
 
-            print(f"Выполняем запрос: {base_query} с параметрами: {params}")
+            logger.debug("Продукция партнера %s, параметры: %s", partner_id, params)
             cursor.execute(base_query, params)
             products = cursor.fetchall()
 
-            print(f"Найдено продуктов: {len(products)}")
-            for i, product in enumerate(products):
-                print(f"Продукт {i + 1}: {product}")
+            # Отдельные строки пишутся выборочно и только при включенном DEBUG
+            log_rows(logger, "Продукция партнера", products)
 
-            conn.close()
             return products
 
         except Exception as e:
-            print(f"Ошибка в get_partner_products_by_partner_id: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Ошибка в get_partner_products_by_partner_id")
             return []
 
     def update_product(self, original_article, product_data):
@@ -442,11 +479,8 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            price = product_data['MinPartnerPrice']
-            if isinstance(price, (int, float)):
-                price_str = str(price).replace('.', ',')
-            else:
-                price_str = str(price)
+            # Цена хранится в копейках, целым числом
+            price_kopecks = price_to_kopecks(product_data['MinPartnerPrice'])
 
             query = """
             UPDATE Products_Import 
@@ -458,14 +492,13 @@ class DatabaseManager:
                 product_data['ProductName'],
                 product_data['ProductTypeID'],
                 product_data['ArticleNumber'],
-                price_str,
+                price_kopecks,
                 original_article
             )
 
-            cursor.execute(query, values)
-            conn.commit()
+            with conn:
+                cursor.execute(query, values)
             rowcount = cursor.rowcount
-            conn.close()
 
             return rowcount > 0
 
@@ -479,14 +512,13 @@ class DatabaseManager:
             cursor = conn.cursor()
 
             query = """
-            SELECT ProductName, ArticleNumber, ProductTypeID, MinPartnerPrice
+            SELECT ProductName, ArticleNumber, ProductTypeID, MinPartnerPrice / 100.0 AS MinPartnerPrice
             FROM Products_Import 
             WHERE ArticleNumber = ?
             """
 
             cursor.execute(query, (article_number,))
             result = cursor.fetchone()
-            conn.close()
 
             if result:
                 return {
@@ -500,127 +532,252 @@ class DatabaseManager:
         except Exception as e:
             return None
 
-    def fix_partner_table_structure(self):
-        """Исправляет структуру таблицы Partners_Import"""
+    def update_products_with_null_partner_id(self, partner_inn=None, partner_id=None):
+        """Обновляет продукты с NULL PartnerID для конкретного партнера"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute("SELECT * FROM Partners_Import WHERE PartnerID IS NULL")
-            partners_with_null_id = cursor.fetchall()
+            partner_id = self._resolve_partner_id(partner_inn, partner_id)
 
-            if partners_with_null_id:
-                cursor.execute("SELECT MAX(PartnerID) FROM Partners_Import WHERE PartnerID IS NOT NULL")
-                max_id_result = cursor.fetchone()
-                max_id = max_id_result[0] if max_id_result[0] is not None else 0
+            if partner_id is None:
+                return False
 
-                for i, partner in enumerate(partners_with_null_id):
-                    new_id = max_id + i + 1
-                    partner_inn = partner[7]
-                    cursor.execute("UPDATE Partners_Import SET PartnerID = ? WHERE INN = ?", (new_id, partner_inn))
+            cursor.execute("SELECT ProductID FROM Products_Import WHERE PartnerID IS NULL")
+            null_products = cursor.fetchall()
 
-            conn.commit()
-            conn.close()
+            if null_products:
+                with conn:
+                    for product in null_products:
+                        product_id = product[0]
+                        cursor.execute("UPDATE Products_Import SET PartnerID = ? WHERE ProductID = ?", (partner_id, product_id))
             return True
 
         except Exception as e:
             return False
 
-    def update_products_with_null_partner_id(self, partner_inn):
-        """Обновляет продукты с NULL PartnerID для конкретного партнера"""
+    def _query_sales_history(self, cursor, partner_id, search_text="", date_from=None, date_to=None,
+                             after=None, limit=None):
+        """
+        Выбирает продажи партнера, отсортированные от новых к старым.
+        after - ключ (SaleDate, SaleID) последней строки предыдущей страницы.
+        """
+        # Даты хранятся как 'yyyy-mm-dd', поэтому диапазон и сортировка
+        # выполняются по индексу (PartnerID, SaleDate)
+        query = """
+        SELECT 
+            pps.SaleDate,
+            pi.ProductName,
+            pps.Quantity,
+            pi.MinPartnerPrice / 100.0 AS MinPartnerPrice,
+            (pps.Quantity * pi.MinPartnerPrice) / 100.0 AS TotalSum,
+            pps.ROWID as SaleID
+        FROM Partner_Products_Import pps
+        JOIN Products_Import pi ON pps.ProductID = pi.ROWID
+        WHERE pps.PartnerID = ?
+        """
+        params = [partner_id]
+
+        if date_from:
+            query += " AND pps.SaleDate >= ?"
+            params.append(sale_date_to_iso(date_from))
+
+        if date_to:
+            query += " AND pps.SaleDate <= ?"
+            params.append(sale_date_to_iso(date_to))
+
+        if search_text:
+            search_filter, search_params = self._product_search_filter(
+                "pps.ProductID", "pi.ProductName", search_text)
+            query += search_filter
+            params.extend(search_params)
+
+        if after:
+            # Постраничная выборка по ключу: продолжаем с места, где остановилась
+            # предыдущая страница, без OFFSET
+            query += " AND (pps.SaleDate, pps.ROWID) < (?, ?)"
+            params.extend(after)
+
+        query += " ORDER BY pps.SaleDate DESC, pps.ROWID DESC"
+
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def get_partner_sales_history(self, partner_inn=None, search_text="", date_from=None, date_to=None,
+                                  partner_id=None):
+        """
+        Получает историю продаж партнера с названиями продуктов.
+        date_from и date_to (включительно) - date или строка 'yyyy-mm-dd'.
+        Если передан partner_id, поиск партнера по ИНН не выполняется.
+        """
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute("SELECT PartnerID FROM Partners_Import WHERE INN = ?", (partner_inn,))
-            partner_result = cursor.fetchone()
+            partner_id = self._resolve_partner_id(partner_inn, partner_id)
 
-            if not partner_result:
-                return False
+            if partner_id is None:
+                return []
 
-            partner_id = partner_result[0]
+            return self._query_sales_history(cursor, partner_id, search_text, date_from, date_to)
 
-            cursor.execute("SELECT ProductID FROM Products_Import WHERE PartnerID IS NULL")
-            null_products = cursor.fetchall()
+        except Exception as e:
+            return []
 
-            if null_products:
-                for product in null_products:
-                    product_id = product[0]
-                    cursor.execute("UPDATE Products_Import SET PartnerID = ? WHERE ProductID = ?", (partner_id, product_id))
+    def get_partner_sales_page(self, partner_inn=None, search_text="", after=None, limit=200,
+                               date_from=None, date_to=None, partner_id=None):
+        """
+        Получает одну страницу истории продаж партнера (не более limit строк).
+        Для следующей страницы передается after = (SaleDate, SaleID) последней строки.
+        Ошибка запроса передается вызывающему: пустой список означает конец истории.
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
 
-            conn.commit()
-            conn.close()
-            return True
+            partner_id = self._resolve_partner_id(partner_inn, partner_id)
 
-        except Exception as e:
-            return False
+            if partner_id is None:
+                return []
+
+            return self._query_sales_history(cursor, partner_id, search_text, date_from, date_to,
+                                             after, limit)
 
-    def get_partner_sales_history(self, partner_inn, search_text=""):
-        """Получает историю продаж партнера с названиями продуктов"""
+        except Exception:
+            logger.exception("Ошибка чтения страницы истории продаж партнера %s", partner_inn or partner_id)
+            raise
+
+    def get_sales_history_snapshot(self, partner_inn=None, search_text="", date_from=None, date_to=None,
+                                   partner_id=None, limit=None):
+        """
+        Возвращает историю продаж и итоги партнера одним согласованным снимком:
+        {'sales': [...], 'statistics': {...}}. Оба запроса читаются в одной транзакции.
+        С limit в 'sales' попадает только первая страница.
+        Ошибка запроса передается вызывающему: экран показывает ее, а не пустую историю.
+        """
+        empty_statistics = {'total_sales': 0, 'total_quantity': 0, 'total_sum': 0, 'discount': 0}
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute("SELECT PartnerID FROM Partners_Import WHERE INN = ?", (partner_inn,))
-            partner_result = cursor.fetchone()
+            partner_id = self._resolve_partner_id(partner_inn, partner_id)
 
-            if not partner_result:
-                return []
+            if partner_id is None:
+                return {'sales': [], 'statistics': empty_statistics}
 
-            partner_id = partner_result[0]
+            started = not conn.in_transaction
+            if started:
+                cursor.execute("BEGIN")
+            try:
+                sales = self._query_sales_history(cursor, partner_id, search_text, date_from, date_to,
+                                                  limit=limit)
+                statistics = self._query_sales_statistics(cursor, partner_id)
+            finally:
+                if started:
+                    conn.commit()
 
-            base_query = """
-            SELECT 
-                pps.SaleDate,
-                pi.ProductName,
-                pps.Quantity,
-                pi.MinPartnerPrice,
-                (pps.Quantity * CAST(REPLACE(pi.MinPartnerPrice, ',', '.') AS FLOAT)) AS TotalSum,
-                pps.ROWID as SaleID
-            FROM Partner_Products_Import pps
-            JOIN Products_Import pi ON pps.ProductID = pi.ROWID
-            WHERE pps.PartnerID = ?
-            """
+            return {'sales': sales, 'statistics': statistics}
 
-            params = [partner_id]
+        except Exception:
+            logger.exception("Ошибка чтения истории продаж партнера %s", partner_inn or partner_id)
+            raise
 
-            if search_text:
-                base_query += " AND LOWER(pi.ProductName) LIKE LOWER(?)"
-                params.append(f"%{search_text}%")
+    def iter_sales_export(self, partner_inn=None, date_from=None, date_to=None, batch_size=1000):
+        """
+        Генератор строк выгрузки продаж: (ИНН, партнер, дата, артикул, продукция,
+        количество, цена, сумма). Без partner_inn выгружаются все партнеры по очереди.
+        Строки читаются с курсора пачками по batch_size, ошибки передаются вызывающему.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
 
-            base_query += " ORDER BY pps.SaleDate DESC"
+        if partner_inn:
+            partner_id = self._resolve_partner_id(partner_inn)
+            if partner_id is None:
+                return
+            partners = [(partner_id, partner_inn, self.get_partner_name_by_id(partner_id))]
+        else:
+            # Партнеров немного, а продажи каждого выбираются по индексу
+            # (PartnerID, SaleDate) уже в нужном порядке - без сортировки всей таблицы
+            cursor.execute("SELECT PartnerID, INN, PartnerName FROM Partners_Import ORDER BY PartnerName")
+            partners = cursor.fetchall()
 
-            cursor.execute(base_query, params)
-            sales = cursor.fetchall()
-
-            if not sales:
-                alt_query = """
-                SELECT 
-                    pps.SaleDate,
-                    pi.ProductName,
-                    pps.Quantity,
-                    pi.MinPartnerPrice,
-                    (pps.Quantity * CAST(REPLACE(pi.MinPartnerPrice, ',', '.') AS FLOAT)) AS TotalSum,
-                    pps.ROWID as SaleID
-                FROM Partner_Products_Import pps, Products_Import pi
-                WHERE pps.PartnerID = ? 
-                AND pps.ProductID = pi.ROWID
-                """
-
-                if search_text:
-                    alt_query += " AND LOWER(pi.ProductName) LIKE LOWER(?)"
-                    params = [partner_id, f"%{search_text}%"]
-                else:
-                    params = [partner_id]
-
-                alt_query += " ORDER BY pps.SaleDate DESC"
-
-                cursor.execute(alt_query, params)
-                sales = cursor.fetchall()
-
-            conn.close()
-            return sales
+        query = """
+        SELECT
+            pps.SaleDate,
+            pi.ArticleNumber,
+            pi.ProductName,
+            pps.Quantity,
+            pi.MinPartnerPrice / 100.0,
+            (pps.Quantity * pi.MinPartnerPrice) / 100.0
+        FROM Partner_Products_Import pps
+        JOIN Products_Import pi ON pps.ProductID = pi.ROWID
+        WHERE pps.PartnerID = ?
+        """
+        params = []
+        if date_from:
+            query += " AND pps.SaleDate >= ?"
+            params.append(sale_date_to_iso(date_from))
+        if date_to:
+            query += " AND pps.SaleDate <= ?"
+            params.append(sale_date_to_iso(date_to))
+        query += " ORDER BY pps.SaleDate DESC, pps.ROWID DESC"
+
+        for partner_id, inn, partner_name in partners:
+            cursor.execute(query, [partner_id] + params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield (inn, partner_name) + row
+
+    def iter_partner_report(self, batch_size=1000):
+        """
+        Генератор строк отчета по партнерам: реквизиты, число продаж, количество,
+        сумма и скидка из таблицы итогов PartnerSalesSummary
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(f"""
+        SELECT p.INN, p.PartnerName, p.PartnerType, p.Director, p.Phone, p.Email, p.Rating,
+               COALESCE(s.SaleCount, 0),
+               COALESCE(s.TotalQuantity, 0),
+               COALESCE(s.TotalSum, 0) / 100.0,
+               {DISCOUNT_SQL.format(quantity='COALESCE(s.TotalQuantity, 0)')}
+        FROM Partners_Import p
+        LEFT JOIN PartnerSalesSummary s ON s.PartnerID = p.PartnerID
+        ORDER BY p.PartnerName
+        """)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def calculate_material(self, product_type_id, material_type_id, quantity, param1, param2):
+        """
+        Рассчитывает целое количество сырья для выпуска продукции с учетом
+        коэффициента типа продукции и процента брака материала. При неверных данных -1
+        """
+        try:
+            calculator = get_material_calculator(self.db_path)
+            return calculator.calculate(product_type_id, material_type_id, quantity, param1, param2)
+        except Exception as e:
+            return INVALID
 
+    def calculate_materials_batch(self, lines):
+        """
+        Рассчитывает сырье для многих позиций за один вызов: lines - набор
+        (ProductTypeID, TypeID материала, количество, параметр 1, параметр 2)
+        """
+        try:
+            return get_material_calculator(self.db_path).calculate_batch(lines)
         except Exception as e:
             return []
 
@@ -630,94 +787,75 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute("DELETE FROM Partner_Products_Import WHERE ROWID = ?", (sale_id,))
-            conn.commit()
+            with conn:
+                cursor.execute("DELETE FROM Partner_Products_Import WHERE ROWID = ?", (sale_id,))
             rowcount = cursor.rowcount
-            conn.close()
 
             return rowcount > 0
 
         except Exception as e:
             return False
 
-    def get_sales_statistics(self, partner_inn):
+    def _query_sales_statistics(self, cursor, partner_id):
+        """Читает итоги продаж партнера из таблицы PartnerSalesSummary"""
+        # Итоги поддерживаются триггерами при каждом изменении продаж
+        query = f"""
+        SELECT SaleCount, TotalQuantity, TotalSum / 100.0,
+               {DISCOUNT_SQL.format(quantity='TotalQuantity')} AS Discount
+        FROM PartnerSalesSummary
+        WHERE PartnerID = ?
+        """
+
+        cursor.execute(query, (partner_id,))
+        stats = cursor.fetchone()
+
+        if stats:
+            return {
+                'total_sales': stats[0] if stats[0] else 0,
+                'total_quantity': stats[1] if stats[1] else 0,
+                'total_sum': stats[2] if stats[2] else 0,
+                'discount': stats[3] if stats[3] else 0
+            }
+        else:
+            return {
+                'total_sales': 0,
+                'total_quantity': 0,
+                'total_sum': 0,
+                'discount': 0
+            }
+
+    def get_sales_statistics(self, partner_inn=None, partner_id=None):
         """Получает статистику продаж партнера"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute("SELECT PartnerID FROM Partners_Import WHERE INN = ?", (partner_inn,))
-            partner_result = cursor.fetchone()
+            partner_id = self._resolve_partner_id(partner_inn, partner_id)
 
-            if not partner_result:
+            if partner_id is None:
                 return None
 
-            partner_id = partner_result[0]
-
-            query = """
-            SELECT 
-                COUNT(*) as total_sales,
-                SUM(pps.Quantity) as total_quantity,
-                SUM(pps.Quantity * CAST(REPLACE(pi.MinPartnerPrice, ',', '.') AS FLOAT)) as total_sum
-            FROM Partner_Products_Import pps
-            JOIN Products_Import pi ON pps.ProductID = pi.ROWID
-            WHERE pps.PartnerID = ?
-            """
-
-            cursor.execute(query, (partner_id,))
-            stats = cursor.fetchone()
-
-            if not stats or stats[0] == 0:
-                manual_query = """
-                SELECT 
-                    COUNT(*) as total_sales,
-                    SUM(pps.Quantity) as total_quantity,
-                    SUM(pps.Quantity * CAST(REPLACE(pi.MinPartnerPrice, ',', '.') AS FLOAT)) as total_sum
-                FROM Partner_Products_Import pps, Products_Import pi
-                WHERE pps.PartnerID = ? 
-                AND pps.ProductID = pi.ROWID
-                """
-
-                cursor.execute(manual_query, (partner_id,))
-                stats = cursor.fetchone()
-
-            conn.close()
-
-            if stats:
-                return {
-                    'total_sales': stats[0] if stats[0] else 0,
-                    'total_quantity': stats[1] if stats[1] else 0,
-                    'total_sum': stats[2] if stats[2] else 0
-                }
-            else:
-                return {
-                    'total_sales': 0,
-                    'total_quantity': 0,
-                    'total_sum': 0
-                }
+            return self._query_sales_statistics(cursor, partner_id)
 
         except Exception as e:
             return None
 
-    def get_partner_products_for_sale(self, partner_inn):
+    def get_partner_products_for_sale(self, partner_inn=None, partner_id=None):
         """Получает продукцию партнера для добавления в продажу"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute("SELECT PartnerID FROM Partners_Import WHERE INN = ?", (partner_inn,))
-            partner_result = cursor.fetchone()
+            partner_id = self._resolve_partner_id(partner_inn, partner_id)
 
-            if not partner_result:
+            if partner_id is None:
                 return []
 
-            partner_id = partner_result[0]
-
             query = """
             SELECT 
                 ROWID as ProductID,
                 ProductName, 
-                MinPartnerPrice
+                MinPartnerPrice / 100.0 AS MinPartnerPrice
             FROM Products_Import
             WHERE PartnerID = ?
             ORDER BY ProductName
@@ -736,7 +874,6 @@ class DatabaseManager:
                     if product_name and min_price is not None:
                         products.append((product_id, product_name, min_price))
 
-            conn.close()
             return products
 
         except Exception as e:
@@ -748,7 +885,7 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            current_date = datetime.now().strftime('%d.%m.%Y')
+            current_date = date.today().isoformat()
 
             query = """
             INSERT INTO Partner_Products_Import 
@@ -763,11 +900,9 @@ class DatabaseManager:
                 current_date
             )
 
-            cursor.execute(query, values)
-            sale_id = cursor.lastrowid
-            conn.commit()
+            with conn:
+                cursor.execute(query, values)
             rowcount = cursor.rowcount
-            conn.close()
 
             return rowcount > 0
 
@@ -777,12 +912,7 @@ class DatabaseManager:
     def get_partner_id_by_inn(self, inn):
         """Получает ID партнера по ИНН"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT PartnerID FROM Partners_Import WHERE INN = ?", (inn,))
-            result = cursor.fetchone()
-            conn.close()
-            return result[0] if result else None
+            return self._resolve_partner_id(inn)
         except Exception as e:
             return None
 
@@ -800,8 +930,8 @@ class DatabaseManager:
                 pps.Quantity,
                 pps.SaleDate,
                 pi.ProductName,
-                pi.MinPartnerPrice,
-                (pps.Quantity * CAST(REPLACE(pi.MinPartnerPrice, ',', '.') AS FLOAT)) AS TotalSum
+                pi.MinPartnerPrice / 100.0 AS MinPartnerPrice,
+                (pps.Quantity * pi.MinPartnerPrice) / 100.0 AS TotalSum
             FROM Partner_Products_Import pps
             JOIN Products_Import pi ON pps.ProductID = pi.ROWID
             WHERE pps.ROWID = ?
@@ -811,27 +941,7 @@ class DatabaseManager:
             sale_data = cursor.fetchone()
 
             if not sale_data:
-                alt_query = """
-                SELECT 
-                    pps.ROWID as SaleID,
-                    pps.ProductID,
-                    pps.PartnerID,
-                    pps.Quantity,
-                    pps.SaleDate,
-                    pi.ProductName,
-                    pi.MinPartnerPrice,
-                    (pps.Quantity * CAST(REPLACE(pi.MinPartnerPrice, ',', '.') AS FLOAT)) AS TotalSum
-                FROM Partner_Products_Import pps, Products_Import pi
-                WHERE pps.ROWID = ?
-                AND pps.ProductID = pi.ROWID
-                """
-
-                cursor.execute(alt_query, (sale_id,))
-                sale_data = cursor.fetchone()
-
-                if not sale_data:
-                    conn.close()
-                    return None
+                return None
 
             result = {
                 'SaleID': sale_data[0],
@@ -844,7 +954,6 @@ class DatabaseManager:
                 'TotalSum': sale_data[7]
             }
 
-            conn.close()
             return result
 
         except Exception as e:
@@ -860,10 +969,9 @@ class DatabaseManager:
             existing_sale = cursor.fetchone()
 
             if not existing_sale:
-                conn.close()
                 return False
 
-            current_date = datetime.now().strftime('%d.%m.%Y')
+            current_date = date.today().isoformat()
 
             query = """
             UPDATE Partner_Products_Import 
@@ -882,10 +990,9 @@ class DatabaseManager:
                 sale_data['SaleID']
             )
 
-            cursor.execute(query, values)
-            conn.commit()
+            with conn:
+                cursor.execute(query, values)
             rowcount = cursor.rowcount
-            conn.close()
 
             return rowcount > 0
 
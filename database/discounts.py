@@ -0,0 +1,62 @@
+# Пороги скидок по умолчанию: (минимальное количество продукции, скидка в %)
+DEFAULT_DISCOUNT_TIERS = [
+    (0, 0),
+    (10000, 5),
+    (50000, 10),
+    (300000, 15),
+]
+
+# Скидка партнера по общему количеству проданной продукции (порог включительно)
+DISCOUNT_SQL = """
+COALESCE((SELECT dt.DiscountPercent FROM DiscountTiers dt
+          WHERE dt.MinQuantity <= {quantity}
+          ORDER BY dt.MinQuantity DESC LIMIT 1), 0)
+"""
+
+
+def create_discount_tiers(cursor):
+    """Создает таблицу порогов скидок и заполняет ее значениями по умолчанию"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS DiscountTiers (
+            MinQuantity INTEGER PRIMARY KEY,
+            DiscountPercent INTEGER NOT NULL
+        )
+    ''')
+    cursor.executemany(
+        "INSERT OR IGNORE INTO DiscountTiers (MinQuantity, DiscountPercent) VALUES (?, ?)",
+        DEFAULT_DISCOUNT_TIERS)
+
+
+def discount_for_quantity(tiers, total_quantity):
+    """Возвращает скидку в % для количества продукции по списку порогов"""
+    discount = 0
+    for min_quantity, percent in sorted(tiers):
+        if total_quantity >= min_quantity:
+            discount = percent
+    return discount
+
+
+def _format_quantity(value):
+    return f"{value:,}".replace(',', ' ')
+
+
+def tier_range_text(tiers, total_quantity):
+    """Описание диапазона количества, в который попадает партнер: 'от 10 000 до 50 000'"""
+    bounds = sorted(min_quantity for min_quantity, _ in tiers)
+    if not bounds:
+        return ""
+
+    lower = None
+    upper = None
+    for bound in bounds:
+        if total_quantity >= bound:
+            lower = bound
+        else:
+            upper = bound
+            break
+
+    if not lower and upper is not None:
+        return f"до {_format_quantity(upper)}"
+    if upper is None:
+        return f"свыше {_format_quantity(lower or 0)}"
+    return f"от {_format_quantity(lower)} до {_format_quantity(upper)}"
@@ -0,0 +1,197 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date
+
+
+# Заголовки совпадают с названиями столбцов импорта, поэтому выгрузку
+# продаж можно загрузить обратно через database.importer
+HEADERS = {
+    'sales': ['ИНН', 'Наименование партнера', 'Дата продажи', 'Артикул', 'Наименование продукции',
+              'Количество продукции', 'Цена за единицу', 'Общая сумма'],
+    'partners': ['ИНН', 'Наименование партнера', 'Тип партнера', 'Директор', 'Телефон партнера',
+                 'Электронная почта партнера', 'Рейтинг', 'Количество продаж', 'Продано продукции',
+                 'Сумма продаж', 'Скидка, %'],
+}
+
+KIND_NAMES = {
+    'sales': 'Продажи',
+    'partners': 'Отчет по партнерам',
+}
+
+# Номер столбца с датой продажи в строках выгрузки продаж
+_SALE_DATE_COLUMN = 2
+
+DEFAULT_BATCH_SIZE = 1000
+PROGRESS_STEP = 5000
+
+
+class ExportFileError(Exception):
+    """Ошибка, из-за которой выгрузку нельзя записать"""
+
+
+class _CsvWriter:
+    def __init__(self, path, header):
+        # utf-8-sig и ';' - файл сразу открывается в Excel с русскими буквами
+        self.file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.file, delimiter=';')
+        self.writer.writerow(header)
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path, header):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ExportFileError("Для выгрузки в XLSX нужен пакет openpyxl (pip install openpyxl)")
+
+        self.path = path
+        # write_only - строки сразу сбрасываются во временный файл, а не копятся в памяти
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.sheet.append(header)
+
+    def write(self, row):
+        self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+def _open_writer(path, header):
+    if path.lower().endswith('.xlsx'):
+        return _XlsxWriter(path, header)
+    return _CsvWriter(path, header)
+
+
+def export_rows(rows, header, path, progress=None, cancelled=None, kind=None):
+    """
+    Записывает строки из итератора rows в CSV или XLSX (по расширению path).
+    Строки не накапливаются: каждая пишется в файл сразу после чтения.
+    progress(записано строк) вызывается каждые PROGRESS_STEP строк, cancelled() прерывает
+    выгрузку. Файл пишется под временным именем и появляется только после успешной записи.
+    """
+    started = time.perf_counter()
+    temp_path = path + '.part'
+    result = {'kind': kind, 'path': path, 'rows': 0, 'cancelled': False}
+
+    try:
+        writer = _open_writer(temp_path, header)
+    except OSError as e:
+        raise ExportFileError(f"Не удалось создать файл {path}: {e}")
+
+    try:
+        for row in rows:
+            writer.write(row)
+            result['rows'] += 1
+            if result['rows'] % PROGRESS_STEP == 0:
+                if progress is not None:
+                    progress(result['rows'])
+                if cancelled is not None and cancelled():
+                    result['cancelled'] = True
+                    break
+        writer.close()
+    except BaseException:
+        writer.close()
+        os.remove(temp_path)
+        raise
+
+    if result['cancelled']:
+        os.remove(temp_path)
+    else:
+        os.replace(temp_path, path)
+        if progress is not None:
+            progress(result['rows'])
+
+    seconds = time.perf_counter() - started
+    result['seconds'] = seconds
+    result['rows_per_second'] = result['rows'] / seconds if seconds > 0 else 0
+    return result
+
+
+def _xlsx_sales(rows):
+    """В XLSX дата продажи записывается датой, чтобы Excel мог ее сортировать и фильтровать"""
+    for row in rows:
+        row = list(row)
+        try:
+            row[_SALE_DATE_COLUMN] = date.fromisoformat(row[_SALE_DATE_COLUMN])
+        except (TypeError, ValueError):
+            # Дату, которую миграция не смогла перевести в ISO, выгружаем текстом
+            pass
+        yield row
+
+
+def export_sales(db_manager, path, partner_inn=None, date_from=None, date_to=None,
+                 progress=None, cancelled=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Выгружает продажи одного партнера (partner_inn) или всех партнеров
+    за период date_from..date_to (включительно, границы необязательны)
+    """
+    rows = db_manager.iter_sales_export(partner_inn, date_from, date_to, batch_size)
+    if path.lower().endswith('.xlsx'):
+        rows = _xlsx_sales(rows)
+    result = export_rows(rows, HEADERS['sales'], path, progress, cancelled, kind='sales')
+    result['partner_inn'] = partner_inn
+    return result
+
+
+def export_partner_report(db_manager, path, progress=None, cancelled=None,
+                          batch_size=DEFAULT_BATCH_SIZE):
+    """Выгружает отчет по всем партнерам: реквизиты, итоги продаж и скидка"""
+    rows = db_manager.iter_partner_report(batch_size)
+    return export_rows(rows, HEADERS['partners'], path, progress, cancelled, kind='partners')
+
+
+def format_result(result):
+    """Текстовый отчет о выгрузке"""
+    if result['cancelled']:
+        return f"Выгрузка прервана пользователем после {result['rows']} строк, файл не сохранен"
+    return '\n'.join([
+        f"{KIND_NAMES[result['kind']]}: выгружено строк {result['rows']}",
+        f"Время: {result['seconds']:.1f} с ({result['rows_per_second']:,.0f} строк/с)".replace(',', ' '),
+        f"Файл: {result['path']}",
+    ])
+
+
+def main(argv=None):
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Выгрузка продаж и отчета по партнерам в CSV/XLSX")
+    parser.add_argument('kind', choices=sorted(HEADERS), help="вид выгрузки")
+    parser.add_argument('path', help="файл CSV или XLSX")
+    parser.add_argument('--db', default='database/masterpol.db', help="файл базы данных")
+    parser.add_argument('--inn', help="ИНН партнера (по умолчанию - все партнеры)")
+    parser.add_argument('--from', dest='date_from', help="начало периода, yyyy-mm-dd")
+    parser.add_argument('--to', dest='date_to', help="конец периода, yyyy-mm-dd")
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(args.db)
+    progress = lambda rows: print(f"  выгружено строк: {rows}", end='\r')
+    try:
+        if args.kind == 'sales':
+            result = export_sales(db_manager, args.path, args.inn, args.date_from, args.date_to,
+                                  progress=progress)
+        else:
+            result = export_partner_report(db_manager, args.path, progress=progress)
+    except (ExportFileError, ValueError) as e:
+        print(f"Ошибка выгрузки: {e}")
+        return 1
+    finally:
+        db_manager.connection_manager.close_all()
+
+    print()
+    print(format_result(result))
+    return 0
+
+
+if __name__ == "__main__":
+    # python -m database.exporter sales продажи.xlsx --inn 2222455179 --from 2023-01-01
+    sys.exit(main())
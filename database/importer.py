@@ -0,0 +1,420 @@
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from database.conversions import price_to_kopecks, sale_date_to_iso
+
+
+# Допустимые заголовки столбцов: имя поля в базе и названия из файлов выгрузки
+COLUMNS = {
+    'partners': {
+        'PartnerType': ['Тип партнера'],
+        'PartnerName': ['Наименование партнера'],
+        'Director': ['Директор'],
+        'Email': ['Электронная почта партнера', 'Email'],
+        'Phone': ['Телефон партнера', 'Телефон'],
+        'LegalAddress': ['Юридический адрес партнера', 'Адрес'],
+        'INN': ['ИНН'],
+        'Rating': ['Рейтинг'],
+    },
+    'products': {
+        'ProductTypeID': ['Тип продукции'],
+        'ProductName': ['Наименование продукции'],
+        'ArticleNumber': ['Артикул'],
+        'MinPartnerPrice': ['Минимальная стоимость для партнера', 'Мин. стоимость'],
+        'INN': ['ИНН', 'ИНН партнера'],
+    },
+    'sales': {
+        'INN': ['ИНН', 'ИНН партнера'],
+        'ArticleNumber': ['Артикул'],
+        'Quantity': ['Количество продукции', 'Количество'],
+        'SaleDate': ['Дата продажи'],
+    },
+}
+
+REQUIRED = {
+    'partners': ['PartnerType', 'PartnerName', 'Director', 'Email', 'Phone', 'LegalAddress', 'INN', 'Rating'],
+    'products': ['ProductTypeID', 'ProductName', 'ArticleNumber', 'MinPartnerPrice'],
+    'sales': ['INN', 'ArticleNumber', 'Quantity', 'SaleDate'],
+}
+
+KIND_NAMES = {
+    'partners': 'Партнеры',
+    'products': 'Продукция',
+    'sales': 'Продажи',
+}
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Ограничение SQLite на число параметров в одном запросе (с запасом)
+_MAX_PARAMS = 500
+
+
+class ImportFileError(Exception):
+    """Ошибка, из-за которой файл нельзя импортировать целиком"""
+
+
+def _text(value):
+    """Значение ячейки как строка: числа из XLSX без '.0', пустые ячейки - ''"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return str(value).strip()
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        sample = file.read(4096)
+        file.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(file, dialect)
+        for row in reader:
+            yield row
+
+
+def _read_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("Для импорта файлов XLSX нужен пакет openpyxl (pip install openpyxl)")
+
+    # read_only - строки читаются потоком, книга целиком в память не загружается
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def read_rows(path):
+    """Построчно читает CSV или XLSX; первая строка - заголовки"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        return _read_xlsx(path)
+    return _read_csv(path)
+
+
+def _map_header(kind, header):
+    """Возвращает {поле: номер столбца} по строке заголовков"""
+    names = {}
+    for field, aliases in COLUMNS[kind].items():
+        for alias in [field] + aliases:
+            names[alias.strip().lower()] = field
+
+    mapping = {}
+    for position, title in enumerate(header):
+        field = names.get(_text(title).lower())
+        if field and field not in mapping:
+            mapping[field] = position
+
+    missing = [field for field in REQUIRED[kind] if field not in mapping]
+    if missing:
+        raise ImportFileError(f"В файле нет обязательных столбцов: {', '.join(missing)}")
+    return mapping
+
+
+class _Importer:
+    """Проверяет и вставляет строки одного вида данных пачками"""
+
+    def __init__(self, conn, kind):
+        self.conn = conn
+        self.kind = kind
+        self.cursor = conn.cursor()
+        self.partner_ids = {}
+        self.product_ids = {}
+        self.product_types = None
+        self.seen_keys = set()
+        self.next_id = None
+
+    # Пакетное сопоставление ключей с идентификаторами
+
+    def _lookup(self, cache, query, keys):
+        """Дозагружает в cache значения для ключей, которых в нем еще нет"""
+        missing = list({key for key in keys if key and key not in cache})
+        for start in range(0, len(missing), _MAX_PARAMS):
+            chunk = missing[start:start + _MAX_PARAMS]
+            placeholders = ', '.join('?' * len(chunk))
+            self.cursor.execute(query.format(placeholders=placeholders), chunk)
+            cache.update(self.cursor.fetchall())
+
+    def _resolve_partners(self, inns):
+        self._lookup(self.partner_ids,
+                     "SELECT INN, PartnerID FROM Partners_Import WHERE INN IN ({placeholders})", inns)
+
+    def _resolve_products(self, articles):
+        self._lookup(self.product_ids,
+                     "SELECT ArticleNumber, ROWID FROM Products_Import WHERE ArticleNumber IN ({placeholders})",
+                     articles)
+
+    def _product_type_id(self, value):
+        """Тип продукции из файла: номер или название из Product_Type_Import"""
+        if value.isdigit():
+            return value
+        if self.product_types is None:
+            self.cursor.execute("SELECT ProductTypeName, ProductTypeID FROM Product_Type_Import")
+            self.product_types = {name.lower(): str(type_id) for name, type_id in self.cursor.fetchall()}
+        type_id = self.product_types.get(value.lower())
+        if type_id is None:
+            raise ValueError(f"неизвестный тип продукции '{value}'")
+        return type_id
+
+    def _next_id(self, table, column):
+        if self.next_id is None:
+            self.cursor.execute(f"SELECT MAX({column}) FROM {table}")
+            self.next_id = (self.cursor.fetchone()[0] or 0) + 1
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+    # Проверка строк
+
+    def prepare(self, records):
+        """Проверяет пачку строк, возвращает (значения для вставки, отклоненные строки)"""
+        if self.kind == 'partners':
+            self._resolve_partners(record['INN'] for _, record in records)
+        elif self.kind == 'products':
+            self._resolve_products(record['ArticleNumber'] for _, record in records)
+            self._resolve_partners(record.get('INN') for _, record in records)
+        else:
+            self._resolve_partners(record['INN'] for _, record in records)
+            self._resolve_products(record['ArticleNumber'] for _, record in records)
+
+        values = []
+        rejected = []
+        for line_number, record in records:
+            try:
+                values.append(getattr(self, f'_prepare_{self.kind}')(record))
+            except ValueError as e:
+                rejected.append((line_number, str(e)))
+        return values, rejected
+
+    def _required(self, record):
+        for field in REQUIRED[self.kind]:
+            if not record.get(field):
+                raise ValueError(f"не заполнено поле {field}")
+
+    def _prepare_partners(self, record):
+        self._required(record)
+        inn = record['INN']
+        if not inn.isdigit():
+            raise ValueError(f"некорректный ИНН '{inn}'")
+        if inn in self.partner_ids or inn in self.seen_keys:
+            raise ValueError(f"партнер с ИНН {inn} уже существует")
+        try:
+            rating = int(float(record['Rating'].replace(',', '.')))
+        except ValueError:
+            raise ValueError(f"некорректный рейтинг '{record['Rating']}'")
+        if rating < 0:
+            raise ValueError(f"некорректный рейтинг '{record['Rating']}'")
+
+        self.seen_keys.add(inn)
+        return (self._next_id('Partners_Import', 'PartnerID'), record['PartnerType'], record['PartnerName'],
+                record['Director'], record['Phone'], record['Email'], record['LegalAddress'], inn, rating)
+
+    def _prepare_products(self, record):
+        self._required(record)
+        article = record['ArticleNumber']
+        if article in self.product_ids or article in self.seen_keys:
+            raise ValueError(f"продукт с артикулом {article} уже существует")
+        price = price_to_kopecks(record['MinPartnerPrice'])
+        if price < 0:
+            raise ValueError("отрицательная цена")
+
+        partner_id = None
+        inn = record.get('INN')
+        if inn:
+            partner_id = self.partner_ids.get(inn)
+            if partner_id is None:
+                raise ValueError(f"партнер с ИНН {inn} не найден")
+        product_type_id = self._product_type_id(record['ProductTypeID'])
+
+        self.seen_keys.add(article)
+        return (self._next_id('Products_Import', 'ProductID'), product_type_id,
+                record['ProductName'], article, price, partner_id)
+
+    def _prepare_sales(self, record):
+        self._required(record)
+        partner_id = self.partner_ids.get(record['INN'])
+        if partner_id is None:
+            raise ValueError(f"партнер с ИНН {record['INN']} не найден")
+        product_id = self.product_ids.get(record['ArticleNumber'])
+        if product_id is None:
+            raise ValueError(f"продукт с артикулом {record['ArticleNumber']} не найден")
+        try:
+            quantity = float(record['Quantity'].replace(',', '.'))
+        except ValueError:
+            raise ValueError(f"некорректное количество '{record['Quantity']}'")
+        # Дробное количество ('2,7') - ошибка в файле, а не повод отбросить дробную часть
+        if not quantity.is_integer() or quantity <= 0:
+            raise ValueError(f"некорректное количество '{record['Quantity']}'")
+
+        return (product_id, partner_id, int(quantity), sale_date_to_iso(record['SaleDate']))
+
+    # Вставка
+
+    INSERTS = {
+        'partners': '''
+            INSERT INTO Partners_Import
+            (PartnerID, PartnerType, PartnerName, Director, Phone, Email, LegalAddress, INN, Rating)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        'products': '''
+            INSERT INTO Products_Import
+            (ProductID, ProductTypeID, ProductName, ArticleNumber, MinPartnerPrice, PartnerID)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''',
+        'sales': '''
+            INSERT INTO Partner_Products_Import (ProductID, PartnerID, Quantity, SaleDate)
+            VALUES (?, ?, ?, ?)
+        ''',
+    }
+
+    def insert(self, values):
+        """Вставляет пачку одной транзакцией"""
+        if not values:
+            return
+        with self.conn:
+            self.cursor.executemany(self.INSERTS[self.kind], values)
+        if self.kind == 'partners':
+            self.partner_ids.update((row[7], row[0]) for row in values)
+
+
+class _RejectWriter:
+    """Файл отклоненных строк: исходные значения и причина. Создается при первой ошибке"""
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+        self.file = None
+        self.writer = None
+
+    def write(self, row, reason):
+        if self.writer is None:
+            self.file = open(self.path, 'w', newline='', encoding='utf-8-sig')
+            self.writer = csv.writer(self.file, delimiter=';')
+            self.writer.writerow([_text(title) for title in self.header] + ['Ошибка'])
+        self.writer.writerow([_text(value) for value in row] + [reason])
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def import_file(conn, kind, path, batch_size=DEFAULT_BATCH_SIZE, reject_path=None,
+                progress=None, cancelled=None):
+    """
+    Импортирует партнеров, продукцию или продажи (kind) из CSV/XLSX.
+    Строки читаются потоком и вставляются пачками по batch_size в отдельных транзакциях.
+    progress(обработано строк) вызывается после каждой пачки, cancelled() прерывает импорт.
+    Возвращает словарь с итогами импорта.
+    """
+    if kind not in COLUMNS:
+        raise ImportFileError(f"Неизвестный вид данных: {kind}")
+    if reject_path is None:
+        reject_path = os.path.splitext(path)[0] + '.rejects.csv'
+
+    started = time.perf_counter()
+    rows = read_rows(path)
+    header = next(rows, None)
+    if header is None:
+        raise ImportFileError("Файл пуст")
+    mapping = _map_header(kind, header)
+
+    importer = _Importer(conn, kind)
+    rejects = _RejectWriter(reject_path, header)
+    result = {'kind': kind, 'total': 0, 'imported': 0, 'rejected': 0, 'cancelled': False}
+
+    def flush(batch):
+        values, rejected = importer.prepare([(number, record) for number, record, _ in batch])
+        importer.insert(values)
+        raw_rows = {number: raw for number, _, raw in batch}
+        for number, reason in rejected:
+            rejects.write(raw_rows[number], f"строка {number}: {reason}")
+        result['imported'] += len(values)
+        result['rejected'] += len(rejected)
+        if progress is not None:
+            progress(result['total'])
+
+    try:
+        batch = []
+        # Нумерация как в файле: первая строка - заголовки
+        for line_number, raw in enumerate(rows, start=2):
+            if not any(_text(value) for value in raw):
+                continue
+            record = {field: _text(raw[position]) if position < len(raw) else ''
+                      for field, position in mapping.items()}
+            batch.append((line_number, record, raw))
+            result['total'] += 1
+
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+                if cancelled is not None and cancelled():
+                    result['cancelled'] = True
+                    break
+
+        if batch and not result['cancelled']:
+            flush(batch)
+    finally:
+        rejects.close()
+
+    seconds = time.perf_counter() - started
+    result['seconds'] = seconds
+    result['rows_per_second'] = result['total'] / seconds if seconds > 0 else 0
+    result['reject_path'] = reject_path if result['rejected'] else None
+    return result
+
+
+def format_result(result):
+    """Текстовый отчет об импорте"""
+    lines = [
+        f"{KIND_NAMES[result['kind']]}: обработано строк {result['total']}, "
+        f"загружено {result['imported']}, отклонено {result['rejected']}",
+        f"Время: {result['seconds']:.1f} с ({result['rows_per_second']:,.0f} строк/с)".replace(',', ' '),
+    ]
+    if result['reject_path']:
+        lines.append(f"Отклоненные строки: {result['reject_path']}")
+    if result['cancelled']:
+        lines.append("Импорт прерван пользователем")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    from database.migrations import migrate
+
+    parser = argparse.ArgumentParser(description="Импорт партнеров, продукции и продаж из CSV/XLSX")
+    parser.add_argument('kind', choices=sorted(COLUMNS), help="вид данных")
+    parser.add_argument('path', help="файл CSV или XLSX")
+    parser.add_argument('--db', default='database/masterpol.db', help="файл базы данных")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--rejects', help="файл для отклоненных строк")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        migrate(conn)
+        result = import_file(conn, args.kind, args.path, args.batch_size, args.rejects,
+                             progress=lambda total: print(f"  обработано строк: {total}", end='\r'))
+    except ImportFileError as e:
+        print(f"Ошибка импорта: {e}")
+        return 1
+    finally:
+        conn.close()
+
+    print()
+    print(format_result(result))
+    return 0
+
+
+if __name__ == "__main__":
+    # python -m database.importer sales продажи.csv --db database/masterpol.db
+    sys.exit(main())
@@ -0,0 +1,298 @@
+import collections
+import functools
+import os
+import threading
+import time
+import types
+from datetime import datetime
+from database.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Верхние границы интервалов гистограммы времени выполнения, мс
+HISTOGRAM_BOUNDS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+# Вызовы дольше порога попадают в журнал медленных запросов вместе с планами
+SLOW_THRESHOLD_ENV = 'MASTERPOL_SLOW_QUERY_MS'
+DEFAULT_SLOW_THRESHOLD_MS = 200
+
+SLOW_LOG_SIZE = 50
+
+# Сбор статистики включается переменной MASTERPOL_INSTRUMENTATION=1 или в окне диагностики.
+# Выключенный сбор ничего не стоит: методы вызываются напрямую, а у соединений
+# нет функции трассировки, которую SQLite вызывал бы на каждый запрос
+ENABLED_ENV = 'MASTERPOL_INSTRUMENTATION'
+
+# Сколько последних запросов одного вызова хранится для журнала медленных запросов
+MAX_TRACED_STATEMENTS = 20
+
+_PLAN_KEYWORDS = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+# Флаг генераторной функции в co_flags (inspect.CO_GENERATOR). Модуль inspect
+# не импортируется: он тянет ast и linecache и замедляет запуск консольных команд
+_CO_GENERATOR = 0x20
+
+
+class MethodStats:
+    """Число вызовов, ошибок, возвращенных строк и гистограмма времени одного метода"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        # Последний интервал - все, что дольше последней границы
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, seconds, rows, failed):
+        self.calls += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        if failed:
+            self.errors += 1
+        if rows:
+            self.rows += rows
+
+        milliseconds = seconds * 1000
+        for position, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if milliseconds <= bound:
+                self.histogram[position] += 1
+                return
+        self.histogram[-1] += 1
+
+    def percentile_ms(self, fraction):
+        """Оценка перцентиля по гистограмме: верхняя граница интервала"""
+        needed = self.calls * fraction
+        seen = 0
+        for position, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= needed:
+                if position < len(HISTOGRAM_BOUNDS_MS):
+                    return HISTOGRAM_BOUNDS_MS[position]
+                return self.max_seconds * 1000
+        return 0
+
+
+class Instrumentation:
+    """
+    Статистика вызовов методов DatabaseManager и AuthManager и журнал медленных
+    вызовов. Текст запросов собирается через set_trace_callback соединения
+    (только пока сбор включен), а планы запрашиваются только для медленных вызовов.
+    """
+
+    def __init__(self, slow_threshold_ms=None, enabled=None):
+        if slow_threshold_ms is None:
+            slow_threshold_ms = float(os.environ.get(SLOW_THRESHOLD_ENV, DEFAULT_SLOW_THRESHOLD_MS))
+        if enabled is None:
+            enabled = os.environ.get(ENABLED_ENV, '0') not in ('', '0')
+        self.slow_threshold_ms = slow_threshold_ms
+        # Менеджер соединений сверяет с флагом трассировку соединения при его выдаче
+        self.enabled = enabled
+        self.started = datetime.now()
+        self._stats = {}
+        self._slow_log = collections.deque(maxlen=SLOW_LOG_SIZE)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # Сбор запросов текущего вызова
+
+    def trace(self, statement):
+        """Функция для conn.set_trace_callback: запоминает запросы выполняющегося метода"""
+        calls = getattr(self._local, 'calls', None)
+        if calls:
+            statements = calls[-1]
+            statements.append((time.perf_counter(), statement))
+            if len(statements) > MAX_TRACED_STATEMENTS:
+                del statements[0]
+
+    def _enter(self):
+        calls = getattr(self._local, 'calls', None)
+        if calls is None:
+            calls = self._local.calls = []
+        calls.append([])
+
+    def _leave(self):
+        calls = self._local.calls
+        statements = calls.pop()
+        if calls:
+            # Запросы вложенного вызова относятся и к внешнему
+            calls[-1].extend(statements)
+            del calls[-1][:-MAX_TRACED_STATEMENTS]
+        return statements
+
+    # Учет вызовов
+
+    def record(self, name, seconds, rows=None, failed=False, statements=None, connection_manager=None,
+               check_slow=True):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = MethodStats()
+            stats.add(seconds, rows, failed)
+
+        if check_slow and seconds * 1000 >= self.slow_threshold_ms:
+            self._log_slow_call(name, seconds, statements or [], connection_manager)
+
+    def _log_slow_call(self, name, seconds, statements, connection_manager):
+        finished = time.perf_counter()
+        conn = connection_manager.get_connection() if connection_manager is not None else None
+        queries = []
+        for position, (started, sql) in enumerate(statements):
+            # Время запроса - до начала следующего запроса или до конца вызова
+            ended = statements[position + 1][0] if position + 1 < len(statements) else finished
+            queries.append({
+                'sql': ' '.join(sql.split()),
+                'seconds': ended - started,
+                'plan': _explain(conn, sql),
+            })
+
+        entry = {'method': name, 'seconds': seconds, 'time': datetime.now(), 'queries': queries}
+        with self._lock:
+            self._slow_log.append(entry)
+        logger.warning("Медленный вызов %s: %.0f мс, запросов: %d", name, seconds * 1000, len(queries))
+
+    def wrap(self, name, function):
+        """Оборачивает метод: время, число строк результата и ошибки каждого вызова"""
+        instrumentation = self
+
+        if function.__code__.co_flags & _CO_GENERATOR:
+            @functools.wraps(function)
+            def generator_wrapper(self, *args, **kwargs):
+                if not instrumentation.enabled:
+                    yield from function(self, *args, **kwargs)
+                    return
+                # Генератор учитывается целиком, от первой до последней строки. Это время
+                # включает обработку строк вызывающим, поэтому в журнал медленных он не попадает
+                rows = 0
+                failed = True
+                started = time.perf_counter()
+                try:
+                    for row in function(self, *args, **kwargs):
+                        rows += 1
+                        yield row
+                    failed = False
+                except GeneratorExit:
+                    # Вызывающий прекратил чтение (отмена выгрузки или отчета) - это не ошибка
+                    failed = False
+                    raise
+                finally:
+                    instrumentation.record(name, time.perf_counter() - started, rows, failed,
+                                           check_slow=False)
+            return generator_wrapper
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            if not instrumentation.enabled:
+                return function(self, *args, **kwargs)
+            instrumentation._enter()
+            failed = True
+            result = None
+            started = time.perf_counter()
+            try:
+                result = function(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                seconds = time.perf_counter() - started
+                statements = instrumentation._leave()
+                instrumentation.record(name, seconds, _count_rows(result), failed, statements,
+                                       getattr(self, 'connection_manager', None))
+        return wrapper
+
+    # Отчеты
+
+    def get_stats(self):
+        """Копия статистики: {имя метода: MethodStats}"""
+        with self._lock:
+            return {name: _copy_stats(stats) for name, stats in self._stats.items()}
+
+    def get_slow_log(self):
+        with self._lock:
+            return list(self._slow_log)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow_log.clear()
+            self.started = datetime.now()
+
+
+def _copy_stats(stats):
+    copy = MethodStats()
+    copy.__dict__.update(stats.__dict__)
+    copy.histogram = list(stats.histogram)
+    return copy
+
+
+def _count_rows(result):
+    """Число строк в результате метода: список строк или словарь со списками"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(value) for value in result.values() if isinstance(value, list))
+    return None
+
+
+def _explain(conn, sql):
+    if conn is None or sql.lstrip().split(None, 1)[0].upper() not in _PLAN_KEYWORDS:
+        return []
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    except Exception as e:
+        return [f"план недоступен: {e}"]
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation():
+    """Возвращает общий для процесса сборщик статистики"""
+    return _instrumentation
+
+
+def instrumented(cls):
+    """
+    Декоратор класса: учитывает вызовы всех публичных методов.
+    get_connection не учитывается - он вызывается внутри каждого метода.
+    """
+    for name, function in list(vars(cls).items()):
+        if name.startswith('_') or name == 'get_connection' or not isinstance(function, types.FunctionType):
+            continue
+        setattr(cls, name, _instrumentation.wrap(f"{cls.__name__}.{name}", function))
+    return cls
+
+
+def format_report(instrumentation=None):
+    """Текстовый отчет: статистика методов и журнал медленных вызовов"""
+    instrumentation = instrumentation or _instrumentation
+    stats = instrumentation.get_stats()
+    lines = [
+        f"Статистика с {instrumentation.started:%d.%m.%Y %H:%M:%S}, "
+        f"порог медленного вызова {instrumentation.slow_threshold_ms:.0f} мс"
+        + ("" if instrumentation.enabled else " (сбор выключен)"),
+        "",
+        f"{'Метод':<55} {'вызовов':>8} {'ошибок':>7} {'строк':>9} "
+        f"{'сред. мс':>9} {'p95 мс':>8} {'макс. мс':>9}",
+    ]
+    for name, method in sorted(stats.items(), key=lambda item: -item[1].total_seconds):
+        average = method.total_seconds / method.calls * 1000 if method.calls else 0
+        lines.append(f"{name:<55} {method.calls:>8} {method.errors:>7} {method.rows:>9} "
+                     f"{average:>9.2f} {method.percentile_ms(0.95):>8.0f} {method.max_seconds * 1000:>9.1f}")
+
+    lines += ["", "Гистограмма времени вызовов (мс): " +
+              " | ".join(f"≤{bound}" for bound in HISTOGRAM_BOUNDS_MS) + f" | >{HISTOGRAM_BOUNDS_MS[-1]}"]
+    for name, method in sorted(stats.items()):
+        lines.append(f"{name:<55} " + " ".join(f"{count:>6}" for count in method.histogram))
+
+    slow_log = instrumentation.get_slow_log()
+    lines += ["", f"Медленные вызовы: {len(slow_log)}"]
+    for entry in slow_log:
+        lines.append(f"{entry['time']:%H:%M:%S} {entry['method']}: {entry['seconds'] * 1000:.0f} мс")
+        for query in entry['queries']:
+            lines.append(f"    ≈{query['seconds'] * 1000:.1f} мс  {query['sql']}")
+            for detail in query['plan']:
+                lines.append(f"        {detail}")
+    return '\n'.join(lines)
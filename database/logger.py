@@ -0,0 +1,77 @@
+import logging
+import os
+import sys
+
+
+# Все журналы приложения - потомки этого, уровень и вывод настраиваются в одном месте
+ROOT_LOGGER = 'masterpol'
+
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+# Переменные окружения: MASTERPOL_LOG_LEVEL=DEBUG, MASTERPOL_LOG_FILE=masterpol.log
+LEVEL_ENV = 'MASTERPOL_LOG_LEVEL'
+FILE_ENV = 'MASTERPOL_LOG_FILE'
+
+DEFAULT_LEVEL = logging.WARNING
+MAX_LOG_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+# Для событий по каждой строке результата в журнал пишется каждая N-я строка
+ROW_SAMPLE_EVERY = 100
+
+# Пока журнал не настроен, сообщения никуда не выводятся (и не форматируются)
+logging.getLogger(ROOT_LOGGER).addHandler(logging.NullHandler())
+
+
+def get_logger(name):
+    """Возвращает журнал модуля: get_logger(__name__) -> 'masterpol.database.db_manager'"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def configure_logging(level=None, log_file=None):
+    """
+    Настраивает журнал приложения. Уровень и файл берутся из аргументов или
+    из переменных окружения. Файл журнала ротируется по размеру MAX_LOG_BYTES.
+    В собранном exe без консоли сообщения пишутся только в файл.
+    """
+    level = level or os.environ.get(LEVEL_ENV) or DEFAULT_LEVEL
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = DEFAULT_LEVEL
+    log_file = log_file or os.environ.get(FILE_ENV)
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    if sys.stderr is not None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    if log_file:
+        # logging.handlers нужен только для файла журнала
+        from logging.handlers import RotatingFileHandler
+        handler = RotatingFileHandler(
+            log_file, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    return logger
+
+
+def log_rows(logger, title, rows, every=ROW_SAMPLE_EVERY):
+    """
+    Пишет в журнал (уровень DEBUG) число строк и каждую every-ю строку.
+    При выключенном DEBUG не делает ничего, даже не перебирает строки.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("%s: %d строк", title, len(rows))
+    for number in range(0, len(rows), every):
+        logger.debug("%s [%d]: %r", title, number, rows[number])
@@ -0,0 +1,158 @@
+import argparse
+import math
+import os
+import sys
+import threading
+from database.connection import get_connection_manager
+
+
+# Результат расчета для несуществующих типов и неверных входных данных
+INVALID = -1
+
+# Число знаков, до которого округляется произведение перед округлением вверх:
+# убирает погрешность float (2.35 * 100 = 235.00000000000003 -> 235, а не 236)
+_PRECISION = 9
+
+# Ограничение SQLite на число параметров в одном запросе (с запасом)
+_MAX_PARAMS = 500
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _type_ids(key):
+    """Пара (ProductTypeID, TypeID) целыми числами или None, если идентификатор неверный"""
+    try:
+        return int(key[0]), int(key[1])
+    except (TypeError, ValueError):
+        return None
+
+
+class MaterialCalculator:
+    """
+    Расчет количества сырья: количество продукции * параметр 1 * параметр 2 *
+    коэффициент типа продукции, увеличенное на процент брака материала и
+    округленное вверх до целого. Для неверных данных результат -1.
+    Множители коэффициент * (1 + брак) для всех пар типов пакета читаются
+    из базы одним запросом и кэшируются.
+    """
+
+    def __init__(self, connection_manager):
+        self.connection_manager = connection_manager
+        # (ProductTypeID, TypeID материала) -> множитель или None, если такого типа нет
+        self._factors = {}
+        self._lock = threading.Lock()
+
+    def _load_factors(self, keys):
+        """Дочитывает множители для пар типов, которых еще нет в кэше"""
+        missing = {key: _type_ids(key) for key in keys if key not in self._factors}
+        if not missing:
+            return
+        valid = [ids for ids in missing.values() if ids is not None]
+        product_ids = sorted({product_type_id for product_type_id, _ in valid})
+        material_ids = sorted({material_type_id for _, material_type_id in valid})
+
+        found = {}
+        cursor = self.connection_manager.get_connection().cursor()
+        # Множители считаются в SQL для всех сочетаний нужных типов сразу;
+        # справочники малы, обычно это один запрос на весь пакет
+        half = _MAX_PARAMS // 2
+        for product_start in range(0, len(product_ids), half):
+            product_chunk = product_ids[product_start:product_start + half]
+            for material_start in range(0, len(material_ids), half):
+                material_chunk = material_ids[material_start:material_start + half]
+                cursor.execute(f"""
+                    SELECT pt.ProductTypeID, mt.TypeID,
+                           pt.ProductTypeCoefficient * (1 + mt.DefectPercentage)
+                    FROM Product_Type_Import pt, Material_Types_Import mt
+                    WHERE pt.ProductTypeID IN ({', '.join('?' * len(product_chunk))})
+                      AND mt.TypeID IN ({', '.join('?' * len(material_chunk))})
+                      AND pt.ProductTypeCoefficient > 0 AND mt.DefectPercentage >= 0
+                """, product_chunk + material_chunk)
+                found.update(((int(product_type_id), int(material_type_id)), float(factor))
+                             for product_type_id, material_type_id, factor in cursor.fetchall())
+
+        with self._lock:
+            for key, ids in missing.items():
+                self._factors[key] = found.get(ids)
+
+    def calculate(self, product_type_id, material_type_id, quantity, param1, param2):
+        """Количество сырья для одной позиции или -1"""
+        return self.calculate_batch([(product_type_id, material_type_id, quantity, param1, param2)])[0]
+
+    def calculate_batch(self, lines):
+        """
+        Расчет для многих позиций сразу: lines - итерируемый набор
+        (ProductTypeID, TypeID материала, количество, параметр 1, параметр 2).
+        Возвращает список результатов в том же порядке.
+        """
+        lines = lines if isinstance(lines, list) else list(lines)
+        self._load_factors({(line[0], line[1]) for line in lines})
+
+        factors = self._factors
+        results = []
+        append = results.append
+        for product_type_id, material_type_id, quantity, param1, param2 in lines:
+            factor = factors[(product_type_id, material_type_id)]
+            if (factor is None
+                    or not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0
+                    or not _is_number(param1) or param1 <= 0
+                    or not _is_number(param2) or param2 <= 0):
+                append(INVALID)
+                continue
+            append(math.ceil(round(quantity * param1 * param2 * factor, _PRECISION)))
+        return results
+
+    def total(self, lines):
+        """Общая потребность в сырье по позициям; позиции с неверными данными пропускаются"""
+        return sum(result for result in self.calculate_batch(lines) if result != INVALID)
+
+
+_calculators = {}
+_calculators_lock = threading.Lock()
+
+
+def get_material_calculator(db_path):
+    """
+    Возвращает общий калькулятор для файла базы данных. Множители пар типов
+    читаются из базы при первой встрече и кэшируются до invalidate_material_calculator
+    """
+    key = os.path.abspath(db_path)
+    with _calculators_lock:
+        calculator = _calculators.get(key)
+        if calculator is None:
+            calculator = MaterialCalculator(get_connection_manager(db_path))
+            _calculators[key] = calculator
+        return calculator
+
+
+def invalidate_material_calculator(db_path=None):
+    """Сбрасывает загруженные коэффициенты (например, после изменения справочников)"""
+    with _calculators_lock:
+        if db_path is None:
+            _calculators.clear()
+        else:
+            _calculators.pop(os.path.abspath(db_path), None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Расчет количества сырья для производства продукции")
+    parser.add_argument('product_type', type=int, help="ProductTypeID")
+    parser.add_argument('material_type', type=int, help="TypeID материала")
+    parser.add_argument('quantity', type=int, help="количество продукции")
+    parser.add_argument('param1', type=float, help="первый параметр продукции")
+    parser.add_argument('param2', type=float, help="второй параметр продукции")
+    parser.add_argument('--db', default='database/masterpol.db', help="файл базы данных")
+    args = parser.parse_args(argv)
+
+    calculator = get_material_calculator(args.db)
+    result = calculator.calculate(args.product_type, args.material_type, args.quantity,
+                                  args.param1, args.param2)
+    print(result)
+    return 0 if result != INVALID else 1
+
+
+if __name__ == "__main__":
+    # python -m database.materials 1 2 100 2.5 1.2
+    sys.exit(main())
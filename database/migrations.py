@@ -0,0 +1,232 @@
+import sqlite3
+import sys
+from database.conversions import price_to_kopecks, sale_date_to_iso
+from database.discounts import create_discount_tiers
+from database.logger import get_logger
+from database.product_search import create_product_search
+from database.sales_summary import create_sales_summary
+
+
+logger = get_logger(__name__)
+
+
+class MigrationError(Exception):
+    """Данные в базе не удалось привести к новой схеме"""
+
+
+def _create_base_schema(cursor):
+    """Создает таблицы импорта, если база данных пустая"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS "Partners_Import" (
+            "PartnerID"	INT IDENTITY(1, 1),
+            "PartnerType"	NVARCHAR(50) NOT NULL,
+            "PartnerName"	NVARCHAR(100) NOT NULL,
+            "Director"	NVARCHAR(100) NOT NULL,
+            "Email"	NVARCHAR(100) NOT NULL,
+            "Phone"	NVARCHAR(20) NOT NULL,
+            "LegalAddress"	NVARCHAR(200) NOT NULL,
+            "INN"	NVARCHAR(20) NOT NULL,
+            "Rating"	INT NOT NULL,
+            PRIMARY KEY("PartnerID")
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS "Product_Type_Import" (
+            "ProductTypeID"	INT IDENTITY(1, 1),
+            "ProductTypeName"	NVARCHAR(100) NOT NULL,
+            "ProductTypeCoefficient"	DECIMAL(10, 2) NOT NULL,
+            PRIMARY KEY("ProductTypeName","ProductTypeID")
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS "Products_Import" (
+            "ProductID"	INT IDENTITY(1, 1),
+            "ProductTypeID"	TEXT NOT NULL,
+            "ProductName"	NVARCHAR(200) NOT NULL,
+            "ArticleNumber"	NVARCHAR(20) NOT NULL,
+            "MinPartnerPrice"	DECIMAL(15, 2) NOT NULL,
+            PRIMARY KEY("ProductID"),
+            FOREIGN KEY("ProductTypeID") REFERENCES "Product_Type_Import"("ProductTypeName")
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS "Partner_Products_Import" (
+            "SaleID"	INT IDENTITY(1, 1),
+            "ProductID"	INT NOT NULL,
+            "PartnerID"	INT NOT NULL,
+            "Quantity"	INT NOT NULL,
+            "SaleDate"	DATETIME NOT NULL,
+            PRIMARY KEY("SaleID"),
+            FOREIGN KEY("PartnerID") REFERENCES "Partners_Import"("PartnerID"),
+            FOREIGN KEY("ProductID") REFERENCES "Products_Import"("ProductID")
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS "Material_Types_Import" (
+            "TypeID"	INT IDENTITY(1, 1),
+            "TypeName"	NVARCHAR(100) NOT NULL,
+            "DefectPercentage"	DECIMAL(10, 6) NOT NULL,
+            PRIMARY KEY("TypeID")
+        )
+    ''')
+
+
+def _add_products_partner_id(cursor):
+    """Добавляет поле PartnerID в таблицу Products_Import"""
+    cursor.execute("PRAGMA table_info(Products_Import)")
+    columns = [col[1] for col in cursor.fetchall()]
+
+    if 'PartnerID' not in columns:
+        cursor.execute("ALTER TABLE Products_Import ADD COLUMN PartnerID INTEGER")
+
+
+def _assign_missing_partner_ids(cursor):
+    """Назначает PartnerID партнерам, у которых он не заполнен"""
+    cursor.execute("SELECT INN FROM Partners_Import WHERE PartnerID IS NULL")
+    partners_with_null_id = cursor.fetchall()
+
+    if partners_with_null_id:
+        cursor.execute("SELECT MAX(PartnerID) FROM Partners_Import WHERE PartnerID IS NOT NULL")
+        max_id_result = cursor.fetchone()
+        max_id = max_id_result[0] if max_id_result[0] is not None else 0
+
+        for i, (partner_inn,) in enumerate(partners_with_null_id):
+            cursor.execute("UPDATE Partners_Import SET PartnerID = ? WHERE INN = ?",
+                           (max_id + i + 1, partner_inn))
+
+
+# Индексы по столбцам, по которым DatabaseManager ищет и соединяет записи
+INDEXES = [
+    ("idx_partners_inn", "Partners_Import", "INN"),
+    ("idx_sales_partner", "Partner_Products_Import", "PartnerID"),
+    ("idx_sales_product", "Partner_Products_Import", "ProductID"),
+    ("idx_products_partner_name", "Products_Import", "PartnerID, ProductName"),
+    ("idx_products_article", "Products_Import", "ArticleNumber"),
+]
+
+
+def _create_lookup_indexes(cursor):
+    """Создает индексы для поиска по ИНН, партнеру, продукту и артикулу"""
+    for name, table, columns in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def _convert_prices_to_kopecks(cursor):
+    """
+    Переводит MinPartnerPrice из текста вида '4456,9' в целое число копеек.
+    Если хотя бы одна цена не распознана, миграция прерывается со списком таких продуктов:
+    текст в столбце цены SQLite при делении молча превратил бы в 0 или в неверную сумму.
+    """
+    cursor.execute("SELECT ROWID, ArticleNumber, MinPartnerPrice FROM Products_Import")
+    updates = []
+    invalid = []
+    for rowid, article, price in cursor.fetchall():
+        try:
+            kopecks = price_to_kopecks(price)
+        except ValueError:
+            kopecks = None
+        if kopecks is None:
+            invalid.append(f"ROWID {rowid}, артикул {article}: {price!r}")
+        else:
+            updates.append((kopecks, rowid))
+
+    if invalid:
+        logger.error("Нераспознанные цены продукции: %s", "; ".join(invalid))
+        raise MigrationError("Не удалось перевести цены в копейки, исправьте MinPartnerPrice:\n"
+                             + "\n".join(invalid))
+
+    cursor.executemany("UPDATE Products_Import SET MinPartnerPrice = ? WHERE ROWID = ?", updates)
+
+
+def _convert_sale_dates_to_iso(cursor):
+    """Переводит SaleDate из 'dd.mm.yyyy' в 'yyyy-mm-dd' и индексирует продажи по (PartnerID, SaleDate)"""
+    cursor.execute("SELECT ROWID, SaleDate FROM Partner_Products_Import")
+    updates = []
+    for rowid, sale_date in cursor.fetchall():
+        try:
+            iso_date = sale_date_to_iso(sale_date)
+        except ValueError:
+            # Нераспознанную дату оставляем как есть, чтобы не потерять данные
+            continue
+        if iso_date != sale_date:
+            updates.append((iso_date, rowid))
+
+    cursor.executemany("UPDATE Partner_Products_Import SET SaleDate = ? WHERE ROWID = ?", updates)
+
+    # Составной индекс покрывает и поиск по PartnerID, поэтому одиночный больше не нужен
+    cursor.execute("DROP INDEX IF EXISTS idx_sales_partner")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_partner_date "
+                   "ON Partner_Products_Import (PartnerID, SaleDate)")
+
+
+# Шаги миграции: (версия, описание, функция). Версии только добавляются в конец,
+# уже выпущенные шаги не изменяются
+MIGRATIONS = [
+    (1, "Базовая схема таблиц импорта", _create_base_schema),
+    (2, "Поле PartnerID в таблице Products_Import", _add_products_partner_id),
+    (3, "Заполнение отсутствующих PartnerID партнеров", _assign_missing_partner_ids),
+    (4, "Индексы для частых выборок", _create_lookup_indexes),
+    (5, "Цена MinPartnerPrice в копейках", _convert_prices_to_kopecks),
+    (6, "Даты продаж в формате ISO 8601", _convert_sale_dates_to_iso),
+    (7, "Итоги продаж по партнерам (PartnerSalesSummary)", create_sales_summary),
+    (8, "Настраиваемые пороги скидок (DiscountTiers)", create_discount_tiers),
+    (9, "Полнотекстовый поиск продукции (ProductSearch)", create_product_search),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Возвращает текущую версию схемы (PRAGMA user_version)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Приводит схему к актуальной версии, каждый шаг выполняется в своей транзакции"""
+    current_version = get_schema_version(conn)
+    if current_version >= SCHEMA_VERSION:
+        return current_version
+
+    if conn.in_transaction:
+        conn.commit()
+
+    cursor = conn.cursor()
+    for version, description, step in MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Версию перечитываем под блокировкой: схему мог обновить другой процесс
+            current_version = get_schema_version(conn)
+            if version <= current_version:
+                conn.commit()
+                continue
+
+            step(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+            current_version = version
+        except Exception:
+            conn.rollback()
+            raise
+
+    return current_version
+
+
+def migrate_database(db_path):
+    """Обновляет схему файла базы данных и возвращает (исходная версия, новая версия)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        from_version = get_schema_version(conn)
+        to_version = migrate(conn)
+        return from_version, to_version
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # python -m database.migrations путь/к/копии/masterpol.db
+    for path in sys.argv[1:]:
+        old_version, new_version = migrate_database(path)
+        print(f"{path}: версия схемы {old_version} -> {new_version}")
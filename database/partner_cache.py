@@ -0,0 +1,76 @@
+import os
+import threading
+
+
+class PartnerCache:
+    """Кэш соответствий ИНН -> PartnerID и PartnerID -> название партнера"""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_id(self, inn):
+        """Возвращает PartnerID из кэша или None, если ИНН еще не загружен"""
+        with self._lock:
+            partner_id = self._ids.get(inn)
+            if partner_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return partner_id
+
+    def get_name(self, partner_id):
+        """Возвращает название партнера из кэша или None"""
+        with self._lock:
+            name = self._names.get(partner_id)
+            if name is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return name
+
+    def put(self, inn, partner_id, name):
+        """Запоминает найденного в базе партнера"""
+        if partner_id is None:
+            return
+        with self._lock:
+            self._ids[inn] = partner_id
+            self._names[partner_id] = name
+
+    def invalidate(self, inn=None):
+        """Сбрасывает запись партнера с указанным ИНН или весь кэш, если ИНН не задан"""
+        with self._lock:
+            if inn is None:
+                self._ids.clear()
+                self._names.clear()
+                return
+            partner_id = self._ids.pop(inn, None)
+            if partner_id is not None:
+                self._names.pop(partner_id, None)
+
+    def get_stats(self):
+        """Возвращает количество попаданий, промахов и записей в кэше"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._ids),
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_partner_cache(db_path):
+    """Возвращает общий кэш партнеров для файла базы данных"""
+    key = os.path.abspath(db_path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = PartnerCache()
+            _caches[key] = cache
+        return cache
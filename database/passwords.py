@@ -0,0 +1,65 @@
+import hashlib
+import hmac
+import os
+import time
+
+
+# Формат хеша: pbkdf2_sha256$<итерации>$<соль hex>$<хеш hex>
+SCHEME = 'pbkdf2_sha256'
+SALT_BYTES = 16
+
+# Число итераций подбирается один раз при создании базы так, чтобы проверка
+# пароля занимала около TARGET_MS (ниже порога медленного вызова в журнале
+# instrumentation), но не меньше MIN_ITERATIONS
+TARGET_MS = 150
+MIN_ITERATIONS = 100000
+_CALIBRATION_ITERATIONS = 20000
+
+
+def calibrate_iterations(target_ms=TARGET_MS):
+    """Подбирает число итераций PBKDF2 под время проверки target_ms на этом компьютере"""
+    started = time.perf_counter()
+    hashlib.pbkdf2_hmac('sha256', b'calibration', bytes(SALT_BYTES), _CALIBRATION_ITERATIONS)
+    seconds = max(time.perf_counter() - started, 1e-6)
+    iterations = int(_CALIBRATION_ITERATIONS * target_ms / 1000 / seconds)
+    return max(MIN_ITERATIONS, iterations // 1000 * 1000)
+
+
+def hash_password(password, iterations):
+    """Хеширует пароль PBKDF2-SHA256 со случайной солью"""
+    salt = os.urandom(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return f"{SCHEME}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def _legacy_hash(password):
+    """Хеш прежнего формата: один проход SHA-256 без соли"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def is_legacy_hash(stored):
+    return not stored.startswith(SCHEME + '$')
+
+
+def verify_password(password, stored):
+    """Проверяет пароль по хешу PBKDF2 или по хешу SHA-256 прежнего формата"""
+    if not stored:
+        return False
+    if is_legacy_hash(stored):
+        return hmac.compare_digest(_legacy_hash(password), stored)
+    try:
+        _, iterations, salt, digest = stored.split('$')
+        actual = hashlib.pbkdf2_hmac('sha256', password.encode(), bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual.hex(), digest)
+
+
+def needs_rehash(stored, iterations):
+    """Хеш нужно пересчитать: прежний формат или число итераций меньше текущего"""
+    if is_legacy_hash(stored):
+        return True
+    try:
+        return int(stored.split('$')[1]) < iterations
+    except (IndexError, ValueError):
+        return True
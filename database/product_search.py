@@ -0,0 +1,95 @@
+import re
+import sqlite3
+
+
+# Полнотекстовый индекс по названиям и артикулам продукции. Таблица внешнего
+# содержимого: сами строки хранятся в Products_Import, индекс обновляют триггеры
+SEARCH_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS ProductSearch USING fts5(
+        ProductName,
+        ArticleNumber,
+        content='Products_Import',
+        content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='1 2 3'
+    )
+'''
+
+TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_product_search_insert
+    AFTER INSERT ON Products_Import
+    BEGIN
+        INSERT INTO ProductSearch (rowid, ProductName, ArticleNumber)
+        VALUES (NEW.ROWID, NEW.ProductName, NEW.ArticleNumber);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_product_search_delete
+    AFTER DELETE ON Products_Import
+    BEGIN
+        INSERT INTO ProductSearch (ProductSearch, rowid, ProductName, ArticleNumber)
+        VALUES ('delete', OLD.ROWID, OLD.ProductName, OLD.ArticleNumber);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_product_search_update
+    AFTER UPDATE OF ProductName, ArticleNumber ON Products_Import
+    BEGIN
+        INSERT INTO ProductSearch (ProductSearch, rowid, ProductName, ArticleNumber)
+        VALUES ('delete', OLD.ROWID, OLD.ProductName, OLD.ArticleNumber);
+        INSERT INTO ProductSearch (rowid, ProductName, ArticleNumber)
+        VALUES (NEW.ROWID, NEW.ProductName, NEW.ArticleNumber);
+    END
+    ''',
+]
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def fts5_available(cursor):
+    """Проверяет, собран ли SQLite с поддержкой FTS5"""
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def create_product_search(cursor):
+    """
+    Создает индекс ProductSearch с триггерами и заполняет его.
+    Без FTS5 шаг ничего не делает: поиск работает через casefold() и LIKE.
+    """
+    if not fts5_available(cursor):
+        return
+    cursor.execute(SEARCH_TABLE)
+    for trigger in TRIGGERS:
+        cursor.execute(trigger)
+    cursor.execute("INSERT INTO ProductSearch (ProductSearch) VALUES ('rebuild')")
+
+
+def has_product_search(cursor):
+    """Проверяет, есть ли в базе индекс ProductSearch"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ProductSearch'")
+    return cursor.fetchone() is not None
+
+
+def build_match_query(search_text):
+    """
+    Превращает строку поиска в запрос FTS5: каждое слово ищется по префиксу,
+    все слова должны встретиться. 'дуб светл' -> '"дуб"* "светл"*'.
+    Возвращает None, если в строке нет ни одного слова.
+    """
+    words = _WORD_RE.findall(search_text or "")
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def casefold(value):
+    """Приведение к нижнему регистру с учетом кириллицы (функция SQL casefold)"""
+    if value is None:
+        return None
+    return str(value).casefold()
@@ -0,0 +1,192 @@
+import argparse
+import inspect
+import os
+import re
+import sys
+import tempfile
+
+from database import synthetic_data
+from database.db_manager import DatabaseManager
+
+
+# Методы, которые по смыслу читают таблицу целиком (полный список записей)
+FULL_SCAN_METHODS = {
+    'get_all_partners',
+    'get_partners_with_discounts',
+    'get_discount_tiers',
+    'get_partner_products',
+    'get_partner_products_by_inn',
+    'iter_partner_report',
+    # Справочники типов малы: множители всех пар типов пакета читаются одним запросом и кэшируются
+    'calculate_material',
+    'calculate_materials_batch',
+}
+
+# Методы, которые не выполняют запросов к рабочим таблицам и не проверяются
+SKIPPED_METHODS = {
+    'get_connection',
+    'create_test_table',
+    'get_data_version',
+}
+
+
+def _build_calls(partners, products, sales):
+    """Вызовы всех публичных методов DatabaseManager на синтетических данных"""
+    inn = synthetic_data.partner_inn(1)
+    article = synthetic_data.product_article(1)
+    new_inn = synthetic_data.partner_inn(partners + 1)
+    new_article = synthetic_data.product_article(products + 1)
+    partner_data = {
+        'PartnerType': 'ООО',
+        'PartnerName': 'Проверка планов',
+        'Director': 'Директор',
+        'Phone': '900 000 00 00',
+        'Email': 'plan@example.ru',
+        'LegalAddress': 'Адрес',
+        'INN': new_inn,
+        'Rating': 5,
+    }
+    product_data = {
+        'ProductName': 'Ламинат проверочный',
+        'ProductTypeID': '1',
+        'ArticleNumber': new_article,
+        'MinPartnerPrice': 1234.5,
+    }
+
+    # Сначала чтение, затем изменение данных, удаление - в самом конце
+    return [
+        ('is_inn_exists', (inn,)),
+        ('get_all_partners', ()),
+        ('get_partners_with_discounts', ()),
+        ('get_discount_tiers', ()),
+        ('get_partner_by_inn', (inn,)),
+        ('get_partner_name_by_inn', (inn,)),
+        ('get_partner_name_by_id', (2,)),
+        ('get_partner_id_by_inn', (inn,)),
+        ('get_partner_products', (inn, 'Дуб')),
+        ('get_partner_products_by_inn', (inn, 'Дуб')),
+        ('get_partner_products_by_partner_id', (inn, 'Дуб')),
+        ('get_product_by_article', (article,)),
+        ('get_partner_sales_history', (inn, 'Дуб', '2021-01-01', '2022-12-31')),
+        ('get_sales_statistics', (inn,)),
+        ('get_sales_history_snapshot', (inn, 'Дуб', '2021-01-01')),
+        ('get_partner_sales_page', (inn, '', ('2023-06-01', sales), 50)),
+        ('iter_sales_export', (inn, '2021-01-01', '2022-12-31')),
+        ('iter_partner_report', ()),
+        ('calculate_material', (1, 2, 100, 2.5, 1.2)),
+        ('calculate_materials_batch', ([(1, 2, 100, 2.5, 1.2), (9, 1, 1, 1.0, 1.0)],)),
+        ('get_partner_products_for_sale', (inn,)),
+        ('get_sale_by_id', (1,)),
+        ('add_partner', (partner_data,)),
+        ('update_partner', (new_inn, partner_data)),
+        ('add_product', (dict(product_data, ArticleNumber=new_article + 'a'),)),
+        ('add_product_with_partner_id', (product_data, new_inn)),
+        ('update_product', (new_article, product_data)),
+        ('update_products_with_null_partner_id', (new_inn,)),
+        ('add_sale', ({'ProductID': 1, 'PartnerID': 1, 'Quantity': 10},)),
+        ('update_sale', ({'SaleID': 1, 'ProductID': 2, 'PartnerID': 1, 'Quantity': 20},)),
+        ('delete_sale', (sales,)),
+        ('delete_product', (new_article,)),
+        ('delete_partner', (new_inn,)),
+    ]
+
+
+def _public_methods():
+    return {
+        name for name, _ in inspect.getmembers(DatabaseManager, inspect.isfunction)
+        if not name.startswith('_')
+    }
+
+
+def _explain(conn, sql):
+    """Возвращает строки плана выполнения запроса"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+_FTS_MATCH_RE = re.compile(r'VIRTUAL TABLE INDEX \d+:\S*M')
+
+
+def _is_full_scan(detail):
+    # "SCAN t" - полный проход по таблице; "SCAN t USING ... INDEX" - полный
+    # проход по индексу. Поиск по индексу выглядит как "SEARCH ...".
+    # Запрос MATCH к FTS5 выглядит как "SCAN t VIRTUAL TABLE INDEX 0:M1" и идет по индексу
+    if _FTS_MATCH_RE.search(detail):
+        return False
+    return detail.startswith('SCAN ') and 'CONSTANT ROW' not in detail
+
+
+def check_query_plans(partners=2000, products=20000, sales=200000, seed=42, verbose=False):
+    """
+    Создает временную базу с синтетическими данными, вызывает все публичные методы
+    DatabaseManager и проверяет план каждого выполненного запроса.
+    Возвращает список нарушений (метод, запрос, строка плана).
+    """
+    methods = _public_methods() - SKIPPED_METHODS
+    calls = _build_calls(partners, products, sales)
+    uncovered = methods - {name for name, _ in calls}
+    if uncovered:
+        raise RuntimeError(f"Нет проверочных вызовов для методов: {', '.join(sorted(uncovered))}")
+
+    violations = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'query_plan.db')
+        db_manager = DatabaseManager(db_path)
+        conn = db_manager.get_connection()
+        synthetic_data.generate(conn, partners=partners, products=products, sales=sales, seed=seed)
+
+        try:
+            for name, args in calls:
+                statements = []
+                conn.set_trace_callback(statements.append)
+                try:
+                    result = getattr(db_manager, name)(*args)
+                    if inspect.isgenerator(result):
+                        # Генератор выполняет запросы только при чтении строк
+                        for _ in result:
+                            pass
+                finally:
+                    conn.set_trace_callback(None)
+
+                for sql in statements:
+                    keyword = sql.lstrip().split(None, 1)[0].upper()
+                    if keyword not in ('SELECT', 'UPDATE', 'DELETE', 'WITH'):
+                        continue
+                    plan = _explain(conn, sql)
+                    if verbose:
+                        print(f"{name}:")
+                        for detail in plan:
+                            print(f"    {detail}")
+                    if name in FULL_SCAN_METHODS:
+                        continue
+                    for detail in plan:
+                        if _is_full_scan(detail):
+                            violations.append((name, ' '.join(sql.split()), detail))
+        finally:
+            db_manager.connection_manager.close_all()
+
+    return violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Проверка планов запросов DatabaseManager на синтетических данных")
+    parser.add_argument('--partners', type=int, default=2000)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--sales', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-v', '--verbose', action='store_true', help="печатать планы всех запросов")
+    args = parser.parse_args(argv)
+
+    violations = check_query_plans(args.partners, args.products, args.sales, args.seed, args.verbose)
+    for name, sql, detail in violations:
+        print(f"{name}: {detail}\n    {sql}")
+
+    if violations:
+        print(f"Найдено полных просмотров таблиц: {len(violations)}")
+        return 1
+    print("Все запросы используют индексы")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import argparse
+import sqlite3
+import sys
+
+
+# Итоги продаж по партнерам. TotalSum хранится в копейках, как и MinPartnerPrice.
+# Учитываются только продажи, для которых существует продукт (как в JOIN
+# Partner_Products_Import -> Products_Import по ROWID)
+SUMMARY_TABLE = '''
+    CREATE TABLE IF NOT EXISTS PartnerSalesSummary (
+        PartnerID INTEGER PRIMARY KEY,
+        SaleCount INTEGER NOT NULL DEFAULT 0,
+        TotalQuantity INTEGER NOT NULL DEFAULT 0,
+        TotalSum INTEGER NOT NULL DEFAULT 0
+    )
+'''
+
+_ADD_SALE = '''
+        INSERT INTO PartnerSalesSummary (PartnerID, SaleCount, TotalQuantity, TotalSum)
+        SELECT NEW.PartnerID, 1, NEW.Quantity, NEW.Quantity * MinPartnerPrice
+        FROM Products_Import WHERE ROWID = NEW.ProductID
+        ON CONFLICT (PartnerID) DO UPDATE SET
+            SaleCount = SaleCount + excluded.SaleCount,
+            TotalQuantity = TotalQuantity + excluded.TotalQuantity,
+            TotalSum = TotalSum + excluded.TotalSum;
+'''
+
+_REMOVE_SALE = '''
+        UPDATE PartnerSalesSummary SET
+            SaleCount = SaleCount - 1,
+            TotalQuantity = TotalQuantity - OLD.Quantity,
+            TotalSum = TotalSum - OLD.Quantity *
+                (SELECT MinPartnerPrice FROM Products_Import WHERE ROWID = OLD.ProductID)
+        WHERE PartnerID = OLD.PartnerID
+          AND EXISTS (SELECT 1 FROM Products_Import WHERE ROWID = OLD.ProductID);
+'''
+
+# Продажи продукта в разрезе партнера строки PartnerSalesSummary
+_PRODUCT_SALES = '''
+            (SELECT {aggregate} FROM Partner_Products_Import s
+             WHERE s.ProductID = {ref}.ROWID AND s.PartnerID = PartnerSalesSummary.PartnerID)'''
+
+TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_sale_insert
+    AFTER INSERT ON Partner_Products_Import
+    BEGIN{_ADD_SALE}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_sale_delete
+    AFTER DELETE ON Partner_Products_Import
+    BEGIN{_REMOVE_SALE}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_sale_update
+    AFTER UPDATE OF ProductID, PartnerID, Quantity ON Partner_Products_Import
+    BEGIN{_REMOVE_SALE}{_ADD_SALE}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_product_price
+    AFTER UPDATE OF MinPartnerPrice ON Products_Import
+    WHEN NEW.MinPartnerPrice IS NOT OLD.MinPartnerPrice
+    BEGIN
+        UPDATE PartnerSalesSummary SET
+            TotalSum = TotalSum + (NEW.MinPartnerPrice - OLD.MinPartnerPrice) *
+                {_PRODUCT_SALES.format(aggregate='SUM(s.Quantity)', ref='NEW').strip()}
+        WHERE PartnerID IN (SELECT PartnerID FROM Partner_Products_Import WHERE ProductID = NEW.ROWID);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_product_delete
+    AFTER DELETE ON Products_Import
+    BEGIN
+        UPDATE PartnerSalesSummary SET
+            SaleCount = SaleCount -
+                {_PRODUCT_SALES.format(aggregate='COUNT(*)', ref='OLD').strip()},
+            TotalQuantity = TotalQuantity -
+                {_PRODUCT_SALES.format(aggregate='SUM(s.Quantity)', ref='OLD').strip()},
+            TotalSum = TotalSum - OLD.MinPartnerPrice *
+                {_PRODUCT_SALES.format(aggregate='SUM(s.Quantity)', ref='OLD').strip()}
+        WHERE PartnerID IN (SELECT PartnerID FROM Partner_Products_Import WHERE ProductID = OLD.ROWID);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_product_insert
+    AFTER INSERT ON Products_Import
+    BEGIN
+        INSERT INTO PartnerSalesSummary (PartnerID, SaleCount, TotalQuantity, TotalSum)
+        SELECT PartnerID, COUNT(*), SUM(Quantity), SUM(Quantity) * NEW.MinPartnerPrice
+        FROM Partner_Products_Import WHERE ProductID = NEW.ROWID
+        GROUP BY PartnerID
+        ON CONFLICT (PartnerID) DO UPDATE SET
+            SaleCount = SaleCount + excluded.SaleCount,
+            TotalQuantity = TotalQuantity + excluded.TotalQuantity,
+            TotalSum = TotalSum + excluded.TotalSum;
+    END
+    ''',
+]
+
+_AGGREGATE_QUERY = '''
+    SELECT pps.PartnerID, COUNT(*), SUM(pps.Quantity), SUM(pps.Quantity * pi.MinPartnerPrice)
+    FROM Partner_Products_Import pps
+    JOIN Products_Import pi ON pps.ProductID = pi.ROWID
+    GROUP BY pps.PartnerID
+'''
+
+
+def create_sales_summary(cursor):
+    """Создает таблицу PartnerSalesSummary с триггерами и заполняет ее"""
+    cursor.execute(SUMMARY_TABLE)
+    for trigger in TRIGGERS:
+        cursor.execute(trigger)
+    _fill_summary(cursor)
+
+
+def _fill_summary(cursor):
+    cursor.execute("DELETE FROM PartnerSalesSummary")
+    cursor.execute(f'''
+        INSERT INTO PartnerSalesSummary (PartnerID, SaleCount, TotalQuantity, TotalSum)
+        {_AGGREGATE_QUERY}
+    ''')
+    return cursor.rowcount
+
+
+def rebuild_sales_summary(conn):
+    """Пересчитывает PartnerSalesSummary по всем продажам, возвращает число партнеров"""
+    cursor = conn.cursor()
+    with conn:
+        return _fill_summary(cursor)
+
+
+def verify_sales_summary(conn):
+    """
+    Сравнивает PartnerSalesSummary с пересчетом по продажам.
+    Возвращает список расхождений (PartnerID, сохраненные итоги, фактические итоги).
+    """
+    cursor = conn.cursor()
+    cursor.execute(_AGGREGATE_QUERY)
+    actual = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+    cursor.execute('''
+        SELECT PartnerID, SaleCount, TotalQuantity, TotalSum
+        FROM PartnerSalesSummary
+        WHERE SaleCount != 0 OR TotalQuantity != 0 OR TotalSum != 0
+    ''')
+    stored = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+    mismatches = []
+    for partner_id in sorted(set(actual) | set(stored)):
+        if stored.get(partner_id) != actual.get(partner_id):
+            mismatches.append((partner_id, stored.get(partner_id), actual.get(partner_id)))
+    return mismatches
+
+
+def main(argv=None):
+    from database.migrations import migrate
+
+    parser = argparse.ArgumentParser(description="Пересчет итогов продаж по партнерам")
+    parser.add_argument('paths', nargs='+', help="файлы базы данных")
+    parser.add_argument('--verify', action='store_true',
+                        help="только сравнить сохраненные итоги с пересчетом")
+    args = parser.parse_args(argv)
+
+    exit_code = 0
+    for path in args.paths:
+        conn = sqlite3.connect(path)
+        try:
+            migrate(conn)
+            if args.verify:
+                mismatches = verify_sales_summary(conn)
+                for partner_id, stored, actual in mismatches:
+                    print(f"{path}: партнер {partner_id}: сохранено {stored}, фактически {actual}")
+                if mismatches:
+                    exit_code = 1
+                else:
+                    print(f"{path}: итоги продаж совпадают")
+            else:
+                print(f"{path}: пересчитаны итоги для партнеров: {rebuild_sales_summary(conn)}")
+        finally:
+            conn.close()
+    return exit_code
+
+
+if __name__ == "__main__":
+    # python -m database.sales_summary [--verify] путь/к/masterpol.db
+    sys.exit(main())
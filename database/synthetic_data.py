@@ -0,0 +1,122 @@
+import random
+from datetime import date, timedelta
+
+
+PARTNER_TYPES = ['ЗАО', 'ООО', 'ПАО', 'ОАО']
+
+PRODUCT_TYPES = [
+    (1, 'Ламинат', 2.35),
+    (2, 'Массивная доска', 5.15),
+    (3, 'Паркетная доска', 4.34),
+    (4, 'Пробковое покрытие', 1.5),
+]
+
+MATERIAL_TYPES = [
+    (1, 'Тип материала 1', 0.001),
+    (2, 'Тип материала 2', 0.0095),
+    (3, 'Тип материала 3', 0.0028),
+    (4, 'Тип материала 4', 0.0055),
+    (5, 'Тип материала 5', 0.0034),
+]
+
+PRODUCT_WORDS = ['Ламинат', 'Паркетная доска', 'Инженерная доска', 'Массивная доска',
+                 'Пробковое покрытие']
+WOOD_WORDS = ['Дуб', 'Ясень', 'Бук', 'Орех', 'Клен', 'Сосна', 'Вишня', 'Тик']
+COLOR_WORDS = ['светлый', 'темный', 'серый', 'дымчато-белый', 'натуральный', 'беленый']
+
+FIRST_SALE_DATE = date(2020, 1, 1)
+
+
+def partner_inn(partner_id):
+    """Детерминированный ИНН синтетического партнера"""
+    return str(7700000000 + partner_id)
+
+
+def product_article(product_id):
+    """Детерминированный артикул синтетического продукта"""
+    return str(1000000 + product_id)
+
+
+def _price(kopecks, legacy):
+    """Цена в копейках или, в формате базы до миграций, рубли текстом с запятой: '4456,9'"""
+    return str(kopecks / 100).replace('.', ',') if legacy else kopecks
+
+
+def generate(conn, partners=100, products=1000, sales=10000, seed=42, batch_size=10000, legacy=False):
+    """
+    Заполняет пустую базу данных синтетическими партнерами, продукцией и продажами.
+    При одинаковых параметрах и seed результат всегда одинаков.
+    С legacy цены и даты записываются в формате базы до миграций (рубли текстом,
+    'dd.mm.yyyy'): такую базу читает исходная версия, а текущая обновляет при открытии.
+    """
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+
+    with conn:
+        cursor.executemany('''
+            INSERT OR IGNORE INTO Product_Type_Import
+            (ProductTypeID, ProductTypeName, ProductTypeCoefficient)
+            VALUES (?, ?, ?)
+        ''', PRODUCT_TYPES)
+        cursor.executemany('''
+            INSERT OR IGNORE INTO Material_Types_Import (TypeID, TypeName, DefectPercentage)
+            VALUES (?, ?, ?)
+        ''', MATERIAL_TYPES)
+
+        cursor.executemany('''
+            INSERT INTO Partners_Import
+            (PartnerID, PartnerType, PartnerName, Director, Email, Phone, LegalAddress, INN, Rating)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            (
+                partner_id,
+                rng.choice(PARTNER_TYPES),
+                f"Партнер {partner_id}",
+                f"Директор {partner_id}",
+                f"partner{partner_id}@example.ru",
+                f"900 {partner_id % 1000:03d} {partner_id % 100:02d} {partner_id % 97:02d}",
+                f"Адрес партнера {partner_id}",
+                partner_inn(partner_id),
+                rng.randint(1, 10),
+            )
+            for partner_id in range(1, partners + 1)
+        ))
+
+        product_partners = [rng.randint(1, partners) for _ in range(products)]
+        cursor.executemany('''
+            INSERT INTO Products_Import
+            (ProductID, ProductTypeID, ProductName, ArticleNumber, MinPartnerPrice, PartnerID)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            (
+                product_id,
+                str(rng.randint(1, len(PRODUCT_TYPES))),
+                f"{rng.choice(PRODUCT_WORDS)} {rng.choice(WOOD_WORDS)} "
+                f"{rng.choice(COLOR_WORDS)} {rng.randint(4, 20)} мм",
+                product_article(product_id),
+                _price(rng.randint(50000, 1000000), legacy),
+                product_partners[product_id - 1],
+            )
+            for product_id in range(1, products + 1)
+        ))
+
+    # Продажи вставляются пачками, чтобы не держать миллионы строк в памяти
+    sale_id = 0
+    while sale_id < sales:
+        batch = []
+        for _ in range(min(batch_size, sales - sale_id)):
+            sale_id += 1
+            product_id = rng.randint(1, products)
+            sale_date = FIRST_SALE_DATE + timedelta(days=rng.randint(0, 5 * 365))
+            batch.append((
+                sale_id,
+                product_id,
+                product_partners[product_id - 1],
+                rng.randint(1, 5000),
+                sale_date.strftime('%d.%m.%Y') if legacy else sale_date.isoformat(),
+            ))
+        with conn:
+            cursor.executemany('''
+                INSERT INTO Partner_Products_Import (SaleID, ProductID, PartnerID, Quantity, SaleDate)
+                VALUES (?, ?, ?, ?, ?)
+            ''', batch)
@@ -1,10 +1,28 @@
 import sys
 import os
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from database.db_manager import DatabaseManager
-from ui.auth_screen import AuthScreen
-from ui.main_window import MainWindow
+import time
+
+# Отсчет для --profile-startup начинается до импорта PyQt5 и экранов
+_STARTED = time.perf_counter()
+
+from ui.startup_profile import StartupProfile
+
+profile = StartupProfile('--profile-startup' in sys.argv, _STARTED)
+
+with profile.step("Импорт PyQt5"):
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+with profile.step("Импорт database"):
+    from database.db_manager import DatabaseManager
+    from database.auth_service import get_auth_service
+    from database.connection import close_all_connections
+    from database.logger import configure_logging, get_logger
+    from database.migrations import MigrationError
+from styles.theme import apply_theme
+# Модули экранов загружаются при первом открытии (см. ui/screens.py)
+from ui.screens import create_screen
+
+
+logger = get_logger(__name__)
 
 
 def get_resource_path(relative_path):
@@ -39,12 +57,11 @@ def get_data_path():
 class MasterPolApp:
     def __init__(self):
         # Инициализируем базу данных с правильным путем
-        self.init_database()
+        with profile.step("Открытие базы данных"):
+            self.init_database()
 
         self.auth_screen = None
         self.main_window = None
-        self.current_user = None
-        self.current_user_type = None
 
         # Показываем экран авторизации
         self.show_auth_screen()
@@ -56,40 +73,47 @@ class MasterPolApp:
             data_path = get_data_path()
             db_path = os.path.join(data_path, 'masterpol.db')
 
-            print(f"Путь к базе данных: {db_path}")
+            logger.info("Путь к базе данных: %s", db_path)
 
-            # Инициализируем менеджер базы данных с правильным путем
-            db_manager = DatabaseManager(db_path)
-            db_manager.fix_partner_table_structure()
-            db_manager.add_partner_id_to_products_table()
+            # При создании менеджера схема базы данных один раз приводится
+            # к актуальной версии (см. database/migrations.py)
+            DatabaseManager(db_path)
+
+            # Таблица пользователей проверяется один раз за запуск, а не при каждом входе
+            get_auth_service()
+
+        except MigrationError as e:
+            # С данными, не приведенными к новой схеме, экраны показали бы неверные суммы
+            logger.exception("Ошибка обновления схемы базы данных")
+            QMessageBox.critical(None, "Ошибка базы данных", str(e))
+            sys.exit(1)
 
         except Exception as e:
-            print(f"Ошибка инициализации базы данных: {e}")
+            logger.exception("Ошибка инициализации базы данных")
 
     def show_auth_screen(self):
         """Показывает экран авторизации"""
-        self.auth_screen = AuthScreen()
+        with profile.step("Окно входа"):
+            self.auth_screen = create_screen('auth')
         self.auth_screen.authentication_successful.connect(self.on_authentication_success)
         self.auth_screen.setWindowTitle("Мастер-пол - Авторизация")
         self.auth_screen.setFixedSize(520, 670)
+        profile.watch_first_paint(self.auth_screen)
         self.auth_screen.show()
 
-    def on_authentication_success(self, user_type, username):
+    def on_authentication_success(self, session):
         """Обработчик успешной авторизации"""
-        self.current_user_type = user_type
-        self.current_user = username
-
         # Закрываем экран авторизации
         if self.auth_screen:
             self.auth_screen.close()
             self.auth_screen = None
 
-        # Показываем главное окно с передачей типа пользователя
-        self.show_main_window()
+        # Показываем главное окно с сессией пользователя
+        self.show_main_window(session)
 
-    def show_main_window(self):
+    def show_main_window(self, session):
         """Показывает главное окно приложения"""
-        self.main_window = MainWindow(self.current_user_type, self.current_user)
+        self.main_window = create_screen('main_window', session)
         self.main_window.logout_requested.connect(self.on_logout_requested)
         self.main_window.show()
 
@@ -100,23 +124,26 @@ class MasterPolApp:
             self.main_window.close()
             self.main_window = None
 
-        # Сбрасываем информацию о пользователе
-        self.current_user = None
-        self.current_user_type = None
+        # Завершаем сессию пользователя
+        get_auth_service().logout()
 
         # Показываем экран авторизации
         self.show_auth_screen()
 
 
 def main():
-    app = QApplication(sys.argv)
-
-    # Настройка шрифтов для разных ОС
-    app.setStyleSheet("""
-        QApplication {
-            font-family: -apple-system, BlinkMacSystemFont, Arial, Helvetica, sans-serif;
-        }
-    """)
+    # Уровень и файл журнала задаются переменными MASTERPOL_LOG_LEVEL и MASTERPOL_LOG_FILE
+    configure_logging()
+
+    with profile.step("Создание QApplication"):
+        app = QApplication(sys.argv)
+
+    # Одна таблица стилей на все приложение (styles/styles.py)
+    with profile.step("Тема оформления"):
+        apply_theme(app)
+
+    # Закрываем долгоживущие соединения с базой данных при выходе
+    app.aboutToQuit.connect(close_all_connections)
 
     # Создаем приложение с системой авторизации
     master_pol_app = MasterPolApp()
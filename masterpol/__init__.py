@@ -0,0 +1 @@
+# Консольные команды без интерфейса: python -m masterpol
@@ -0,0 +1,189 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+
+
+# Команды используют только пакет database: PyQt5 не импортируется,
+# поэтому отчеты можно строить по расписанию на сервере без дисплея
+DEFAULT_DB = 'database/masterpol.db'
+
+STATS_HEADER = ['ИНН', 'Партнер', 'Продаж', 'Количество', 'Сумма', 'Скидка, %']
+DISCOUNTS_HEADER = ['ИНН', 'Партнер', 'Продано продукции', 'Скидка, %']
+
+
+def _write_table(header, rows, output_format):
+    """Печатает строки как текстовую таблицу, CSV (';') или JSON"""
+    if output_format == 'json':
+        json.dump([dict(zip(header, row)) for row in rows], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    if output_format == 'csv':
+        writer = csv.writer(sys.stdout, delimiter=';', lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+        return
+
+    texts = [[_format_cell(value) for value in row] for row in rows]
+    widths = [max([len(title)] + [len(row[position]) for row in texts]) for position, title in enumerate(header)]
+    print('  '.join(title.ljust(width) for title, width in zip(header, widths)))
+    for row in texts:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+def _format_cell(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "" if value is None else str(value)
+
+
+def _open_database(db_path):
+    from database.db_manager import DatabaseManager
+
+    if not os.path.exists(db_path):
+        raise SystemExit(f"Файл базы данных не найден: {db_path}")
+    return DatabaseManager(db_path)
+
+
+def command_stats(args):
+    """Итоги продаж одного партнера или всех партнеров"""
+    db_manager = _open_database(args.db)
+    if args.inn:
+        partner = db_manager.get_partner_by_inn(args.inn)
+        if not partner:
+            print(f"Партнер с ИНН {args.inn} не найден")
+            return 1
+        stats = db_manager.get_sales_statistics(args.inn)
+        if stats is None:
+            print(f"Не удалось получить статистику продаж партнера с ИНН {args.inn}")
+            return 1
+        rows = [(args.inn, db_manager.get_partner_name_by_inn(args.inn), stats['total_sales'],
+                 stats['total_quantity'], stats['total_sum'], stats['discount'])]
+    else:
+        rows = [(inn, name, sale_count, quantity, total_sum, discount)
+                for inn, name, _, _, _, _, _, sale_count, quantity, total_sum, discount
+                in db_manager.iter_partner_report()]
+    _write_table(STATS_HEADER, rows, args.format)
+    return 0
+
+
+def command_discounts(args):
+    """Пороги скидок и текущая скидка каждого партнера"""
+    db_manager = _open_database(args.db)
+    if args.format == 'text':
+        tiers = db_manager.get_discount_tiers()
+        print("Пороги скидок: " + ", ".join(f"от {quantity} - {percent}%" for quantity, percent in tiers))
+        print()
+    rows = [(partner[6], partner[1], partner[8], partner[9])
+            for partner in db_manager.get_partners_with_discounts()
+            if partner[9] >= args.min_discount]
+    _write_table(DISCOUNTS_HEADER, rows, args.format)
+    return 0
+
+
+def command_export(args):
+    from database import exporter
+    return exporter.main(['--db', args.db] + args.arguments)
+
+
+def command_import(args):
+    from database import importer
+    return importer.main(['--db', args.db] + args.arguments)
+
+
+def command_check(args):
+    """Проверка файла базы: целостность, версия схемы, итоги продаж, поисковый индекс"""
+    from database.migrations import SCHEMA_VERSION, get_schema_version
+    from database.product_search import has_product_search
+    from database.sales_summary import verify_sales_summary
+
+    if not os.path.exists(args.db):
+        print(f"Файл базы данных не найден: {args.db}")
+        return 1
+
+    problems = 0
+    # Соединение открывается напрямую: проверка не должна обновлять схему
+    conn = sqlite3.connect(args.db)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+        print(f"Целостность файла: {result}")
+        problems += result != 'ok'
+
+        version = get_schema_version(conn)
+        print(f"Версия схемы: {version} из {SCHEMA_VERSION}")
+        problems += version != SCHEMA_VERSION
+
+        if version == SCHEMA_VERSION:
+            mismatches = verify_sales_summary(conn)
+            for partner_id, stored, actual in mismatches:
+                print(f"  партнер {partner_id}: итоги {stored}, по продажам {actual}")
+            print(f"Итоги продаж: {'расхождений ' + str(len(mismatches)) if mismatches else 'совпадают'}")
+            problems += bool(mismatches)
+
+            if has_product_search(conn.cursor()):
+                try:
+                    conn.execute("INSERT INTO ProductSearch (ProductSearch) VALUES ('integrity-check')")
+                    print("Поисковый индекс продукции: ok")
+                except sqlite3.DatabaseError as e:
+                    print(f"Поисковый индекс продукции: {e}")
+                    problems += 1
+    finally:
+        conn.close()
+
+    if args.plans:
+        from database.query_plan import check_query_plans
+        violations = check_query_plans()
+        for name, sql, detail in violations:
+            print(f"  {name}: {detail}")
+        print(f"Планы запросов: {'полных просмотров ' + str(len(violations)) if violations else 'ok'}")
+        problems += bool(violations)
+
+    return 1 if problems else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m masterpol',
+                                     description="Отчеты и обслуживание базы Мастер-пол без интерфейса")
+    parser.add_argument('--db', default=DEFAULT_DB, help="файл базы данных")
+    commands = parser.add_subparsers(dest='command', metavar='команда')
+    commands.required = True
+
+    stats = commands.add_parser('stats', help="итоги продаж по партнерам")
+    stats.add_argument('--inn', help="ИНН партнера (по умолчанию - все партнеры)")
+    stats.add_argument('--format', choices=['text', 'csv', 'json'], default='text')
+    stats.set_defaults(handler=command_stats)
+
+    discounts = commands.add_parser('discounts', help="скидки партнеров")
+    discounts.add_argument('--min-discount', type=int, default=0, help="показывать скидки от N%%")
+    discounts.add_argument('--format', choices=['text', 'csv', 'json'], default='text')
+    discounts.set_defaults(handler=command_discounts)
+
+    export = commands.add_parser('export', help="выгрузка в CSV/XLSX (параметры database.exporter)",
+                                 add_help=False)
+    export.add_argument('arguments', nargs=argparse.REMAINDER)
+    export.set_defaults(handler=command_export)
+
+    import_ = commands.add_parser('import', help="загрузка из CSV/XLSX (параметры database.importer)",
+                                  add_help=False)
+    import_.add_argument('arguments', nargs=argparse.REMAINDER)
+    import_.set_defaults(handler=command_import)
+
+    check = commands.add_parser('check', help="проверка целостности базы")
+    check.add_argument('--plans', action='store_true',
+                       help="также проверить планы запросов на синтетических данных")
+    check.set_defaults(handler=command_check)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    # Параметры export и import, включая --help, передаются модулям database целиком
+    args, extra = parser.parse_known_args(argv)
+    if hasattr(args, 'arguments'):
+        args.arguments += extra
+    elif extra:
+        parser.error(f"неизвестные параметры: {' '.join(extra)}")
+    return args.handler(args)
@@ -11,7 +11,7 @@ QLabel#title {
     padding: 10px;
 }
 
-QTableWidget {
+QTableView {
     background-color: #fefae0;
     border: 1px solid #dda15e;
     gridline-color: #dda15e;
@@ -19,7 +19,7 @@ QTableWidget {
     font-size: 11px;
 }
 
-QTableWidget::item {
+QTableView::item {
     padding: 8px;
     border-bottom: 1px solid #dda15e;
     color: #283618;
@@ -28,14 +28,14 @@ QTableWidget::item {
     margin: 0px;
 }
 
-QTableWidget::item:selected {
+QTableView::item:selected {
     background-color: #606c38;
     color: #fefae0;
     border: none;
     margin: 0px;
 }
 
-QTableWidget::item:alternate {
+QTableView::item:alternate {
     padding: 8px;
     background-color: #dda15e;
     color: #283618;
@@ -43,7 +43,7 @@ QTableWidget::item:alternate {
     margin: 0px;
 }
 
-QTableWidget::item:alternate:selected {
+QTableView::item:alternate:selected {
     padding: 8px;
     background-color: #606c38;
     color: #fefae0;
@@ -390,4 +390,439 @@ QComboBox#inputField QAbstractItemView::item:selected {
     background-color: #606c38;
     color: #fefae0;
 }
-"""
\ No newline at end of file
+"""
+
+# Шрифт приложения для разных ОС
+FONT_STYLE = """
+QApplication {
+    font-family: -apple-system, BlinkMacSystemFont, Arial, Helvetica, sans-serif;
+}
+"""
+
+# Правила экранов ниже ограничены именем объекта экрана (#authScreen, #mainWindow...),
+# поэтому одинаковые имена элементов на разных экранах не мешают друг другу
+
+FORM_STYLE = """
+QLabel#totalSumLabel {
+    font-size: 16px;
+    font-weight: bold;
+    color: #606c38;
+    background-color: #f4f3ee;
+    border: 2px solid #dda15e;
+    border-radius: 6px;
+    padding: 10px;
+    text-align: center;
+}
+
+QLabel#saleInfoLabel {
+    color: #666;
+    font-style: italic;
+    margin-bottom: 10px;
+}
+
+QLabel#rightsInfo {
+    color: #d63384;
+    background-color: #f8d7da;
+    border: 1px solid #f5c2c7;
+    border-radius: 4px;
+    padding: 8px;
+    margin: 5px 0;
+    font-weight: bold;
+}
+"""
+
+AUTH_STYLE = """
+QWidget#authScreen, #authScreen QWidget {
+    background-color: #f4f3ee;
+    font-family: Arial, Helvetica, sans-serif;
+}
+
+#authScreen QFrame#authContainer {
+    background-color: white;
+    border: 2px solid #dda15e;
+    border-radius: 15px;
+}
+
+#authScreen QLineEdit#authField, #authScreen QComboBox#authField {
+    border: 2px solid #dda15e;
+    border-radius: 8px;
+    padding: 12px 15px;
+    font-size: 14px;
+    background-color: white;
+    color: #333;
+    margin-top: 5px;
+    margin-bottom: 10px;
+    min-width: 200px;
+}
+
+#authScreen QLineEdit#authField:focus, #authScreen QComboBox#authField:focus {
+    border-color: #606c38;
+    outline: none;
+}
+
+#authScreen QComboBox#authField::drop-down {
+    border: none;
+    width: 30px;
+}
+
+#authScreen QComboBox#authField::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 5px solid #666;
+    margin-right: 10px;
+}
+
+#authScreen QPushButton#loginBtn {
+    background-color: #606c38;
+    color: white;
+    border: none;
+    border-radius: 8px;
+    font-size: 16px;
+    font-weight: bold;
+    padding: 15px;
+}
+
+#authScreen QPushButton#loginBtn:hover {
+    background-color: #4a5228;
+}
+
+#authScreen QPushButton#loginBtn:pressed {
+    background-color: #3d441f;
+}
+
+#authScreen QPushButton#registerBtn {
+    background-color: transparent;
+    color: #606c38;
+    border: 2px solid #606c38;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: bold;
+    padding: 10px;
+}
+
+#authScreen QPushButton#registerBtn:hover {
+    background-color: #606c38;
+    color: white;
+}
+
+#authScreen QLabel {
+    color: #333;
+    font-weight: bold;
+    font-size: 14px;
+    background: transparent;
+    border: none;
+    margin: 0px;
+    padding: 2px;
+}
+
+/* Логотип: картинка из assets или эмодзи, если картинки нет */
+#authScreen QLabel#authLogo {
+    padding: 10px;
+    min-width: 180px;
+}
+
+#authScreen QLabel#authLogoText {
+    font-size: 48px;
+    color: #606c38;
+}
+
+#authScreen QLabel#authTitle {
+    font-size: 24px;
+    color: #606c38;
+    margin-top: 5px;
+    margin-bottom: 5px;
+}
+
+#authScreen QLabel#authSubtitle {
+    font-size: 14px;
+    color: #666;
+    margin-bottom: 15px;
+    line-height: 1.4;
+    padding: 0px 10px;
+}
+
+#authScreen QLabel#authFieldLabel {
+    margin-bottom: 5px;
+    padding: 0px;
+}
+
+#authScreen QLabel#authInfo {
+    font-size: 11px;
+    color: #888;
+    border: 1px solid #e9ecef;
+    border-radius: 5px;
+    padding: 10px;
+    margin-top: 15px;
+}
+"""
+
+REGISTER_STYLE = """
+QWidget#registerScreen, #registerScreen QWidget {
+    background-color: #f4f3ee;
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+}
+
+#registerScreen QLineEdit#registerField, #registerScreen QComboBox#registerField {
+    border: 2px solid #dda15e;
+    border-radius: 6px;
+    padding: 10px;
+    font-size: 14px;
+    background-color: white;
+    min-height: 20px;
+}
+
+#registerScreen QLineEdit#registerField:focus, #registerScreen QComboBox#registerField:focus {
+    border-color: #606c38;
+}
+
+#registerScreen QComboBox#registerField::drop-down {
+    border: none;
+    width: 25px;
+}
+
+#registerScreen QComboBox#registerField::down-arrow {
+    image: none;
+    border-left: 4px solid transparent;
+    border-right: 4px solid transparent;
+    border-top: 4px solid #666;
+    margin-right: 8px;
+}
+
+#registerScreen QPushButton#primaryBtn {
+    background-color: #606c38;
+    color: white;
+    border: none;
+    border-radius: 6px;
+    font-size: 14px;
+    font-weight: bold;
+    padding: 12px 20px;
+    min-height: 20px;
+}
+
+#registerScreen QPushButton#primaryBtn:hover {
+    background-color: #4a5228;
+}
+
+#registerScreen QPushButton#secondaryBtn {
+    background-color: transparent;
+    color: #606c38;
+    border: 2px solid #606c38;
+    border-radius: 6px;
+    font-size: 14px;
+    font-weight: bold;
+    padding: 10px 20px;
+    min-height: 20px;
+}
+
+#registerScreen QPushButton#secondaryBtn:hover {
+    background-color: #606c38;
+    color: white;
+}
+
+#registerScreen QLabel {
+    color: #333;
+    font-weight: bold;
+    font-size: 14px;
+}
+
+#registerScreen QLabel#registerTitle {
+    font-size: 20px;
+    color: #606c38;
+    margin-bottom: 20px;
+}
+"""
+
+MAIN_WINDOW_STYLE = """
+QMainWindow#mainWindow {
+    background-color: #f4f3ee;
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+}
+
+#mainWindow QFrame#headerFrame {
+    background-color: white;
+    border-bottom: 2px solid #dda15e;
+}
+
+#mainWindow QFrame#contentFrame {
+    background-color: #f4f3ee;
+}
+
+#mainWindow QLabel#appLogo {
+    font-size: 32px;
+    color: #606c38;
+}
+
+#mainWindow QLabel#appTitle {
+    font-size: 24px;
+    font-weight: bold;
+    color: #606c38;
+    margin: 0;
+}
+
+#mainWindow QLabel#appSubtitle {
+    font-size: 12px;
+    color: #666;
+    margin: 0;
+}
+
+#mainWindow QLabel#userLabel {
+    font-size: 14px;
+    color: #333;
+    font-weight: bold;
+}
+
+/* Цветовая индикация типа пользователя */
+#mainWindow QLabel#adminAccessLabel, #mainWindow QLabel#userAccessLabel {
+    font-size: 12px;
+    font-weight: bold;
+    margin-bottom: 5px;
+}
+
+#mainWindow QLabel#adminAccessLabel {
+    color: #d32f2f;
+}
+
+#mainWindow QLabel#userAccessLabel {
+    color: #1976d2;
+}
+
+#mainWindow QPushButton#logoutBtn {
+    background-color: #dc3545;
+    color: white;
+    border: none;
+    border-radius: 5px;
+    padding: 5px 15px;
+    font-size: 12px;
+    font-weight: bold;
+    min-width: 0px;
+}
+
+#mainWindow QPushButton#logoutBtn:hover {
+    background-color: #c82333;
+}
+
+#mainWindow QPushButton#navBtn {
+    background-color: #606c38;
+    color: white;
+    border: none;
+    border-radius: 8px;
+    padding: 15px 25px;
+    font-size: 16px;
+    font-weight: bold;
+    margin: 10px;
+    min-width: 200px;
+    min-height: 50px;
+}
+
+#mainWindow QPushButton#navBtn:hover {
+    background-color: #4a5228;
+}
+
+#mainWindow QLabel#welcomeTitle {
+    font-size: 28px;
+    font-weight: bold;
+    color: #606c38;
+    margin-bottom: 20px;
+}
+
+#mainWindow QLabel#welcomeText {
+    font-size: 16px;
+    color: #666;
+    margin-bottom: 30px;
+}
+"""
+
+# Серые кнопки с черным текстом на экранах партнеров и истории продаж
+LIST_BUTTONS_STYLE = """
+#partnersScreen QPushButton, #salesHistoryScreen QPushButton {
+    background-color: #f0f0f0;
+    color: black;
+    border: 1px solid #ccc;
+    border-radius: 5px;
+    padding: 8px 16px;
+    font-size: 14px;
+    font-weight: bold;
+    min-width: 80px;
+}
+
+#partnersScreen QPushButton:hover, #salesHistoryScreen QPushButton:hover {
+    background-color: #e0e0e0;
+    border-color: #999;
+    color: black;
+}
+
+#partnersScreen QPushButton:pressed, #salesHistoryScreen QPushButton:pressed {
+    background-color: #d0d0d0;
+    color: black;
+}
+
+#partnersScreen QPushButton#deleteBtn, #salesHistoryScreen QPushButton#deleteBtn {
+    background-color: #ffebee;
+    border: 1px solid #f44336;
+}
+
+#partnersScreen QPushButton#deleteBtn:hover, #salesHistoryScreen QPushButton#deleteBtn:hover {
+    background-color: #ffcdd2;
+    border-color: #d32f2f;
+}
+
+#partnersScreen QPushButton#deleteBtn:pressed, #salesHistoryScreen QPushButton#deleteBtn:pressed {
+    background-color: #ffb3ba;
+}
+
+#partnersScreen QLabel#infoLabel, #salesHistoryScreen QLabel#infoLabel {
+    background-color: #e3f2fd;
+    border: 1px solid #bbdefb;
+    border-radius: 5px;
+    padding: 8px;
+    color: #1976d2;
+    font-size: 12px;
+    margin: 5px;
+}
+
+#salesHistoryScreen QLabel#infoLabel {
+    margin: 5px 0;
+}
+"""
+
+PARTNERS_STYLE = """
+#partnersScreen QLabel#title {
+    font-size: 28px;
+    font-weight: bold;
+    color: black;
+    margin-bottom: 10px;
+    padding: 10px 0px;
+}
+
+#partnersScreen QLabel#accessInfo {
+    font-size: 12px;
+    color: #666;
+    font-style: italic;
+    margin-bottom: 30px;
+    padding: 15px 20px;
+    background-color: #f8f9fa;
+    border: 1px solid #e9ecef;
+    border-radius: 5px;
+    min-height: 40px;
+    line-height: 1.5;
+}
+"""
+
+SALES_HISTORY_STYLE = """
+#salesHistoryScreen QLabel#userInfo {
+    font-size: 12px;
+    color: #666;
+    font-style: italic;
+    margin-bottom: 10px;
+}
+
+#salesHistoryScreen QLabel#discountInfoLabel {
+    font-size: 14px;
+    font-weight: bold;
+    color: #2c3e50;
+    padding: 10px;
+    background-color: #ecf0f1;
+    border-radius: 5px;
+}
+"""
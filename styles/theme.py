@@ -0,0 +1,33 @@
+from styles import styles
+
+
+# Порядок важен: правила экранов идут после общих и переопределяют их
+STYLE_SECTIONS = (
+    styles.FONT_STYLE,
+    styles.MAIN_STYLE,
+    styles.FORM_STYLE,
+    styles.AUTH_STYLE,
+    styles.REGISTER_STYLE,
+    styles.MAIN_WINDOW_STYLE,
+    styles.LIST_BUTTONS_STYLE,
+    styles.PARTNERS_STYLE,
+    styles.SALES_HISTORY_STYLE,
+)
+
+_stylesheet = None
+
+
+def build_stylesheet():
+    """Собирает таблицу стилей всего приложения (один раз за запуск)"""
+    global _stylesheet
+    if _stylesheet is None:
+        _stylesheet = '\n'.join(section.strip() for section in STYLE_SECTIONS) + '\n'
+    return _stylesheet
+
+
+def apply_theme(app):
+    """
+    Применяет тему ко всему приложению. Таблица стилей разбирается Qt один раз,
+    экраны только задают имена объектов и не вызывают setStyleSheet.
+    """
+    app.setStyleSheet(build_stylesheet())
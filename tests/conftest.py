@@ -0,0 +1,22 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Экраны создаются без дисплея
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture
+def database_copy(tmp_path, monkeypatch):
+    """Копия базы из репозитория; экраны открывают ее по стандартному пути database/masterpol.db"""
+    from database.connection import close_all_connections
+
+    os.makedirs(tmp_path / 'database')
+    shutil.copy(os.path.join(ROOT, 'database', 'masterpol.db'), tmp_path / 'database' / 'masterpol.db')
+    monkeypatch.chdir(tmp_path)
+    yield os.path.join('database', 'masterpol.db')
+    close_all_connections()
@@ -0,0 +1,41 @@
+import sqlite3
+
+import pytest
+
+from database.migrations import MigrationError, get_schema_version, migrate
+
+
+def _set_price(conn, price):
+    """Меняет цену первого продукта в копии базы до миграции; возвращает его ROWID"""
+    rowid = conn.execute("SELECT MIN(ROWID) FROM Products_Import").fetchone()[0]
+    conn.execute("UPDATE Products_Import SET MinPartnerPrice = ? WHERE ROWID = ?", (price, rowid))
+    conn.commit()
+    return rowid
+
+
+def test_comma_decimal_price_is_converted_to_kopecks(database_copy):
+    conn = sqlite3.connect(database_copy)
+    rowid = _set_price(conn, '12,5')
+
+    migrate(conn)
+
+    price = conn.execute("SELECT MinPartnerPrice FROM Products_Import WHERE ROWID = ?", (rowid,)).fetchone()[0]
+    assert price == 1250
+    assert conn.execute("SELECT COUNT(*) FROM Products_Import WHERE typeof(MinPartnerPrice) != 'integer'"
+                        ).fetchone()[0] == 0
+    conn.close()
+
+
+def test_garbage_price_stops_migration(database_copy):
+    conn = sqlite3.connect(database_copy)
+    rowid = _set_price(conn, 'abc')
+
+    with pytest.raises(MigrationError, match="'abc'"):
+        migrate(conn)
+
+    # Шаг с ценами откатывается целиком, версия схемы остается предыдущей
+    assert get_schema_version(conn) == 4
+    prices = dict(conn.execute("SELECT ROWID, MinPartnerPrice FROM Products_Import"))
+    assert prices[rowid] == 'abc'
+    assert '7330,99' in prices.values()
+    conn.close()
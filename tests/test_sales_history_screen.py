@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+pytest.importorskip('PyQt5')
+
+from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+from database.auth_service import Session
+from database.db_manager import DatabaseManager
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _wait(app, condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_page_error_is_reported(app, database_copy, monkeypatch):
+    from ui.sales_history_screen import SalesHistoryScreen
+
+    errors = []
+    monkeypatch.setattr(QMessageBox, 'critical', staticmethod(lambda parent, title, text: errors.append(text)))
+
+    inn = DatabaseManager(database_copy).get_connection().execute(
+        "SELECT INN FROM Partners_Import ORDER BY PartnerID LIMIT 1").fetchone()[0]
+    screen = SalesHistoryScreen(inn, "Партнер", Session(1, 'admin', 'admin'))
+    assert _wait(app, lambda: screen.sales_model.rowCount() > 0)
+
+    def failing_query(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(DatabaseManager, '_query_sales_history', failing_query)
+    screen.fetch_sales_page(('2099-01-01', 1), 10)
+
+    assert _wait(app, lambda: errors)
+    assert "database is locked" in errors[0]
+    # После ошибки модель больше не запрашивает страницы
+    assert not screen.sales_model.canFetchMore()
+
+
+def test_period_filters_history(app, database_copy, monkeypatch):
+    from ui.sales_history_screen import SalesHistoryScreen
+
+    monkeypatch.setattr(QMessageBox, 'critical', staticmethod(lambda parent, title, text: None))
+    conn = DatabaseManager(database_copy).get_connection()
+    inn, first_sale, last_sale = conn.execute('''
+        SELECT p.INN, MIN(s.SaleDate), MAX(s.SaleDate)
+        FROM Partners_Import p JOIN Partner_Products_Import s ON s.PartnerID = p.PartnerID
+        GROUP BY p.PartnerID ORDER BY p.PartnerID LIMIT 1
+    ''').fetchone()
+    total = conn.execute('''
+        SELECT COUNT(*) FROM Partner_Products_Import s JOIN Partners_Import p ON s.PartnerID = p.PartnerID
+        WHERE p.INN = ? AND s.SaleDate = ?
+    ''', (inn, last_sale)).fetchone()[0]
+
+    screen = SalesHistoryScreen(inn, "Партнер", Session(1, 'admin', 'admin'))
+    assert _wait(app, lambda: screen.sales_model.rowCount() > 0)
+
+    last = QDate.fromString(last_sale, Qt.ISODate)
+    screen.date_from_edit.setDate(last)
+    screen.date_to_edit.setDate(last)
+    screen.period_check.setChecked(True)
+    assert _wait(app, lambda: screen.sales_model.rowCount() == total)
+
+    before = QDate.fromString(first_sale, Qt.ISODate).addDays(-1)
+    screen.date_from_edit.setDate(before.addYears(-1))
+    screen.date_to_edit.setDate(before)
+    assert _wait(app, lambda: screen.sales_model.rowCount() == 0)
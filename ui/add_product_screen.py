@@ -5,6 +5,10 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import pyqtSignal
 from database.db_manager import DatabaseManager
+from database.logger import get_logger
+
+
+logger = get_logger(__name__)
 
 
 class AddProductScreen(QWidget):
@@ -126,12 +130,9 @@ class AddProductScreen(QWidget):
                 'MinPartnerPrice': self.price_spin.value()
             }
 
-            # Добавляем отладочную информацию
-            print(f"Добавляем продукт для партнера с ИНН: {self.partner_inn}")
-            print(f"Данные продукта: {product_data}")
+            logger.debug("Добавляем продукт для партнера с ИНН %s: %s", self.partner_inn, product_data)
 
             result = self.db_manager.add_product_with_partner_id(product_data, self.partner_inn)
-            print(f"Результат добавления: {result}")
 
             if result:
                 QMessageBox.information(self, "Успех", "Продукт успешно добавлен!")
@@ -143,7 +144,7 @@ class AddProductScreen(QWidget):
                 QMessageBox.warning(self, "Ошибка", "Не удалось добавить продукт")
 
         except Exception as e:
-            print(f"Ошибка при сохранении: {str(e)}")
+            logger.exception("Ошибка при сохранении продукта")
             QMessageBox.critical(self, "Ошибка", f"Ошибка при сохранении: {str(e)}")
 
     def clear_fields(self):
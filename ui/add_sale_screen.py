@@ -81,18 +81,6 @@ class AddSaleScreen(QWidget):
 
         self.total_sum_label = QLabel("0.00 ₽")
         self.total_sum_label.setObjectName("totalSumLabel")
-        self.total_sum_label.setStyleSheet("""
-            QLabel#totalSumLabel {
-                font-size: 16px;
-                font-weight: bold;
-                color: #606c38;
-                background-color: #f4f3ee;
-                border: 2px solid #dda15e;
-                border-radius: 6px;
-                padding: 10px;
-                text-align: center;
-            }
-        """)
         form_layout.addRow("Общая сумма:", self.total_sum_label)
 
         content_layout.addLayout(form_layout)
@@ -134,11 +122,12 @@ class AddSaleScreen(QWidget):
                 return
 
             for product_id, product_name, min_price in self.products_data:
-                try:
-                    price_float = float(str(min_price).replace(',', '.'))
-                    display_text = f"{product_name} (мин. цена: {price_float:.2f} ₽)"
-                except:
-                    display_text = f"{product_name} (цена: {min_price})"
+                if isinstance(min_price, (int, float)):
+                    display_text = f"{product_name} (мин. цена: {min_price:.2f} ₽)"
+                else:
+                    # Цена не задана: продукт можно выбрать, цена вводится вручную
+                    display_text = f"{product_name} (цена не указана)"
+                    min_price = None
 
                 product_data = {
                     'id': product_id,
@@ -156,11 +145,7 @@ class AddSaleScreen(QWidget):
         product_data = self.product_combo.currentData()
 
         if product_data and product_data.get('min_price'):
-            try:
-                min_price = float(str(product_data['min_price']).replace(',', '.'))
-                self.price_spin.setValue(min_price)
-            except:
-                self.price_spin.setValue(0.00)
+            self.price_spin.setValue(product_data['min_price'])
         else:
             self.price_spin.setValue(0.00)
 
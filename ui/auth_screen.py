@@ -3,15 +3,21 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
                              QFrame, QSizePolicy, QComboBox)
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QPixmap, QPainter, QBrush, QColor
-from database.auth_manager import AuthManager
+from database.auth_service import get_auth_service
+from ui.query_executor import QueryExecutor
+from ui.screens import create_screen
 
 
 class AuthScreen(QWidget):
-    authentication_successful = pyqtSignal(str, str)  # user_type, username
+    authentication_successful = pyqtSignal(object)  # Session
 
     def __init__(self):
         super().__init__()
-        self.auth_manager = AuthManager()
+        self.setObjectName("authScreen")
+        self.auth_service = get_auth_service()
+        # Проверка пароля и создание пользователей по умолчанию выполняются в фоновом потоке
+        self.executor = QueryExecutor(self)
+        self.executor.submit('default_users', self.auth_service.ensure_default_users)
         self.init_ui()
 
     def init_ui(self):
@@ -24,13 +30,6 @@ class AuthScreen(QWidget):
         auth_container = QFrame()
         auth_container.setObjectName("authContainer")
         auth_container.setFixedSize(480, 650)  # Немного увеличена высота
-        auth_container.setStyleSheet("""
-            QFrame#authContainer {
-                background-color: white;
-                border: 2px solid #dda15e;
-                border-radius: 15px;
-            }
-        """)
 
         container_layout = QVBoxLayout()
         container_layout.setSpacing(15)  # Увеличен отступ между секциями
@@ -57,69 +56,25 @@ class AuthScreen(QWidget):
                 # Масштабируем изображение на всю ширину контейнера
                 scaled_pixmap = pixmap.scaled(100, 60, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
                 app_icon.setPixmap(scaled_pixmap)
-                app_icon.setStyleSheet("""
-                    QLabel {
-                        background: transparent;
-                        border: none;
-                        padding: 10px;
-                        margin: 0 auto;
-                        min-width: 180px;
-                    }
-                """)
+                app_icon.setObjectName("authLogo")
             else:
                 # Если файл не найден, используем эмодзи
                 app_icon.setText("🏢")
-                app_icon.setStyleSheet("""
-                    QLabel {
-                        font-size: 48px;
-                        color: #606c38;
-                        background: transparent;
-                        border: none;
-                        margin: 0 auto;
-                    }
-                """)
+                app_icon.setObjectName("authLogoText")
         except:
             # Если произошла ошибка, используем эмодзи
             app_icon.setText("🏢")
-            app_icon.setStyleSheet("""
-                QLabel {
-                    font-size: 48px;
-                    color: #606c38;
-                    background: transparent;
-                    border: none;
-                    margin: 0 auto;
-                }
-            """)
+            app_icon.setObjectName("authLogoText")
 
         logo_wrapper.addWidget(app_icon)
 
         app_title = QLabel("Мастер-пол")
         app_title.setAlignment(Qt.AlignCenter)
-        app_title.setStyleSheet("""
-            QLabel {
-                font-size: 24px;
-                font-weight: bold;
-                color: #606c38;
-                background: transparent;
-                border: none;
-                margin-top: 5px;
-                margin-bottom: 5px;
-            }
-        """)
+        app_title.setObjectName("authTitle")
 
         app_subtitle = QLabel("Система управления партнерами")
         app_subtitle.setAlignment(Qt.AlignCenter)
-        app_subtitle.setStyleSheet("""
-            QLabel {
-                font-size: 14px;
-                color: #666;
-                background: transparent;
-                border: none;
-                margin-bottom: 15px;
-                line-height: 1.4;
-                padding: 0px 10px;
-            }
-        """)
+        app_subtitle.setObjectName("authSubtitle")
 
         title_layout.addLayout(logo_wrapper)  # Добавляем обертку вместо прямого виджета
         title_layout.addWidget(app_title)
@@ -136,17 +91,7 @@ class AuthScreen(QWidget):
 
         # Поле логина
         login_label = QLabel("Логин:")
-        login_label.setStyleSheet("""
-            QLabel {
-                color: #333;
-                font-weight: bold;
-                font-size: 14px;
-                background: transparent;
-                border: none;
-                margin-bottom: 5px;
-                padding: 0px;
-            }
-        """)
+        login_label.setObjectName("authFieldLabel")
 
         self.username_edit = QLineEdit()
         self.username_edit.setPlaceholderText("Введите логин")
@@ -157,17 +102,7 @@ class AuthScreen(QWidget):
 
         # Поле пароля
         password_label = QLabel("Пароль:")
-        password_label.setStyleSheet("""
-            QLabel {
-                color: #333;
-                font-weight: bold;
-                font-size: 14px;
-                background: transparent;
-                border: none;
-                margin-bottom: 5px;
-                padding: 0px;
-            }
-        """)
+        password_label.setObjectName("authFieldLabel")
 
         self.password_edit = QLineEdit()
         self.password_edit.setPlaceholderText("Введите пароль")
@@ -179,17 +114,7 @@ class AuthScreen(QWidget):
 
         # Тип пользователя
         type_label = QLabel("Тип доступа:")
-        type_label.setStyleSheet("""
-            QLabel {
-                color: #333;
-                font-weight: bold;
-                font-size: 14px;
-                background: transparent;
-                border: none;
-                margin-bottom: 5px;
-                padding: 0px;
-            }
-        """)
+        type_label.setObjectName("authFieldLabel")
 
         self.user_type_combo = QComboBox()
         self.user_type_combo.addItems(["Пользователь", "Администратор"])
@@ -227,17 +152,7 @@ class AuthScreen(QWidget):
 Пользователь: user / user123
         """.strip())
         info_label.setAlignment(Qt.AlignCenter)
-        info_label.setStyleSheet("""
-            QLabel {
-                font-size: 11px;
-                color: #888;
-                background: transparent;
-                border: 1px solid #e9ecef;
-                border-radius: 5px;
-                padding: 10px;
-                margin-top: 15px;
-            }
-        """)
+        info_label.setObjectName("authInfo")
         container_layout.addWidget(info_label)
 
         auth_container.setLayout(container_layout)
@@ -245,103 +160,11 @@ class AuthScreen(QWidget):
 
         self.setLayout(main_layout)
 
-        # Применяем стили
-        self.apply_styles()
-
         # Подключаем события
         self.login_btn.clicked.connect(self.authenticate_user)
         self.register_btn.clicked.connect(self.show_register_dialog)
         self.password_edit.returnPressed.connect(self.authenticate_user)
 
-    def apply_styles(self):
-        """Применяет стили к элементам формы"""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f4f3ee;
-                font-family: Arial, Helvetica, sans-serif;
-            }
-
-            QLineEdit#authField, QComboBox#authField {
-                border: 2px solid #dda15e;
-                border-radius: 8px;
-                padding: 12px 15px;
-                font-size: 14px;
-                background-color: white;
-                color: #333;
-                margin-top: 5px;
-                margin-bottom: 10px;
-                min-width: 200px;
-            }
-
-            QLineEdit#authField:focus, QComboBox#authField:focus {
-                border-color: #606c38;
-                outline: none;
-            }
-
-            QComboBox#authField::drop-down {
-                border: none;
-                width: 30px;
-            }
-
-            QComboBox#authField::down-arrow {
-                image: none;
-                border-left: 5px solid transparent;
-                border-right: 5px solid transparent;
-                border-top: 5px solid #666;
-                margin-right: 10px;
-            }
-
-            QPushButton#loginBtn {
-                background-color: #606c38;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: bold;
-                padding: 15px;
-            }
-
-            QPushButton#loginBtn:hover {
-                background-color: #4a5228;
-            }
-
-            QPushButton#loginBtn:pressed {
-                background-color: #3d441f;
-            }
-
-            QPushButton#registerBtn {
-                background-color: transparent;
-                color: #606c38;
-                border: 2px solid #606c38;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-                padding: 10px;
-            }
-
-            QPushButton#registerBtn:hover {
-                background-color: #606c38;
-                color: white;
-            }
-
-            QLabel {
-                color: #333;
-                font-weight: bold;
-                font-size: 14px;
-                background: transparent;
-                border: none;
-                margin: 0px;
-                padding: 2px;
-            }
-
-            QFormLayout QLabel {
-                background: transparent;
-                border: none;
-                margin-bottom: 5px;
-                margin-top: 5px;
-            }
-        """)
-
     def authenticate_user(self):
         """Аутентификация пользователя"""
         username = self.username_edit.text().strip()
@@ -352,9 +175,24 @@ class AuthScreen(QWidget):
             QMessageBox.warning(self, "Ошибка", "Заполните все поля!")
             return
 
-        if self.auth_manager.authenticate_user(username, password, user_type):
-            QMessageBox.information(self, "Успех", f"Добро пожаловать, {username}!")
-            self.authentication_successful.emit(user_type, username)
+        if not self.login_btn.isEnabled():
+            # Предыдущая проверка еще выполняется
+            return
+
+        self.login_btn.setEnabled(False)
+        self.login_btn.setText("Проверка...")
+        self.executor.submit('authenticate', self.auth_service.login, username, password, user_type,
+                             on_result=self.on_authentication_finished,
+                             on_error=lambda message: self.on_authentication_finished(None))
+
+    def on_authentication_finished(self, session):
+        """Результат проверки пароля из фонового потока: Session или None"""
+        self.login_btn.setEnabled(True)
+        self.login_btn.setText("Войти в систему")
+
+        if session is not None:
+            QMessageBox.information(self, "Успех", f"Добро пожаловать, {session.username}!")
+            self.authentication_successful.emit(session)
         else:
             QMessageBox.warning(self, "Ошибка",
                                 "Неверный логин, пароль или тип доступа!\n\n"
@@ -364,8 +202,7 @@ class AuthScreen(QWidget):
 
     def show_register_dialog(self):
         """Показывает диалог регистрации"""
-        from ui.register_screen import RegisterScreen
-        self.register_dialog = RegisterScreen()
+        self.register_dialog = create_screen('register')
         self.register_dialog.user_registered.connect(self.on_user_registered)
         self.register_dialog.setWindowTitle("Регистрация пользователя")
         self.register_dialog.setFixedSize(400, 350)
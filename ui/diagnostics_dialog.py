@@ -0,0 +1,89 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton,
+                             QFileDialog, QMessageBox, QCheckBox)
+from PyQt5.QtGui import QFont
+from database.instrumentation import format_report, get_instrumentation
+
+
+class DiagnosticsDialog(QDialog):
+    """Статистика вызовов базы данных, журнал медленных запросов, соединения и кэши"""
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.setWindowTitle("Диагностика")
+        self.resize(1000, 600)
+        self.init_ui()
+        self.refresh()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.report_edit = QPlainTextEdit()
+        self.report_edit.setReadOnly(True)
+        self.report_edit.setLineWrapMode(QPlainTextEdit.NoWrap)
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.Monospace)
+        self.report_edit.setFont(font)
+        layout.addWidget(self.report_edit)
+
+        buttons_layout = QHBoxLayout()
+        # Сбор выключен по умолчанию (MASTERPOL_INSTRUMENTATION): его включают, чтобы найти медленный вызов
+        self.enabled_check = QCheckBox("Собирать статистику")
+        self.enabled_check.setChecked(get_instrumentation().enabled)
+        self.enabled_check.toggled.connect(self.set_enabled)
+        refresh_btn = QPushButton("Обновить")
+        refresh_btn.clicked.connect(self.refresh)
+        reset_btn = QPushButton("Сбросить статистику")
+        reset_btn.clicked.connect(self.reset)
+        save_btn = QPushButton("Сохранить...")
+        save_btn.clicked.connect(self.save)
+        close_btn = QPushButton("Закрыть")
+        close_btn.clicked.connect(self.accept)
+
+        buttons_layout.addWidget(self.enabled_check)
+        buttons_layout.addWidget(refresh_btn)
+        buttons_layout.addWidget(reset_btn)
+        buttons_layout.addWidget(save_btn)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(close_btn)
+        layout.addLayout(buttons_layout)
+
+        self.setLayout(layout)
+
+    def build_report(self):
+        connections = self.db_manager.connection_manager.get_stats()
+        cache = self.db_manager.partner_cache.get_stats()
+        lines = [
+            f"База данных: {connections['db_path']}",
+            f"Соединения: открыто {connections['opened']}, повторно использовано "
+            f"{connections['reused']}, активно {connections['active']}",
+            f"Кэш партнеров: попаданий {cache['hits']}, промахов {cache['misses']}, записей {cache['size']}",
+        ]
+        # Кэш экранов есть у главного окна, из которого открыт диалог
+        screen_cache = getattr(self.parent(), 'screen_cache', None)
+        if screen_cache is not None:
+            lines.extend(screen_cache.memory_report())
+        lines.extend(["", format_report()])
+        return '\n'.join(lines)
+
+    def refresh(self):
+        self.report_edit.setPlainText(self.build_report())
+
+    def set_enabled(self, enabled):
+        get_instrumentation().enabled = enabled
+        self.refresh()
+
+    def reset(self):
+        get_instrumentation().reset()
+        self.refresh()
+
+    def save(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Сохранить отчет", "диагностика.txt",
+                                              "Текстовые файлы (*.txt)")
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(self.build_report())
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить отчет: {e}")
@@ -126,14 +126,7 @@ class EditProductScreen(QWidget):
                     self.product_type_combo.setCurrentIndex(i)
                     break
 
-            min_price = self.product_data.get('MinPartnerPrice', 0)
-            if isinstance(min_price, str):
-                try:
-                    min_price = float(min_price.replace(',', '.'))
-                except (ValueError, AttributeError):
-                    min_price = 0.0
-
-            self.price_spin.setValue(float(min_price))
+            self.price_spin.setValue(self.product_data.get('MinPartnerPrice') or 0.0)
 
         except Exception as e:
             QMessageBox.warning(self, "Ошибка", f"Ошибка при загрузке данных: {str(e)}")
@@ -3,6 +3,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
                              QMessageBox, QFrame, QSizePolicy)
 from PyQt5.QtCore import Qt, pyqtSignal
 from database.db_manager import DatabaseManager
+from database.conversions import format_sale_date
 
 
 class EditSaleScreen(QWidget):
@@ -51,14 +52,7 @@ class EditSaleScreen(QWidget):
         content_layout.addWidget(form_subtitle)
 
         self.sale_info_label = QLabel("Загрузка данных продажи...")
-        self.sale_info_label.setObjectName("formSubtitle")
-        self.sale_info_label.setStyleSheet("""
-            QLabel {
-                color: #666;
-                font-style: italic;
-                margin-bottom: 10px;
-            }
-        """)
+        self.sale_info_label.setObjectName("saleInfoLabel")
         content_layout.addWidget(self.sale_info_label)
 
         form_layout = QFormLayout()
@@ -92,18 +86,6 @@ class EditSaleScreen(QWidget):
 
         self.total_sum_label = QLabel("0.00 ₽")
         self.total_sum_label.setObjectName("totalSumLabel")
-        self.total_sum_label.setStyleSheet("""
-            QLabel#totalSumLabel {
-                font-size: 16px;
-                font-weight: bold;
-                color: #606c38;
-                background-color: #f4f3ee;
-                border: 2px solid #dda15e;
-                border-radius: 6px;
-                padding: 10px;
-                text-align: center;
-            }
-        """)
         form_layout.addRow("Общая сумма:", self.total_sum_label)
 
         content_layout.addLayout(form_layout)
@@ -134,7 +116,7 @@ class EditSaleScreen(QWidget):
                 QMessageBox.critical(self, "Ошибка", "Продажа не найдена")
                 self.close()
                 return
-            sale_date = self.current_sale_data.get('SaleDate', 'неизвестно')
+            sale_date = format_sale_date(self.current_sale_data.get('SaleDate')) or 'неизвестно'
             product_name = self.current_sale_data.get('ProductName', 'неизвестно')
             self.sale_info_label.setText(f"Редактирование продажи от {sale_date} - {product_name}")
         except Exception as e:
@@ -156,11 +138,12 @@ class EditSaleScreen(QWidget):
             current_product_id = self.current_sale_data.get('ProductID') if self.current_sale_data else None
             for i, product in enumerate(self.products_data):
                 product_id, product_name, min_price = product
-                try:
-                    price_float = float(str(min_price).replace(',', '.'))
-                    display_text = f"{product_name} (мин. цена: {price_float:.2f} ₽)"
-                except:
-                    display_text = f"{product_name} (цена: {min_price})"
+                if isinstance(min_price, (int, float)):
+                    display_text = f"{product_name} (мин. цена: {min_price:.2f} ₽)"
+                else:
+                    # Цена не задана: продукт можно выбрать, цена вводится вручную
+                    display_text = f"{product_name} (цена не указана)"
+                    min_price = None
                 product_data = {'id': product_id, 'name': product_name, 'min_price': min_price}
                 self.product_combo.addItem(display_text, product_data)
                 if current_product_id and product_id == current_product_id:
@@ -186,8 +169,7 @@ class EditSaleScreen(QWidget):
             else:
                 product_data = self.product_combo.currentData()
                 if product_data and product_data.get('min_price'):
-                    min_price = float(str(product_data['min_price']).replace(',', '.'))
-                    self.price_spin.setValue(min_price)
+                    self.price_spin.setValue(product_data['min_price'])
             self.update_total_sum()
         except:
             pass
@@ -196,11 +178,7 @@ class EditSaleScreen(QWidget):
         product_data = self.product_combo.currentData()
         if hasattr(self, '_form_filled') and self._form_filled:
             if product_data and product_data.get('min_price'):
-                try:
-                    min_price = float(str(product_data['min_price']).replace(',', '.'))
-                    self.price_spin.setValue(min_price)
-                except:
-                    self.price_spin.setValue(0.00)
+                self.price_spin.setValue(product_data['min_price'])
             else:
                 self.price_spin.setValue(0.00)
         self.update_total_sum()
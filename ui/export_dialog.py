@@ -0,0 +1,138 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QComboBox, QCheckBox,
+                             QDateEdit, QDialogButtonBox, QFileDialog, QMessageBox,
+                             QProgressDialog)
+from PyQt5.QtCore import Qt, QDate
+from database.exporter import export_partner_report, export_sales, format_result
+
+
+class ExportDialog(QDialog):
+    """Выбор выгрузки: продажи партнера или всех партнеров за период, либо отчет по партнерам"""
+
+    def __init__(self, partner_inn=None, partner_name=None, parent=None):
+        super().__init__(parent)
+        self.partner_inn = partner_inn
+        self.setWindowTitle("Экспорт данных")
+        self.setMinimumWidth(420)
+        self.init_ui(partner_name)
+
+    def init_ui(self, partner_name):
+        layout = QVBoxLayout()
+        form_layout = QFormLayout()
+
+        # (вид выгрузки, ИНН партнера)
+        self.reports = []
+        self.report_combo = QComboBox()
+        if self.partner_inn:
+            self.reports.append(('sales', self.partner_inn))
+            self.report_combo.addItem(f"Продажи партнера «{partner_name}»")
+        self.reports.append(('sales', None))
+        self.report_combo.addItem("Продажи всех партнеров")
+        self.reports.append(('partners', None))
+        self.report_combo.addItem("Отчет по партнерам")
+        self.report_combo.currentIndexChanged.connect(self.update_period_state)
+        form_layout.addRow("Выгрузка:", self.report_combo)
+
+        self.period_check = QCheckBox("Только за период")
+        self.period_check.toggled.connect(self.update_period_state)
+        form_layout.addRow("", self.period_check)
+
+        self.date_from_edit = QDateEdit(QDate.currentDate().addYears(-1))
+        self.date_to_edit = QDateEdit(QDate.currentDate())
+        for date_edit in (self.date_from_edit, self.date_to_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd.MM.yyyy")
+        form_layout.addRow("С:", self.date_from_edit)
+        form_layout.addRow("По:", self.date_to_edit)
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("CSV (Excel, разделитель ';')", 'csv')
+        self.format_combo.addItem("Книга Excel (XLSX)", 'xlsx')
+        form_layout.addRow("Формат:", self.format_combo)
+
+        layout.addLayout(form_layout)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Ok).setText("Выгрузить...")
+        buttons.button(QDialogButtonBox.Cancel).setText("Отмена")
+        buttons.accepted.connect(self.choose_file)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.setLayout(layout)
+        self.update_period_state()
+
+    def update_period_state(self):
+        """Период доступен только для выгрузки продаж"""
+        is_sales = self.reports[self.report_combo.currentIndex()][0] == 'sales'
+        self.period_check.setEnabled(is_sales)
+        use_period = is_sales and self.period_check.isChecked()
+        self.date_from_edit.setEnabled(use_period)
+        self.date_to_edit.setEnabled(use_period)
+
+    def choose_file(self):
+        if self.period_check.isChecked() and self.date_from_edit.date() > self.date_to_edit.date():
+            QMessageBox.warning(self, "Ошибка", "Начало периода позже его конца")
+            return
+
+        extension = self.format_combo.currentData()
+        file_filter = "Книга Excel (*.xlsx)" if extension == 'xlsx' else "CSV (*.csv)"
+        path, _ = QFileDialog.getSaveFileName(self, "Сохранить выгрузку", f"выгрузка.{extension}", file_filter)
+        if not path:
+            return
+        if not path.lower().endswith(f'.{extension}'):
+            path += f'.{extension}'
+
+        self.path = path
+        self.accept()
+
+    def options(self):
+        """Параметры выбранной выгрузки: kind, path, partner_inn, date_from, date_to"""
+        kind, partner_inn = self.reports[self.report_combo.currentIndex()]
+        date_from = date_to = None
+        if kind == 'sales' and self.period_check.isChecked():
+            date_from = self.date_from_edit.date().toString("yyyy-MM-dd")
+            date_to = self.date_to_edit.date().toString("yyyy-MM-dd")
+        return {'kind': kind, 'path': self.path, 'partner_inn': partner_inn,
+                'date_from': date_from, 'date_to': date_to}
+
+
+def run_export(parent, executor, db_manager, partner_inn=None, partner_name=None):
+    """
+    Показывает ExportDialog и выполняет выгрузку в фоновом потоке executor.
+    Ход выгрузки отображается в окне прогресса, кнопка "Отмена" прерывает ее.
+    """
+    dialog = ExportDialog(partner_inn, partner_name, parent)
+    if dialog.exec_() != QDialog.Accepted:
+        return
+    options = dialog.options()
+
+    # Число строк заранее неизвестно, поэтому индикатор без шкалы
+    progress_dialog = QProgressDialog("Подготовка выгрузки...", "Отмена", 0, 0, parent)
+    progress_dialog.setWindowTitle("Экспорт данных")
+    progress_dialog.setWindowModality(Qt.WindowModal)
+    progress_dialog.setMinimumDuration(0)
+    progress_dialog.setAutoClose(False)
+    progress_dialog.setAutoReset(False)
+    progress_dialog.canceled.connect(lambda: executor.cancel('export'))
+
+    def on_progress(rows):
+        progress_dialog.setLabelText(f"Выгружено строк: {rows}")
+
+    def on_result(result):
+        progress_dialog.close()
+        QMessageBox.information(parent, "Экспорт данных", format_result(result))
+
+    def on_error(message):
+        progress_dialog.close()
+        QMessageBox.critical(parent, "Ошибка", f"Не удалось выгрузить данные: {message}")
+
+    if options['kind'] == 'sales':
+        executor.submit('export', export_sales, db_manager, options['path'], options['partner_inn'],
+                        options['date_from'], options['date_to'],
+                        on_result=on_result, on_error=on_error, on_progress=on_progress,
+                        cancellable=True)
+    else:
+        executor.submit('export', export_partner_report, db_manager, options['path'],
+                        on_result=on_result, on_error=on_error, on_progress=on_progress,
+                        cancellable=True)
+    progress_dialog.show()
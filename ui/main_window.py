@@ -1,23 +1,31 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QFrame, QMessageBox, QMenuBar,
-                             QAction, QStatusBar)
+                             QAction, QStatusBar, QFileDialog, QInputDialog)
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QIcon, QPixmap
-from ui.partners_screen import PartnersScreen
+from database.db_manager import DatabaseManager
+from database.importer import KIND_NAMES, format_result, import_file
+from ui.query_executor import QueryExecutor
+from ui.screen_cache import ScreenCache
+from ui.screens import create_screen, is_screen
 
 
 class MainWindow(QMainWindow):
     logout_requested = pyqtSignal()
 
-    def __init__(self, user_type="user", username=""):
+    def __init__(self, session):
         super().__init__()
-        self.user_type = user_type  # "admin" или "user"
-        self.username = username
+        self.setObjectName("mainWindow")
+        self.session = session  # Session из database/auth_service.py: права проверяются по ней
         self.current_screen = None
+        # Экраны партнеров, продукции и истории продаж не пересоздаются при каждом открытии
+        self.screen_cache = ScreenCache()
+        # Импорт и экспорт выполняются в фоновом потоке
+        self.executor = QueryExecutor(self)
         self.init_ui()
 
     def init_ui(self):
-        self.setWindowTitle(f"Мастер-пол - {self.get_access_level_text()}")
+        self.setWindowTitle(f"Мастер-пол - {self.session.access_level_text}")
         self.setGeometry(100, 100, 1200, 800)
 
         # Создаем меню
@@ -49,9 +57,6 @@ class MainWindow(QMainWindow):
         # Создаем статус бар
         self.create_status_bar()
 
-        # Применяем стили
-        self.apply_styles()
-
         # Показываем начальный экран
         self.show_welcome_screen()
 
@@ -62,6 +67,17 @@ class MainWindow(QMainWindow):
         # Меню "Файл"
         file_menu = menubar.addMenu('Файл')
 
+        # Импорт доступен только администраторам
+        if self.session.is_admin:
+            import_action = QAction('Импорт данных...', self)
+            import_action.triggered.connect(self.import_data)
+            file_menu.addAction(import_action)
+
+        export_action = QAction('Экспорт данных...', self)
+        export_action.triggered.connect(self.export_data)
+        file_menu.addAction(export_action)
+        file_menu.addSeparator()
+
         logout_action = QAction('Выйти из аккаунта', self)
         logout_action.triggered.connect(self.logout)
         file_menu.addAction(logout_action)
@@ -80,6 +96,10 @@ class MainWindow(QMainWindow):
         # Меню "Справка"
         help_menu = menubar.addMenu('Справка')
 
+        diagnostics_action = QAction('Диагностика...', self)
+        diagnostics_action.triggered.connect(self.show_diagnostics)
+        help_menu.addAction(diagnostics_action)
+
         about_action = QAction('О программе', self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
@@ -96,7 +116,7 @@ class MainWindow(QMainWindow):
         # Логотип и название
         logo_layout = QHBoxLayout()
         logo_label = QLabel("🏢")
-        logo_label.setStyleSheet("font-size: 32px; color: #606c38;")
+        logo_label.setObjectName("appLogo")
 
         title_layout = QVBoxLayout()
         title_label = QLabel("Мастер-пол")
@@ -115,17 +135,12 @@ class MainWindow(QMainWindow):
         user_info_layout = QVBoxLayout()
         user_info_layout.setAlignment(Qt.AlignRight)
 
-        user_label = QLabel(f"Пользователь: {self.username}")
+        user_label = QLabel(f"Пользователь: {self.session.username}")
         user_label.setObjectName("userLabel")
 
-        access_label = QLabel(f"Уровень доступа: {self.get_access_level_text()}")
-        access_label.setObjectName("accessLabel")
-
+        access_label = QLabel(f"Уровень доступа: {self.session.access_level_text}")
         # Цветовая индикация типа пользователя
-        if self.user_type == "admin":
-            access_label.setStyleSheet("color: #d32f2f; font-weight: bold;")
-        else:
-            access_label.setStyleSheet("color: #1976d2; font-weight: bold;")
+        access_label.setObjectName("adminAccessLabel" if self.session.is_admin else "userAccessLabel")
 
         logout_btn = QPushButton("Выйти")
         logout_btn.setObjectName("logoutBtn")
@@ -145,99 +160,9 @@ class MainWindow(QMainWindow):
     def create_status_bar(self):
         """Создает статус бар"""
         status_bar = QStatusBar()
-        status_bar.showMessage(f"Готов к работе | {self.get_access_level_text()}")
+        status_bar.showMessage(f"Готов к работе | {self.session.access_level_text}")
         self.setStatusBar(status_bar)
 
-    def get_access_level_text(self):
-        """Возвращает текстовое описание уровня доступа"""
-        return "Администратор" if self.user_type == "admin" else "Пользователь"
-
-    def apply_styles(self):
-        """Применяет стили к интерфейсу"""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f4f3ee;
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            }
-
-            QFrame#headerFrame {
-                background-color: white;
-                border-bottom: 2px solid #dda15e;
-            }
-
-            QFrame#contentFrame {
-                background-color: #f4f3ee;
-            }
-
-            QLabel#appTitle {
-                font-size: 24px;
-                font-weight: bold;
-                color: #606c38;
-                margin: 0;
-            }
-
-            QLabel#appSubtitle {
-                font-size: 12px;
-                color: #666;
-                margin: 0;
-            }
-
-            QLabel#userLabel {
-                font-size: 14px;
-                color: #333;
-                font-weight: bold;
-            }
-
-            QLabel#accessLabel {
-                font-size: 12px;
-                margin-bottom: 5px;
-            }
-
-            QPushButton#logoutBtn {
-                background-color: #dc3545;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                padding: 5px 15px;
-                font-size: 12px;
-                font-weight: bold;
-            }
-
-            QPushButton#logoutBtn:hover {
-                background-color: #c82333;
-            }
-
-            QPushButton#navBtn {
-                background-color: #606c38;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                padding: 15px 25px;
-                font-size: 16px;
-                font-weight: bold;
-                margin: 10px;
-                min-width: 200px;
-                min-height: 50px;
-            }
-
-            QPushButton#navBtn:hover {
-                background-color: #4a5228;
-            }
-
-            QLabel#welcomeTitle {
-                font-size: 28px;
-                font-weight: bold;
-                color: #606c38;
-                margin-bottom: 20px;
-            }
-
-            QLabel#welcomeText {
-                font-size: 16px;
-                color: #666;
-                margin-bottom: 30px;
-            }
-        """)
-
     def show_welcome_screen(self):
         """Показывает приветственный экран"""
         self.clear_content()
@@ -248,11 +173,11 @@ class MainWindow(QMainWindow):
         layout.setSpacing(20)
 
         # Приветственное сообщение
-        welcome_title = QLabel(f"Добро пожаловать, {self.username}!")
+        welcome_title = QLabel(f"Добро пожаловать, {self.session.display_name}!")
         welcome_title.setObjectName("welcomeTitle")
         welcome_title.setAlignment(Qt.AlignCenter)
 
-        welcome_text = QLabel(f"Вы вошли в систему как {self.get_access_level_text().lower()}")
+        welcome_text = QLabel(f"Вы вошли в систему как {self.session.access_level_text.lower()}")
         welcome_text.setObjectName("welcomeText")
         welcome_text.setAlignment(Qt.AlignCenter)
 
@@ -279,16 +204,60 @@ class MainWindow(QMainWindow):
         """Очищает область контента"""
         if self.current_screen:
             self.content_layout.removeWidget(self.current_screen)
-            self.current_screen.deleteLater()
+            if is_screen(self.current_screen, 'partners'):
+                # Экран партнеров остается в кэше и только скрывается
+                self.current_screen.hide()
+            else:
+                self.current_screen.deleteLater()
             self.current_screen = None
 
     def show_partners(self):
         """Показывает экран партнеров"""
         self.clear_content()
-        self.current_screen = PartnersScreen(self.user_type, self.username)
+        self.current_screen = self.screen_cache.get('partners', None, self.session, self.screen_cache)
         self.content_layout.addWidget(self.current_screen)
+        self.current_screen.show()
         self.statusBar().showMessage("Раздел: Партнеры")
 
+    def import_data(self):
+        """Импорт партнеров, продукции или продаж из файла CSV/XLSX"""
+        kinds = list(KIND_NAMES.items())
+        kind_name, ok = QInputDialog.getItem(self, "Импорт данных", "Что импортировать:",
+                                             [name for _, name in kinds], 0, False)
+        if not ok:
+            return
+        kind = next(key for key, name in kinds if name == kind_name)
+
+        path, _ = QFileDialog.getOpenFileName(self, "Файл для импорта", "",
+                                              "Таблицы (*.csv *.xlsx);;Все файлы (*)")
+        if not path:
+            return
+
+        db_manager = DatabaseManager()
+        self.statusBar().showMessage(f"Импорт данных: {kind_name}...")
+        # Соединение берется в потоке пула, который выполняет импорт
+        self.executor.submit('import', lambda: import_file(db_manager.get_connection(), kind, path),
+                             on_result=self.on_import_finished,
+                             on_error=self.on_import_failed)
+
+    def on_import_finished(self, result):
+        self.statusBar().showMessage("Импорт завершен")
+        QMessageBox.information(self, "Импорт данных", format_result(result))
+        if is_screen(self.current_screen, 'partners'):
+            self.current_screen.load_partners()
+
+    def on_import_failed(self, message):
+        self.statusBar().showMessage("Ошибка импорта")
+        QMessageBox.critical(self, "Ошибка", f"Не удалось импортировать данные: {message}")
+
+    def export_data(self):
+        """Выгрузка продаж всех партнеров или отчета по партнерам в CSV/XLSX"""
+        create_screen('export', self, self.executor, DatabaseManager())
+
+    def show_diagnostics(self):
+        """Показывает статистику запросов к базе данных и журнал медленных вызовов"""
+        create_screen('diagnostics', DatabaseManager(), self).exec_()
+
     def show_about(self):
         """Показывает информацию о программе"""
         about_text = """
@@ -324,6 +293,9 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
+            # Окна продукции и истории продаж из кэша закрываются вместе с главным окном
+            self.current_screen = None
+            self.screen_cache.clear()
             event.accept()
         else:
             event.ignore()
\ No newline at end of file
@@ -1,17 +1,23 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-                             QTableWidgetItem, QLabel, QLineEdit, QMessageBox,
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+                             QLabel, QLineEdit, QMessageBox,
                              QHeaderView, QFrame, QPushButton)
 from PyQt5.QtCore import Qt, QTimer
 from database.db_manager import DatabaseManager
+from ui.query_executor import QueryExecutor
+from ui.screens import create_screen
+from ui.table_model import Column, RowTableModel, RowFilterProxyModel
 
 
 class PartnerProductsScreen(QWidget):
-    def __init__(self, partner_inn, partner_name, user_type="user"):
+    def __init__(self, partner_inn, partner_name, session):
         super().__init__()
         self.partner_inn = partner_inn
         self.partner_name = partner_name
-        self.user_type = user_type  # Добавляем информацию о типе пользователя
+        self.session = session
         self.db_manager = DatabaseManager()
+        self.data_version = None
+        # Поиск выполняется в фоновом потоке; результат устаревшего поиска отбрасывается
+        self.executor = QueryExecutor(self)
         self.search_timer = QTimer()
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self.search_products)
@@ -49,20 +55,9 @@ class PartnerProductsScreen(QWidget):
         content_layout.addWidget(partner_info)
 
         # Добавляем информацию о правах пользователя
-        if self.user_type == "user":
+        if not self.session.is_admin:
             rights_info = QLabel("Права доступа: Только просмотр")
             rights_info.setObjectName("rightsInfo")
-            rights_info.setStyleSheet("""
-                QLabel#rightsInfo {
-                    color: #d63384;
-                    background-color: #f8d7da;
-                    border: 1px solid #f5c2c7;
-                    border-radius: 4px;
-                    padding: 8px;
-                    margin: 5px 0;
-                    font-weight: bold;
-                }
-            """)
             content_layout.addWidget(rights_info)
 
         search_layout = QHBoxLayout()
@@ -78,11 +73,18 @@ class PartnerProductsScreen(QWidget):
         search_layout.addWidget(self.search_edit)
         content_layout.addLayout(search_layout)
 
-        self.products_table = QTableWidget()
-        self.products_table.setColumnCount(4)
-        self.products_table.setHorizontalHeaderLabels([
-            "Наименование продукции", "Артикул", "Тип продукции", "Мин. стоимость"
-        ])
+        self.products_model = RowTableModel([
+            Column("Наименование продукции", 0),
+            Column("Артикул", 1, alignment=Qt.AlignCenter),
+            Column("Тип продукции", 2, alignment=Qt.AlignCenter),
+            Column("Мин. стоимость", 3,
+                   formatter=lambda price: "{:,.2f} ₽".format(price) if price is not None else "",
+                   alignment=Qt.AlignRight | Qt.AlignVCenter),
+        ], self)
+        self.products_proxy = RowFilterProxyModel(self.products_model, self)
+
+        self.products_table = QTableView()
+        self.products_table.setModel(self.products_proxy)
 
         header = self.products_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)
@@ -90,11 +92,19 @@ class PartnerProductsScreen(QWidget):
         header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
 
-        self.products_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.products_table.setSelectionBehavior(QTableView.SelectRows)
+        self.products_table.setEditTriggers(QTableView.NoEditTriggers)
         self.products_table.setAlternatingRowColors(True)
         self.products_table.setSortingEnabled(True)
+        self.products_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
 
         content_layout.addWidget(self.products_table)
+
+        self.loading_label = QLabel("Загрузка...")
+        self.loading_label.setObjectName("loadingLabel")
+        self.loading_label.hide()
+        self.executor.busy_changed.connect(self.loading_label.setVisible)
+        content_layout.addWidget(self.loading_label)
         content_frame.setLayout(content_layout)
         main_layout.addWidget(content_frame)
 
@@ -120,7 +130,7 @@ class PartnerProductsScreen(QWidget):
         self.back_btn.setObjectName("backBtn")
 
         # Настраиваем видимость и доступность кнопок в зависимости от типа пользователя
-        if self.user_type == "user":
+        if not self.session.is_admin:
             # Для обычных пользователей скрываем кнопки управления
             self.add_btn.setVisible(False)
             self.edit_btn.setVisible(False)
@@ -139,7 +149,7 @@ class PartnerProductsScreen(QWidget):
         self.setLayout(main_layout)
 
         # Подключаем события только для администраторов
-        if self.user_type == "admin":
+        if self.session.is_admin:
             self.add_btn.clicked.connect(self.add_product)
             self.edit_btn.clicked.connect(self.edit_product)
             self.delete_btn.clicked.connect(self.delete_product)
@@ -147,41 +157,19 @@ class PartnerProductsScreen(QWidget):
         self.back_btn.clicked.connect(self.close)
 
     def load_products(self, search_text=""):
-        try:
-            products = self.db_manager.get_partner_products_by_partner_id(self.partner_inn, search_text)
-            self.products_table.setRowCount(len(products))
-
-            for row, product in enumerate(products):
-                product_name, article_number, product_type, min_price = product
-
-                name_item = QTableWidgetItem(str(product_name) if product_name else "")
-                self.products_table.setItem(row, 0, name_item)
-
-                article_item = QTableWidgetItem(str(article_number) if article_number else "")
-                article_item.setTextAlignment(Qt.AlignCenter)
-                self.products_table.setItem(row, 1, article_item)
-
-                type_item = QTableWidgetItem(str(product_type) if product_type else "")
-                type_item.setTextAlignment(Qt.AlignCenter)
-                self.products_table.setItem(row, 2, type_item)
-
-                if min_price is not None:
-                    try:
-                        if isinstance(min_price, str):
-                            min_price = float(min_price.replace(',', '.'))
-                        else:
-                            min_price = float(min_price)
-                        price_text = "{:,.2f} ₽".format(min_price)
-                        price_item = QTableWidgetItem(price_text)
-                        price_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                    except (ValueError, TypeError):
-                        price_item = QTableWidgetItem(str(min_price))
-                else:
-                    price_item = QTableWidgetItem("")
-                self.products_table.setItem(row, 3, price_item)
+        self.data_version = self.db_manager.get_data_version()
+        self.executor.submit('products', self.db_manager.get_partner_products_by_partner_id,
+                             self.partner_inn, search_text,
+                             on_result=self.products_model.set_rows,
+                             on_error=self.on_load_error)
 
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", "Не удалось загрузить продукцию: {}".format(str(e)))
+    def refresh(self):
+        """Перечитывает продукцию при повторном открытии окна, если данные менялись"""
+        if self.db_manager.get_data_version() != self.data_version:
+            self.load_products(self.search_edit.text().strip())
+
+    def on_load_error(self, message):
+        QMessageBox.critical(self, "Ошибка", "Не удалось загрузить продукцию: {}".format(message))
 
     def on_search_text_changed(self):
         self.search_timer.stop()
@@ -191,22 +179,24 @@ class PartnerProductsScreen(QWidget):
         search_text = self.search_edit.text().strip()
         self.load_products(search_text)
 
+    def get_selected_product(self):
+        index = self.products_table.currentIndex()
+        if not index.isValid():
+            return None
+        return self.products_proxy.row_at(index.row())
+
     def get_selected_product_article(self):
-        current_row = self.products_table.currentRow()
-        if current_row >= 0:
-            article_item = self.products_table.item(current_row, 1)
-            return article_item.text() if article_item else None
-        return None
+        product = self.get_selected_product()
+        return str(product[1]) if product else None
 
     def add_product(self):
         # Дополнительная проверка прав доступа
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен", "У вас нет прав для добавления продукции")
             return
 
         try:
-            from ui.add_product_screen import AddProductScreen
-            self.add_product_window = AddProductScreen(self.partner_inn)
+            self.add_product_window = create_screen('add_product', self.partner_inn)
 
             # Подключаем обновление списка продукции
             def refresh_products():
@@ -223,7 +213,7 @@ class PartnerProductsScreen(QWidget):
 
     def edit_product(self):
         # Дополнительная проверка прав доступа
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен", "У вас нет прав для редактирования продукции")
             return
 
@@ -238,8 +228,7 @@ class PartnerProductsScreen(QWidget):
                 QMessageBox.warning(self, "Ошибка", "Не удалось найти данные продукта")
                 return
 
-            from ui.edit_product_screen import EditProductScreen
-            self.edit_product_window = EditProductScreen(product_data, self.partner_inn)
+            self.edit_product_window = create_screen('edit_product', product_data, self.partner_inn)
             self.edit_product_window.product_updated.connect(self.load_products)
             self.edit_product_window.setWindowTitle("Редактирование продукции")
             self.edit_product_window.setFixedSize(600, 500)
@@ -249,30 +238,21 @@ class PartnerProductsScreen(QWidget):
             QMessageBox.critical(self, "Ошибка", f"Не удалось открыть окно редактирования: {str(e)}")
 
     def get_selected_product_data(self):
-        current_row = self.products_table.currentRow()
-        if current_row >= 0:
-            try:
-                name_item = self.products_table.item(current_row, 0)
-                article_item = self.products_table.item(current_row, 1)
-                type_item = self.products_table.item(current_row, 2)
-                price_item = self.products_table.item(current_row, 3)
-
-                price_text = price_item.text() if price_item else "0"
-                price_clean = price_text.replace("₽", "").replace(" ", "").replace(",", ".")
-
-                return {
-                    'ProductName': name_item.text() if name_item else "",
-                    'ArticleNumber': article_item.text() if article_item else "",
-                    'ProductTypeID': type_item.text() if type_item else "",
-                    'MinPartnerPrice': price_clean
-                }
-            except Exception:
-                return None
-        return None
+        product = self.get_selected_product()
+        if product is None:
+            return None
+
+        product_name, article_number, product_type, min_price = product
+        return {
+            'ProductName': product_name or "",
+            'ArticleNumber': article_number or "",
+            'ProductTypeID': product_type or "",
+            'MinPartnerPrice': min_price if min_price is not None else 0
+        }
 
     def delete_product(self):
         # Дополнительная проверка прав доступа
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен", "У вас нет прав для удаления продукции")
             return
 
@@ -281,11 +261,8 @@ class PartnerProductsScreen(QWidget):
             QMessageBox.warning(self, "Предупреждение", "Выберите продукт для удаления")
             return
 
-        current_row = self.products_table.currentRow()
-        product_name = ""
-        if current_row >= 0:
-            name_item = self.products_table.item(current_row, 0)
-            product_name = name_item.text() if name_item else ""
+        product = self.get_selected_product()
+        product_name = product[0] if product and product[0] else ""
 
         reply = QMessageBox.question(
             self,
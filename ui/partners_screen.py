@@ -1,20 +1,24 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-                             QTableWidgetItem, QPushButton, QLabel, QMessageBox,
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+                             QPushButton, QLabel, QMessageBox,
                              QHeaderView)
 from PyQt5.QtCore import Qt
 from database.db_manager import DatabaseManager
-from ui.add_partner_screen import AddPartnerScreen
-from ui.edit_partner_screen import EditPartnerScreen
-from ui.partner_products_screen import PartnerProductsScreen
-from ui.sales_history_screen import SalesHistoryScreen
+from ui.query_executor import QueryExecutor
+from ui.table_model import Column, RowTableModel, RowFilterProxyModel
+from ui.screens import create_screen
 
 
 class PartnersScreen(QWidget):
-    def __init__(self, user_type="user", username=""):
+    def __init__(self, session, screen_cache=None):
         super().__init__()
-        self.user_type = user_type  # "admin" или "user"
-        self.username = username
+        self.setObjectName("partnersScreen")
+        self.session = session
+        # Кэш экранов главного окна: окна продукции и истории продаж открываются повторно
+        self.screen_cache = screen_cache
         self.db_manager = DatabaseManager()
+        self.data_version = None
+        # Запросы выполняются в фоновых потоках, чтобы не блокировать интерфейс
+        self.executor = QueryExecutor(self)
         self.init_ui()
         self.load_partners()
 
@@ -25,34 +29,11 @@ class PartnersScreen(QWidget):
         title_layout = QVBoxLayout()
         title = QLabel("Партнеры")
         title.setObjectName("title")
-        title.setStyleSheet("""
-            QLabel#title {
-                font-size: 28px;
-                font-weight: bold;
-                color: black;
-                margin-bottom: 10px;
-                padding: 10px 0px;
-            }
-        """)
         title_layout.addWidget(title)
 
         # Показываем тип доступа
-        access_info = QLabel(f"Пользователь: {self.username} ({self.get_access_level_text()})")
+        access_info = QLabel(f"Пользователь: {self.session.username} ({self.session.access_level_text})")
         access_info.setObjectName("accessInfo")
-        access_info.setStyleSheet("""
-            QLabel#accessInfo {
-                font-size: 12px;
-                color: #666;
-                font-style: italic;
-                margin-bottom: 30px;
-                padding: 15px 20px;
-                background-color: #f8f9fa;
-                border: 1px solid #e9ecef;
-                border-radius: 5px;
-                min-height: 40px;
-                line-height: 1.5;
-            }
-        """)
         title_layout.addWidget(access_info)
 
         layout.addLayout(title_layout)
@@ -60,23 +41,44 @@ class PartnersScreen(QWidget):
         # Добавляем дополнительный отступ после информации о пользователе
         layout.addSpacing(20)
 
-        self.partners_table = QTableWidget()
-        self.partners_table.setColumnCount(8)
-        self.partners_table.setHorizontalHeaderLabels([
-            "Тип", "Наименование", "Директор", "Телефон",
-            "Email", "Адрес", "ИНН", "Рейтинг"
-        ])
+        # Строки get_partners_with_discounts(): поля партнера, количество продукции, скидка
+        self.partners_model = RowTableModel([
+            Column("Тип", 0),
+            Column("Наименование", 1),
+            Column("Директор", 2),
+            Column("Телефон", 3),
+            Column("Email", 4),
+            Column("Адрес", 5),
+            Column("ИНН", 6),
+            Column("Рейтинг", 7, alignment=Qt.AlignCenter),
+            Column("Скидка", 9, formatter=lambda value: f"{value}%", alignment=Qt.AlignCenter,
+                   tooltip=lambda row: f"Общее количество: {row[8]:,} шт.".replace(',', ' ')),
+        ], self)
+        self.partners_proxy = RowFilterProxyModel(self.partners_model, self)
+
+        self.partners_table = QTableView()
+        self.partners_table.setModel(self.partners_proxy)
 
         header = self.partners_table.horizontalHeader()
         header.setSectionResizeMode(1, QHeaderView.Stretch)
         header.setSectionResizeMode(2, QHeaderView.Stretch)
         header.setSectionResizeMode(5, QHeaderView.Stretch)
 
-        self.partners_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.partners_table.setSelectionBehavior(QTableView.SelectRows)
+        self.partners_table.setEditTriggers(QTableView.NoEditTriggers)
         self.partners_table.setAlternatingRowColors(True)
+        self.partners_table.setSortingEnabled(True)
+        # Без явного столбца сортировки остается порядок из запроса (по наименованию)
+        self.partners_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
 
         layout.addWidget(self.partners_table)
 
+        self.loading_label = QLabel("Загрузка...")
+        self.loading_label.setObjectName("loadingLabel")
+        self.loading_label.hide()
+        self.executor.busy_changed.connect(self.loading_label.setVisible)
+        layout.addWidget(self.loading_label)
+
         buttons_layout = QHBoxLayout()
 
         # Кнопки, доступные всем пользователям
@@ -91,7 +93,7 @@ class PartnersScreen(QWidget):
         self.delete_btn.setObjectName("deleteBtn")
 
         # Добавляем кнопки в зависимости от типа пользователя
-        if self.user_type == "admin":
+        if self.session.is_admin:
             buttons_layout.addWidget(self.add_btn)
             buttons_layout.addWidget(self.edit_btn)
             buttons_layout.addWidget(self.delete_btn)
@@ -101,30 +103,16 @@ class PartnersScreen(QWidget):
         buttons_layout.addWidget(self.update_btn)
 
         # Если пользователь не админ, показываем информационное сообщение
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             info_label = QLabel("ℹ️ Режим просмотра: доступны только функции просмотра данных")
             info_label.setObjectName("infoLabel")
-            info_label.setStyleSheet("""
-                QLabel#infoLabel {
-                    background-color: #e3f2fd;
-                    border: 1px solid #bbdefb;
-                    border-radius: 5px;
-                    padding: 8px;
-                    color: #1976d2;
-                    font-size: 12px;
-                    margin: 5px;
-                }
-            """)
             layout.addWidget(info_label)
 
         layout.addLayout(buttons_layout)
         self.setLayout(layout)
 
-        # Применяем стили для черного цвета текста кнопок
-        self.apply_button_styles()
-
         # Подключаем события для кнопок, доступных администраторам
-        if self.user_type == "admin":
+        if self.session.is_admin:
             self.add_btn.clicked.connect(self.add_partner)
             self.edit_btn.clicked.connect(self.edit_partner)
             self.delete_btn.clicked.connect(self.delete_partner)
@@ -134,98 +122,31 @@ class PartnersScreen(QWidget):
         self.history_btn.clicked.connect(self.show_history)
         self.update_btn.clicked.connect(self.load_partners)
 
-    def apply_button_styles(self):
-        """Применяет стили с черным цветом текста для всех кнопок"""
-        button_style = """
-            QPushButton {
-                background-color: #f0f0f0;
-                color: black;
-                border: 1px solid #ccc;
-                border-radius: 5px;
-                padding: 8px 16px;
-                font-size: 14px;
-                font-weight: bold;
-                min-width: 80px;
-            }
-
-            QPushButton:hover {
-                background-color: #e0e0e0;
-                border-color: #999;
-                color: black;
-            }
-
-            QPushButton:pressed {
-                background-color: #d0d0d0;
-                color: black;
-            }
-        """
-
-        delete_button_style = """
-            QPushButton#deleteBtn {
-                background-color: #ffebee;
-                color: black;
-                border: 1px solid #f44336;
-                border-radius: 5px;
-                padding: 8px 16px;
-                font-size: 14px;
-                font-weight: bold;
-                min-width: 80px;
-            }
-
-            QPushButton#deleteBtn:hover {
-                background-color: #ffcdd2;
-                border-color: #d32f2f;
-                color: black;
-            }
-
-            QPushButton#deleteBtn:pressed {
-                background-color: #ffb3ba;
-                color: black;
-            }
-        """
-
-        # Применяем стили ко всем кнопкам
-        all_buttons = [self.products_btn, self.history_btn, self.update_btn]
-
-        if self.user_type == "admin":
-            all_buttons.extend([self.add_btn, self.edit_btn])
-
-        for button in all_buttons:
-            button.setStyleSheet(button_style)
-
-        # Отдельный стиль для кнопки удаления
-        if self.user_type == "admin":
-            self.delete_btn.setStyleSheet(delete_button_style)
-
-    def get_access_level_text(self):
-        """Возвращает текстовое описание уровня доступа"""
-        return "Администратор" if self.user_type == "admin" else "Пользователь"
-
     def load_partners(self):
-        try:
-            partners = self.db_manager.get_all_partners()
-            self.partners_table.setRowCount(len(partners))
+        self.data_version = self.db_manager.get_data_version()
+        # Скидка считается в том же запросе, что и список партнеров
+        self.executor.submit('partners', self.db_manager.get_partners_with_discounts,
+                             on_result=self.partners_model.set_rows,
+                             on_error=self.on_load_error)
 
-            for row, partner in enumerate(partners):
-                for col, value in enumerate(partner):
-                    item = QTableWidgetItem(str(value) if value else "")
-                    if col == 7:
-                        item.setTextAlignment(Qt.AlignCenter)
-                    self.partners_table.setItem(row, col, item)
+    def refresh(self):
+        """Перечитывает партнеров при повторном показе, если данные менялись"""
+        if self.db_manager.get_data_version() != self.data_version:
+            self.load_partners()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить данные: {str(e)}")
+    def on_load_error(self, message):
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить данные: {message}")
 
     def get_selected_partner_inn(self):
-        current_row = self.partners_table.currentRow()
-        if current_row >= 0:
-            inn_item = self.partners_table.item(current_row, 6)
-            return inn_item.text() if inn_item else None
+        index = self.partners_table.currentIndex()
+        if index.isValid():
+            partner = self.partners_proxy.row_at(index.row())
+            return str(partner[6]) if partner else None
         return None
 
     def delete_partner(self):
         """Удаление партнера (только для администраторов)"""
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен",
                                 "У вас нет прав для выполнения этого действия")
             return
@@ -243,7 +164,7 @@ class PartnersScreen(QWidget):
             try:
                 if self.db_manager.delete_partner(inn):
                     QMessageBox.information(self, "Успех", "Партнер успешно удален")
-                    self.load_partners()
+                    self.on_partner_changed(inn)
                 else:
                     QMessageBox.warning(self, "Ошибка", "Не удалось удалить партнера")
             except Exception as e:
@@ -251,12 +172,12 @@ class PartnersScreen(QWidget):
 
     def add_partner(self):
         """Добавление партнера (только для администраторов)"""
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен",
                                 "У вас нет прав для выполнения этого действия")
             return
 
-        self.add_partner_window = AddPartnerScreen()
+        self.add_partner_window = create_screen('add_partner')
         self.add_partner_window.partner_added.connect(self.load_partners)
         self.add_partner_window.setWindowTitle("Добавление партнера")
         self.add_partner_window.setFixedSize(800, 600)
@@ -264,7 +185,7 @@ class PartnersScreen(QWidget):
 
     def edit_partner(self):
         """Редактирование партнера (только для администраторов)"""
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен",
                                 "У вас нет прав для выполнения этого действия")
             return
@@ -274,12 +195,24 @@ class PartnersScreen(QWidget):
             QMessageBox.warning(self, "Предупреждение", "Выберите партнера для редактирования")
             return
 
-        self.edit_partner_window = EditPartnerScreen(inn)
-        self.edit_partner_window.partner_updated.connect(self.load_partners)
+        self.edit_partner_window = create_screen('edit_partner', inn)
+        self.edit_partner_window.partner_updated.connect(lambda: self.on_partner_changed(inn))
         self.edit_partner_window.setWindowTitle("Редактирование партнера")
         self.edit_partner_window.setFixedSize(800, 600)
         self.edit_partner_window.show()
 
+    def on_partner_changed(self, inn):
+        """Партнер изменен или удален: его окна из кэша с прежним названием больше не нужны"""
+        if self.screen_cache is not None:
+            self.screen_cache.discard(inn)
+        self.load_partners()
+
+    def open_partner_screen(self, name, inn, partner_name):
+        """Создает экран партнера или берет готовый из кэша главного окна"""
+        if self.screen_cache is None:
+            return create_screen(name, inn, partner_name, self.session)
+        return self.screen_cache.get(name, inn, inn, partner_name, self.session)
+
     def show_products(self):
         """Просмотр продукции партнера (доступно всем)"""
         inn = self.get_selected_partner_inn()
@@ -289,11 +222,13 @@ class PartnersScreen(QWidget):
 
         try:
             partner_name = self.db_manager.get_partner_name_by_inn(inn)
-            # Передаем user_type в конструктор PartnerProductsScreen
-            self.products_window = PartnerProductsScreen(inn, partner_name, self.user_type)
+            # Экран получает сессию, чтобы проверять права пользователя
+            self.products_window = self.open_partner_screen('partner_products', inn, partner_name)
             self.products_window.setWindowTitle(f"Продукция - {partner_name}")
             self.products_window.setFixedSize(1000, 700)
             self.products_window.show()
+            self.products_window.raise_()
+            self.products_window.activateWindow()
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось открыть экран продукции: {str(e)}")
 
@@ -306,10 +241,11 @@ class PartnersScreen(QWidget):
 
         try:
             partner_name = self.db_manager.get_partner_name_by_inn(inn)
-            # Передаем user_type и username в конструктор SalesHistoryScreen
-            self.history_window = SalesHistoryScreen(inn, partner_name, self.user_type, self.username)
+            self.history_window = self.open_partner_screen('sales_history', inn, partner_name)
             self.history_window.setWindowTitle(f"История продаж - {partner_name}")
             self.history_window.setFixedSize(1200, 800)
             self.history_window.show()
+            self.history_window.raise_()
+            self.history_window.activateWindow()
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось открыть экран истории продаж: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,143 @@
+import itertools
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+# Потоков немного: SQLite все равно сериализует запись, а каждому потоку
+# менеджер соединений выделяет свое долгоживущее соединение
+MAX_QUERY_THREADS = 2
+
+_pool = None
+
+
+def get_query_pool():
+    """Возвращает общий пул потоков для запросов к базе данных"""
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(MAX_QUERY_THREADS)
+        # Потоки не завершаются по таймауту: менеджер соединений хранит соединение
+        # по идентификатору потока, и живой поток пула использует его повторно
+        _pool.setExpiryTimeout(-1)
+    return _pool
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, str)
+    progress = pyqtSignal(str, int, object)
+
+
+class _QueryTask(QRunnable):
+    def __init__(self, key, generation, function, args, kwargs):
+        super().__init__()
+        self.key = key
+        self.generation = generation
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.key, self.generation, str(e))
+            return
+        self.signals.finished.emit(self.key, self.generation, result)
+
+
+class QueryExecutor(QObject):
+    """
+    Выполняет вызовы DatabaseManager в пуле потоков и возвращает результат в поток UI.
+    Запросы с одинаковым ключом вытесняют друг друга: результат устаревшего
+    запроса (например, предыдущего поиска) отбрасывается.
+    Долгие операции (импорт, выгрузка) могут сообщать о ходе работы и прерываться.
+    """
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or get_query_pool()
+        self._counter = itertools.count(1)
+        self._generations = {}
+        self._callbacks = {}
+        self._progress_callbacks = {}
+        self._cancel_events = {}
+        self._running = 0
+
+    def submit(self, key, function, *args, on_result=None, on_error=None, on_progress=None,
+               cancellable=False, **kwargs):
+        """
+        Ставит вызов function(*args, **kwargs) в очередь и возвращает его номер поколения.
+        С on_progress функция получает аргумент progress(значение), а значения передаются
+        в on_progress в потоке UI. С cancellable функция получает аргумент cancelled(),
+        который возвращает True после cancel(key).
+        """
+        generation = next(self._counter)
+        self._generations[key] = generation
+        self._callbacks[generation] = (on_result, on_error)
+
+        task = _QueryTask(key, generation, function, args, kwargs)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+
+        if on_progress is not None:
+            self._progress_callbacks[generation] = on_progress
+            task.signals.progress.connect(self._on_progress)
+            signal = task.signals.progress
+            kwargs['progress'] = lambda value: signal.emit(key, generation, value)
+        if cancellable:
+            event = threading.Event()
+            self._cancel_events[generation] = event
+            kwargs['cancelled'] = event.is_set
+
+        self._running += 1
+        if self._running == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(task)
+        return generation
+
+    def invalidate(self, key):
+        """Отбрасывает результат запроса с ключом key, если он еще выполняется"""
+        self._generations.pop(key, None)
+
+    def cancel(self, key):
+        """Просит прервать выполняющийся запрос с ключом key; его результат все равно придет"""
+        event = self._cancel_events.get(self._generations.get(key))
+        if event is not None:
+            event.set()
+
+    def is_current(self, key, generation):
+        return self._generations.get(key) == generation
+
+    @pyqtSlot(str, int, object)
+    def _on_finished(self, key, generation, result):
+        on_result, _ = self._take_callbacks(generation)
+        if self.is_current(key, generation):
+            del self._generations[key]
+            if on_result is not None:
+                on_result(result)
+
+    @pyqtSlot(str, int, str)
+    def _on_failed(self, key, generation, message):
+        _, on_error = self._take_callbacks(generation)
+        if self.is_current(key, generation):
+            del self._generations[key]
+            if on_error is not None:
+                on_error(message)
+
+    @pyqtSlot(str, int, object)
+    def _on_progress(self, key, generation, value):
+        on_progress = self._progress_callbacks.get(generation)
+        if on_progress is not None and self.is_current(key, generation):
+            on_progress(value)
+
+    def _take_callbacks(self, generation):
+        self._progress_callbacks.pop(generation, None)
+        self._cancel_events.pop(generation, None)
+        self._running -= 1
+        if self._running == 0:
+            self.busy_changed.emit(False)
+        return self._callbacks.pop(generation, (None, None))
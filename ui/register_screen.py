@@ -2,7 +2,8 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
                              QLineEdit, QPushButton, QLabel, QMessageBox,
                              QFrame, QComboBox)
 from PyQt5.QtCore import Qt, pyqtSignal
-from database.auth_manager import AuthManager
+from database.auth_service import get_auth_service
+from ui.query_executor import QueryExecutor
 
 
 class RegisterScreen(QWidget):
@@ -10,7 +11,10 @@ class RegisterScreen(QWidget):
 
     def __init__(self):
         super().__init__()
-        self.auth_manager = AuthManager()
+        self.setObjectName("registerScreen")
+        self.auth_service = get_auth_service()
+        # Хеширование пароля выполняется в фоновом потоке
+        self.executor = QueryExecutor(self)
         self.init_ui()
 
     def init_ui(self):
@@ -21,14 +25,7 @@ class RegisterScreen(QWidget):
         # Заголовок
         title_label = QLabel("Регистрация пользователя")
         title_label.setAlignment(Qt.AlignCenter)
-        title_label.setStyleSheet("""
-            QLabel {
-                font-size: 20px;
-                font-weight: bold;
-                color: #606c38;
-                margin-bottom: 20px;
-            }
-        """)
+        title_label.setObjectName("registerTitle")
         main_layout.addWidget(title_label)
 
         # Форма регистрации
@@ -87,85 +84,10 @@ class RegisterScreen(QWidget):
 
         self.setLayout(main_layout)
 
-        # Применяем стили
-        self.apply_styles()
-
         # Подключаем события
         self.register_btn.clicked.connect(self.register_user)
         self.cancel_btn.clicked.connect(self.close)
 
-    def apply_styles(self):
-        """Применяет стили к элементам формы"""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f4f3ee;
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            }
-
-            QLineEdit#registerField, QComboBox#registerField {
-                border: 2px solid #dda15e;
-                border-radius: 6px;
-                padding: 10px;
-                font-size: 14px;
-                background-color: white;
-                min-height: 20px;
-            }
-
-            QLineEdit#registerField:focus, QComboBox#registerField:focus {
-                border-color: #606c38;
-            }
-
-            QComboBox#registerField::drop-down {
-                border: none;
-                width: 25px;
-            }
-
-            QComboBox#registerField::down-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 4px solid #666;
-                margin-right: 8px;
-            }
-
-            QPushButton#primaryBtn {
-                background-color: #606c38;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: 14px;
-                font-weight: bold;
-                padding: 12px 20px;
-                min-height: 20px;
-            }
-
-            QPushButton#primaryBtn:hover {
-                background-color: #4a5228;
-            }
-
-            QPushButton#secondaryBtn {
-                background-color: transparent;
-                color: #606c38;
-                border: 2px solid #606c38;
-                border-radius: 6px;
-                font-size: 14px;
-                font-weight: bold;
-                padding: 10px 20px;
-                min-height: 20px;
-            }
-
-            QPushButton#secondaryBtn:hover {
-                background-color: #606c38;
-                color: white;
-            }
-
-            QLabel {
-                color: #333;
-                font-weight: bold;
-                font-size: 14px;
-            }
-        """)
-
     def validate_fields(self):
         """Валидация полей формы"""
         username = self.username_edit.text().strip()
@@ -216,21 +138,35 @@ class RegisterScreen(QWidget):
         email = self.email_edit.text().strip()
         user_type = "admin" if self.user_type_combo.currentText() == "Администратор" else "user"
 
-        try:
-            success, message = self.auth_manager.register_user(
-                username=username,
-                password=password,
-                user_type=user_type,
-                full_name=full_name,
-                email=email
-            )
-
-            if success:
-                QMessageBox.information(self, "Успех", message)
-                self.user_registered.emit(username)
-                self.close()
-            else:
-                QMessageBox.warning(self, "Ошибка", message)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Непредвиденная ошибка: {str(e)}")
\ No newline at end of file
+        if not self.register_btn.isEnabled():
+            # Предыдущая регистрация еще выполняется
+            return
+
+        self.register_btn.setEnabled(False)
+        self.register_btn.setText("Регистрация...")
+        self.executor.submit('register', self.auth_service.register_user,
+                             username=username,
+                             password=password,
+                             user_type=user_type,
+                             full_name=full_name,
+                             email=email,
+                             on_result=lambda result: self.on_registration_finished(username, result),
+                             on_error=self.on_registration_failed)
+
+    def on_registration_finished(self, username, result):
+        """Результат регистрации из фонового потока: (успех, сообщение)"""
+        self.register_btn.setEnabled(True)
+        self.register_btn.setText("Зарегистрировать")
+
+        success, message = result
+        if success:
+            QMessageBox.information(self, "Успех", message)
+            self.user_registered.emit(username)
+            self.close()
+        else:
+            QMessageBox.warning(self, "Ошибка", message)
+
+    def on_registration_failed(self, message):
+        self.register_btn.setEnabled(True)
+        self.register_btn.setText("Зарегистрировать")
+        QMessageBox.critical(self, "Ошибка", f"Непредвиденная ошибка: {message}")
\ No newline at end of file
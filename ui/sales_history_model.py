@@ -0,0 +1,105 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from database.conversions import format_sale_date
+
+
+class SalesHistoryModel(QAbstractTableModel):
+    """
+    Модель истории продаж. Строки подгружаются страницами по мере прокрутки:
+    fetch_page(after, limit) запрашивает страницу после ключа after, а загруженная
+    страница передается в append_page() (запрос может выполняться в другом потоке).
+    """
+
+    HEADERS = ["Дата продажи", "Наименование продукции", "Количество",
+               "Цена за единицу", "Общая сумма"]
+
+    ALIGNMENTS = {
+        0: Qt.AlignCenter,
+        2: Qt.AlignCenter,
+        3: Qt.AlignRight | Qt.AlignVCenter,
+        4: Qt.AlignRight | Qt.AlignVCenter,
+    }
+
+    def __init__(self, fetch_page, page_size=200, parent=None):
+        super().__init__(parent)
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        # Строки в виде кортежей из базы: (SaleDate, ProductName, Quantity, цена, сумма, SaleID)
+        self._rows = []
+        self._has_more = False
+        self._loading = False
+
+    def reset(self, first_page):
+        """Заменяет содержимое модели первой страницей"""
+        self.beginResetModel()
+        self._rows = list(first_page)
+        self._has_more = len(self._rows) >= self.page_size
+        self._loading = False
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        sale = self._rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            # Текст ячейки формируется только для видимых строк
+            sale_date, product_name, quantity, unit_price, total_price, sale_id = sale
+            if column == 0:
+                return format_sale_date(sale_date)
+            if column == 1:
+                return str(product_name) if product_name else ""
+            if column == 2:
+                return str(quantity) if quantity else "0"
+            if column == 3:
+                return f"{unit_price:.2f} ₽" if unit_price else "0.00 ₽"
+            return f"{total_price:.2f} ₽" if total_price else "0.00 ₽"
+
+        if role == Qt.TextAlignmentRole:
+            return self.ALIGNMENTS.get(column)
+
+        if role == Qt.UserRole:
+            return sale[5]
+
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._rows or self._loading:
+            return
+
+        last = self._rows[-1]
+        self._loading = True
+        self.fetch_page((last[0], last[5]), self.page_size)
+
+    def append_page(self, page):
+        """Добавляет в конец загруженную страницу"""
+        self._loading = False
+        self._has_more = len(page) >= self.page_size
+        if not page:
+            return
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def sale_at(self, row):
+        """Возвращает кортеж продажи по номеру строки или None"""
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
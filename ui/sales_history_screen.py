@@ -1,42 +1,37 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-                             QTableWidgetItem, QPushButton, QLabel, QMessageBox,
-                             QHeaderView, QLineEdit, QFrame)
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+                             QPushButton, QLabel, QMessageBox,
+                             QHeaderView, QLineEdit, QFrame, QCheckBox, QDateEdit)
+from PyQt5.QtCore import Qt, QDate, pyqtSignal
 from database.db_manager import DatabaseManager
-from datetime import datetime
-from ui.add_sale_screen import AddSaleScreen
-from ui.edit_sale_screen import EditSaleScreen
+from database.discounts import tier_range_text
+from ui.query_executor import QueryExecutor
+from ui.sales_history_model import SalesHistoryModel
+from ui.screens import create_screen
+
+
+# Количество продаж, загружаемых за один раз при прокрутке таблицы
+PAGE_SIZE = 200
 
 
 class SalesHistoryScreen(QWidget):
-    def __init__(self, partner_inn, partner_name, user_type="user", username=""):
+    def __init__(self, partner_inn, partner_name, session):
         super().__init__()
+        self.setObjectName("salesHistoryScreen")
         self.partner_inn = partner_inn
         self.partner_name = partner_name
-        self.user_type = user_type  # "admin" или "user"
-        self.username = username
+        self.session = session
         self.db_manager = DatabaseManager()
         self.partner_discount = 0  # Текущая скидка партнера
+        self.search_text = ""
+        self.date_from = None
+        self.date_to = None
+        self.data_version = None
+        # Запросы выполняются в фоновых потоках, чтобы не блокировать интерфейс
+        self.executor = QueryExecutor(self)
+        self.discount_tiers = self.db_manager.get_discount_tiers()
         self.init_ui()
         self.load_sales_history()
 
-    def calculate_partner_discount(self, total_quantity):
-        """
-        Рассчитывает скидку партнера на основе общего количества продукции
-        до 10000 – 0%
-        от 10000 – до 50000 – 5%
-        от 50000 – до 300000 – 10%
-        более 300000 – 15%
-        """
-        if total_quantity < 10000:
-            return 0
-        elif 10000 <= total_quantity < 50000:
-            return 5
-        elif 50000 <= total_quantity < 300000:
-            return 10
-        else:
-            return 15
-
     def init_ui(self):
         layout = QVBoxLayout()
         layout.setSpacing(20)
@@ -53,17 +48,9 @@ class SalesHistoryScreen(QWidget):
         partner_info.setObjectName("partnerInfo")
         partner_info.setAlignment(Qt.AlignCenter)
 
-        user_info = QLabel(f"Пользователь: {self.username} ({self.get_access_level_text()})")
+        user_info = QLabel(f"Пользователь: {self.session.username} ({self.session.access_level_text})")
         user_info.setObjectName("userInfo")
         user_info.setAlignment(Qt.AlignCenter)
-        user_info.setStyleSheet("""
-            QLabel#userInfo {
-                font-size: 12px;
-                color: #666;
-                font-style: italic;
-                margin-bottom: 10px;
-            }
-        """)
 
         info_layout.addWidget(partner_info)
         info_layout.addWidget(user_info)
@@ -78,8 +65,26 @@ class SalesHistoryScreen(QWidget):
         self.search_edit.setObjectName("searchEdit")
         self.search_edit.textChanged.connect(self.on_search_changed)
 
+        # Период отбирается в базе по индексу (PartnerID, SaleDate)
+        self.period_check = QCheckBox("Только за период")
+        self.period_check.setObjectName("periodCheck")
+        self.period_check.toggled.connect(self.on_period_changed)
+
+        self.date_from_edit = QDateEdit(QDate.currentDate().addYears(-1))
+        self.date_to_edit = QDateEdit(QDate.currentDate())
+        for date_edit in (self.date_from_edit, self.date_to_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd.MM.yyyy")
+            date_edit.setEnabled(False)
+            date_edit.dateChanged.connect(self.on_period_changed)
+
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_edit)
+        search_layout.addWidget(self.period_check)
+        search_layout.addWidget(QLabel("с"))
+        search_layout.addWidget(self.date_from_edit)
+        search_layout.addWidget(QLabel("по"))
+        search_layout.addWidget(self.date_to_edit)
         search_layout.addStretch()
         layout.addLayout(search_layout)
 
@@ -106,12 +111,11 @@ class SalesHistoryScreen(QWidget):
         self.stats_frame.setLayout(stats_layout)
         layout.addWidget(self.stats_frame)
 
-        self.sales_table = QTableWidget()
-        self.sales_table.setColumnCount(5)
-        self.sales_table.setHorizontalHeaderLabels([
-            "Дата продажи", "Наименование продукции", "Количество",
-            "Цена за единицу", "Общая сумма"
-        ])
+        # Продажи подгружаются страницами: первая - сразу, остальные - при прокрутке.
+        # Порядок задает база (от новых к старым), поэтому сортировка по столбцам отключена
+        self.sales_model = SalesHistoryModel(self.fetch_sales_page, PAGE_SIZE, self)
+        self.sales_table = QTableView()
+        self.sales_table.setModel(self.sales_model)
 
         header = self.sales_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
@@ -120,16 +124,22 @@ class SalesHistoryScreen(QWidget):
         header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
 
-        self.sales_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.sales_table.setSelectionBehavior(QTableView.SelectRows)
+        self.sales_table.setEditTriggers(QTableView.NoEditTriggers)
         self.sales_table.setAlternatingRowColors(True)
-        self.sales_table.setSortingEnabled(True)
 
         # Двойной клик доступен только для админов
-        if self.user_type == "admin":
+        if self.session.is_admin:
             self.sales_table.doubleClicked.connect(self.edit_sale)
 
         layout.addWidget(self.sales_table)
 
+        self.loading_label = QLabel("Загрузка...")
+        self.loading_label.setObjectName("loadingLabel")
+        self.loading_label.hide()
+        self.executor.busy_changed.connect(self.loading_label.setVisible)
+        layout.addWidget(self.loading_label)
+
         # Добавляем информацию о скидке под таблицей
         discount_frame = QFrame()
         discount_frame.setObjectName("discountFrame")
@@ -138,16 +148,6 @@ class SalesHistoryScreen(QWidget):
 
         self.discount_info_label = QLabel("Скидка партнера: 0% (общее количество: 0 шт.)")
         self.discount_info_label.setObjectName("discountInfoLabel")
-        self.discount_info_label.setStyleSheet("""
-            QLabel {
-                font-size: 14px;
-                font-weight: bold;
-                color: #2c3e50;
-                padding: 10px;
-                background-color: #ecf0f1;
-                border-radius: 5px;
-            }
-        """)
 
         discount_layout.addWidget(self.discount_info_label)
         discount_layout.addStretch()
@@ -155,26 +155,15 @@ class SalesHistoryScreen(QWidget):
         layout.addWidget(discount_frame)
 
         # Если пользователь не админ, показываем информационное сообщение
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             info_label = QLabel("ℹ️ Режим просмотра: редактирование и удаление записей недоступно")
             info_label.setObjectName("infoLabel")
-            info_label.setStyleSheet("""
-                QLabel#infoLabel {
-                    background-color: #e3f2fd;
-                    border: 1px solid #bbdefb;
-                    border-radius: 5px;
-                    padding: 8px;
-                    color: #1976d2;
-                    font-size: 12px;
-                    margin: 5px 0;
-                }
-            """)
             layout.addWidget(info_label)
 
         buttons_layout = QHBoxLayout()
 
         # Кнопки, доступные только администраторам
-        if self.user_type == "admin":
+        if self.session.is_admin:
             self.add_btn = QPushButton("Добавить")
             self.edit_btn = QPushButton("Изменить")
             self.delete_btn = QPushButton("Удалить")
@@ -192,152 +181,73 @@ class SalesHistoryScreen(QWidget):
             self.edit_btn.clicked.connect(self.edit_sale)
             self.delete_btn.clicked.connect(self.delete_sale)
 
-        # Кнопка "Назад" доступна всем
+        # Кнопки "Экспорт" и "Назад" доступны всем
+        self.export_btn = QPushButton("Экспорт")
+        self.export_btn.setObjectName("exportBtn")
+        self.export_btn.clicked.connect(self.export_sales)
+
         self.back_btn = QPushButton("Назад")
         self.back_btn.setObjectName("backBtn")
 
+        buttons_layout.addWidget(self.export_btn)
         buttons_layout.addStretch()
         buttons_layout.addWidget(self.back_btn)
 
         layout.addLayout(buttons_layout)
         self.setLayout(layout)
 
-        # Применяем стили для кнопок
-        self.apply_button_styles()
-
         # Подключаем событие для кнопки "Назад"
         self.back_btn.clicked.connect(self.close)
 
-    def apply_button_styles(self):
-        """Применяет стили для кнопок"""
-        button_style = """
-            QPushButton {
-                background-color: #f0f0f0;
-                color: black;
-                border: 1px solid #ccc;
-                border-radius: 5px;
-                padding: 8px 16px;
-                font-size: 14px;
-                font-weight: bold;
-                min-width: 80px;
-            }
-
-            QPushButton:hover {
-                background-color: #e0e0e0;
-                border-color: #999;
-                color: black;
-            }
-
-            QPushButton:pressed {
-                background-color: #d0d0d0;
-                color: black;
-            }
-        """
-
-        delete_button_style = """
-            QPushButton#deleteBtn {
-                background-color: #ffebee;
-                color: black;
-                border: 1px solid #f44336;
-                border-radius: 5px;
-                padding: 8px 16px;
-                font-size: 14px;
-                font-weight: bold;
-                min-width: 80px;
-            }
-
-            QPushButton#deleteBtn:hover {
-                background-color: #ffcdd2;
-                border-color: #d32f2f;
-                color: black;
-            }
-
-            QPushButton#deleteBtn:pressed {
-                background-color: #ffb3ba;
-                color: black;
-            }
-        """
-
-        # Применяем стили ко всем кнопкам
-        all_buttons = [self.back_btn]
-
-        if self.user_type == "admin":
-            all_buttons.extend([self.add_btn, self.edit_btn])
-
-        for button in all_buttons:
-            button.setStyleSheet(button_style)
-
-        # Отдельный стиль для кнопки удаления
-        if self.user_type == "admin":
-            self.delete_btn.setStyleSheet(delete_button_style)
-
-    def get_access_level_text(self):
-        """Возвращает текстовое описание уровня доступа"""
-        return "Администратор" if self.user_type == "admin" else "Пользователь"
-
     def load_sales_history(self, search_text=""):
+        # Строки и итоги партнера читаются одним снимком и используются всеми надписями
+        self.search_text = search_text
+        # Следующие страницы запрашиваются с тем же периодом, что и первая
+        self.date_from, self.date_to = self.date_range()
+        self.data_version = self.db_manager.get_data_version()
+        # Страница, запрошенная для прежнего поиска, больше не нужна
+        self.executor.invalidate('page')
+        self.executor.submit('history', self.db_manager.get_sales_history_snapshot,
+                             self.partner_inn, search_text, self.date_from, self.date_to, limit=PAGE_SIZE,
+                             on_result=self.on_history_loaded,
+                             on_error=self.on_load_error)
+
+    def refresh(self):
+        """Перечитывает историю при повторном открытии окна, если продажи менялись"""
+        if self.db_manager.get_data_version() != self.data_version:
+            self.load_sales_history(self.search_text)
+
+    def on_history_loaded(self, snapshot):
+        stats = snapshot['statistics']
+        self.sales_model.reset(snapshot['sales'])
+
+        self.partner_discount = stats['discount'] if stats else 0
+
+        # Обновляем информацию о скидке под таблицей
+        self.update_discount_info(stats)
+        self.update_statistics(stats)
+
+    def on_load_error(self, message):
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить историю продаж: {message}")
+
+    def fetch_sales_page(self, after, limit):
+        """Запрашивает следующую страницу продаж для модели таблицы"""
+        self.executor.submit('page', self.db_manager.get_partner_sales_page,
+                             self.partner_inn, self.search_text, after=after, limit=limit,
+                             date_from=self.date_from, date_to=self.date_to,
+                             on_result=self.sales_model.append_page,
+                             on_error=self.on_page_error)
+
+    def on_page_error(self, message):
+        # Прекращаем подгрузку, чтобы не повторять ошибочный запрос при каждой прокрутке
+        self.sales_model.append_page([])
+        self.on_load_error(message)
+
+    def update_statistics(self, stats):
         try:
-            sales = self.db_manager.get_partner_sales_history(self.partner_inn, search_text)
-            self.sales_table.setRowCount(len(sales))
-            total_sum = 0
-
-            # Получаем статистику для расчета скидки
-            stats = self.db_manager.get_sales_statistics(self.partner_inn)
-            total_quantity = stats['total_quantity'] if stats else 0
-            self.partner_discount = self.calculate_partner_discount(total_quantity)
-
-            for row, sale in enumerate(sales):
-                sale_date, product_name, quantity, unit_price, total_price, sale_id = sale
-
-                if isinstance(sale_date, str):
-                    for fmt in ['%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y']:
-                        try:
-                            date_obj = datetime.strptime(sale_date, fmt)
-                            formatted_date = date_obj.strftime('%d.%m.%Y')
-                            break
-                        except:
-                            continue
-                    else:
-                        formatted_date = sale_date
-                else:
-                    formatted_date = sale_date.strftime('%d.%m.%Y') if sale_date else ""
-
-                items = [
-                    QTableWidgetItem(formatted_date),
-                    QTableWidgetItem(str(product_name) if product_name else ""),
-                    QTableWidgetItem(str(quantity) if quantity else "0"),
-                    QTableWidgetItem(f"{float(str(unit_price).replace(',', '.')):.2f} ₽" if unit_price else "0.00 ₽"),
-                    QTableWidgetItem(f"{float(total_price):.2f} ₽" if total_price else "0.00 ₽")
-                ]
-
-                items[0].setTextAlignment(Qt.AlignCenter)
-                items[2].setTextAlignment(Qt.AlignCenter)
-                items[3].setTextAlignment(Qt.AlignRight)
-                items[4].setTextAlignment(Qt.AlignRight)
-
-                for item in items:
-                    item.setData(Qt.UserRole, sale_id)
-
-                for col, item in enumerate(items):
-                    self.sales_table.setItem(row, col, item)
-
-                if total_price:
-                    total_sum += float(total_price)
-
-            # Обновляем информацию о скидке под таблицей
-            self.update_discount_info()
-            self.update_statistics()
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить историю продаж: {str(e)}")
-
-    def update_statistics(self):
-        try:
-            stats = self.db_manager.get_sales_statistics(self.partner_inn)
-
             if stats:
                 total_quantity = stats['total_quantity']
-                discount = self.calculate_partner_discount(total_quantity)
+                discount = stats['discount']
 
                 self.total_sales_label.setText(f"Всего продаж: {stats['total_sales']}")
                 self.total_quantity_label.setText(f"Общее количество: {total_quantity}")
@@ -352,74 +262,73 @@ class SalesHistoryScreen(QWidget):
         except Exception as e:
             pass
 
-    def update_discount_info(self):
+    def update_discount_info(self, stats):
         """Обновляет информацию о скидке под таблицей"""
         try:
-            stats = self.db_manager.get_sales_statistics(self.partner_inn)
-
             if stats:
                 total_quantity = stats['total_quantity']
-                discount = self.calculate_partner_discount(total_quantity)
+                discount = stats['discount']
 
                 # Определяем диапазон для текущей скидки
-                if total_quantity < 10000:
-                    range_text = "до 10 000"
-                elif 10000 <= total_quantity < 50000:
-                    range_text = "от 10 000 до 50 000"
-                elif 50000 <= total_quantity < 300000:
-                    range_text = "от 50 000 до 300 000"
-                else:
-                    range_text = "свыше 300 000"
+                range_text = tier_range_text(self.discount_tiers, total_quantity)
 
                 self.discount_info_label.setText(
                     f"Скидка партнера: {discount}% "
                     f"(общее количество: {total_quantity:,} шт., диапазон: {range_text})"
                 )
             else:
-                self.discount_info_label.setText("Скидка партнера: 0% (общее количество: 0 шт., диапазон: до 10 000)")
+                self.discount_info_label.setText(
+                    f"Скидка партнера: 0% (общее количество: 0 шт., "
+                    f"диапазон: {tier_range_text(self.discount_tiers, 0)})"
+                )
 
         except Exception as e:
             self.discount_info_label.setText("Скидка партнера: 0% (ошибка расчета)")
 
+    def date_range(self):
+        """Границы периода 'yyyy-mm-dd' (включительно) или (None, None), если период не задан"""
+        if not self.period_check.isChecked():
+            return None, None
+        return (self.date_from_edit.date().toString(Qt.ISODate),
+                self.date_to_edit.date().toString(Qt.ISODate))
+
+    def on_period_changed(self):
+        use_period = self.period_check.isChecked()
+        self.date_from_edit.setEnabled(use_period)
+        self.date_to_edit.setEnabled(use_period)
+        if (self.date_from, self.date_to) != self.date_range():
+            self.load_sales_history(self.search_text)
+
     def on_search_changed(self):
         search_text = self.search_edit.text().strip()
         self.load_sales_history(search_text)
 
-    def get_selected_sale_id(self):
-        current_row = self.sales_table.currentRow()
-        if current_row < 0:
+    def get_selected_sale(self):
+        index = self.sales_table.currentIndex()
+        if not index.isValid():
             return None
+        return self.sales_model.sale_at(index.row())
 
-        for col in range(self.sales_table.columnCount()):
-            item = self.sales_table.item(current_row, col)
-            if item:
-                sale_id = item.data(Qt.UserRole)
-                if sale_id is not None:
-                    return sale_id
-
-        return None
+    def get_selected_sale_id(self):
+        sale = self.get_selected_sale()
+        return sale[5] if sale else None
 
     def get_selected_sale_info(self):
-        current_row = self.sales_table.currentRow()
-        if current_row < 0:
+        sale = self.get_selected_sale()
+        if sale is None:
             return None, None, None, None, None
 
-        date_item = self.sales_table.item(current_row, 0)
-        product_item = self.sales_table.item(current_row, 1)
-        quantity_item = self.sales_table.item(current_row, 2)
-        sum_item = self.sales_table.item(current_row, 4)
+        row = self.sales_table.currentIndex().row()
+        date_text = self.sales_model.index(row, 0).data()
+        product_text = self.sales_model.index(row, 1).data()
+        quantity_text = self.sales_model.index(row, 2).data()
+        sum_text = self.sales_model.index(row, 4).data()
 
-        date_text = date_item.text() if date_item else "неизвестно"
-        product_text = product_item.text() if product_item else "неизвестно"
-        quantity_text = quantity_item.text() if quantity_item else "неизвестно"
-        sum_text = sum_item.text() if sum_item else "неизвестно"
-        sale_id = self.get_selected_sale_id()
-
-        return sale_id, date_text, product_text, quantity_text, sum_text
+        return sale[5], date_text, product_text, quantity_text, sum_text
 
     def edit_sale(self):
         """Редактирование продажи (только для администраторов)"""
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен",
                                 "У вас нет прав для выполнения этого действия")
             return
@@ -433,7 +342,7 @@ class SalesHistoryScreen(QWidget):
             return
 
         try:
-            self.edit_sale_window = EditSaleScreen(self.partner_inn, self.partner_name, sale_id)
+            self.edit_sale_window = create_screen('edit_sale', self.partner_inn, self.partner_name, sale_id)
             self.edit_sale_window.sale_updated.connect(lambda: self.load_sales_history(self.search_edit.text().strip()))
             self.edit_sale_window.setWindowTitle(f"Редактирование продажи - {product_text} от {date_text}")
             self.edit_sale_window.setFixedSize(500, 450)
@@ -444,7 +353,7 @@ class SalesHistoryScreen(QWidget):
 
     def delete_sale(self):
         """Удаление продажи (только для администраторов)"""
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен",
                                 "У вас нет прав для выполнения этого действия")
             return
@@ -478,15 +387,19 @@ class SalesHistoryScreen(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", f"Ошибка при удалении продажи: {str(e)}")
 
+    def export_sales(self):
+        """Выгрузка продаж партнера в CSV/XLSX"""
+        create_screen('export', self, self.executor, self.db_manager, self.partner_inn, self.partner_name)
+
     def add_sale(self):
         """Добавление продажи (только для администраторов)"""
-        if self.user_type != "admin":
+        if not self.session.is_admin:
             QMessageBox.warning(self, "Доступ запрещен",
                                 "У вас нет прав для выполнения этого действия")
             return
 
         try:
-            self.add_sale_window = AddSaleScreen(self.partner_inn, self.partner_name)
+            self.add_sale_window = create_screen('add_sale', self.partner_inn, self.partner_name)
             self.add_sale_window.sale_added.connect(lambda: self.load_sales_history(self.search_edit.text().strip()))
             self.add_sale_window.setWindowTitle(f"Добавление продажи - {self.partner_name}")
             self.add_sale_window.setFixedSize(500, 400)
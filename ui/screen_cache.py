@@ -0,0 +1,114 @@
+import os
+import sys
+from collections import OrderedDict
+from PyQt5.QtCore import QAbstractItemModel
+from PyQt5.QtWidgets import QWidget
+from ui.screens import create_screen
+
+
+# Число экранов, которые остаются в памяти после закрытия
+# (переменная окружения MASTERPOL_SCREEN_CACHE)
+SCREEN_CACHE_ENV = 'MASTERPOL_SCREEN_CACHE'
+DEFAULT_MAX_SCREENS = 8
+
+
+def _row_bytes(rows):
+    """Примерный объем строк модели в памяти Python: кортежи и их значения"""
+    return sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows)
+
+
+class ScreenCache:
+    """
+    LRU-кэш экранов по ключу (имя экрана, ИНН партнера). Повторно открытый экран
+    не создается заново: у него вызывается refresh(), который перечитывает данные,
+    только если они менялись. Видимые экраны не вытесняются.
+    """
+
+    def __init__(self, max_size=None):
+        if max_size is None:
+            try:
+                max_size = int(os.environ.get(SCREEN_CACHE_ENV, DEFAULT_MAX_SCREENS))
+            except ValueError:
+                max_size = DEFAULT_MAX_SCREENS
+        self.max_size = max(1, max_size)
+        self._screens = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name, partner_inn, *args, **kwargs):
+        """
+        Возвращает экран name для партнера partner_inn (None - экран без партнера).
+        Новый экран создается через create_screen(name, *args, **kwargs).
+        """
+        key = (name, partner_inn)
+        screen = self._screens.get(key)
+        if screen is not None:
+            self._screens.move_to_end(key)
+            self.hits += 1
+            refresh = getattr(screen, 'refresh', None)
+            if refresh is not None:
+                refresh()
+            return screen
+
+        self.misses += 1
+        screen = create_screen(name, *args, **kwargs)
+        # Новый экран еще не показан: вытеснение выбирает только среди прежних
+        self._evict(self.max_size - 1)
+        self._screens[key] = screen
+        return screen
+
+    def _evict(self, limit):
+        for key in list(self._screens):
+            if len(self._screens) <= limit:
+                break
+            screen = self._screens[key]
+            if screen.isVisible():
+                continue
+            del self._screens[key]
+            self.evictions += 1
+            self._dispose(screen)
+
+    def _dispose(self, screen):
+        screen.close()
+        screen.deleteLater()
+
+    def discard(self, partner_inn):
+        """Удаляет экраны партнера (после изменения или удаления партнера)"""
+        for key in [key for key in self._screens if key[1] == partner_inn]:
+            self._dispose(self._screens.pop(key))
+
+    def clear(self):
+        """Закрывает и удаляет все экраны (при выходе из системы)"""
+        screens = list(self._screens.values())
+        self._screens.clear()
+        for screen in screens:
+            self._dispose(screen)
+
+    def memory_report(self):
+        """
+        Строки отчета: для каждого экрана число виджетов, строк в моделях и
+        примерный объем этих строк. По нему подбирается MASTERPOL_SCREEN_CACHE.
+        """
+        lines = [f"Кэш экранов: {len(self._screens)} из {self.max_size}, попаданий {self.hits}, "
+                 f"промахов {self.misses}, вытеснено {self.evictions}"]
+        total_bytes = 0
+        for (name, partner_inn), screen in reversed(self._screens.items()):
+            widgets = len(screen.findChildren(QWidget))
+            rows = 0
+            size = 0
+            for model in screen.findChildren(QAbstractItemModel):
+                # Строки из базы хранят модели RowTableModel и SalesHistoryModel
+                model_rows = getattr(model, '_rows', None)
+                if model_rows is not None:
+                    rows += len(model_rows)
+                    size += _row_bytes(model_rows)
+            total_bytes += size
+            state = "открыт" if screen.isVisible() else "скрыт"
+            lines.append(f"  {name:<18} {partner_inn or '':<12} {state:<7} виджетов {widgets:>4}, "
+                         f"строк {rows:>6}, данные {size / 1024:>8.1f} КБ")
+        lines.append(f"  Всего данных в моделях: {total_bytes / 1024:.1f} КБ")
+        return lines
+
+    def __len__(self):
+        return len(self._screens)
@@ -0,0 +1,52 @@
+import importlib
+import sys
+import time
+
+
+# Экраны и диалоги загружаются при первом открытии, а не при запуске приложения:
+# имя экрана -> (модуль, класс или функция)
+SCREENS = {
+    'auth': ('ui.auth_screen', 'AuthScreen'),
+    'register': ('ui.register_screen', 'RegisterScreen'),
+    'main_window': ('ui.main_window', 'MainWindow'),
+    'partners': ('ui.partners_screen', 'PartnersScreen'),
+    'add_partner': ('ui.add_partner_screen', 'AddPartnerScreen'),
+    'edit_partner': ('ui.edit_partner_screen', 'EditPartnerScreen'),
+    'partner_products': ('ui.partner_products_screen', 'PartnerProductsScreen'),
+    'add_product': ('ui.add_product_screen', 'AddProductScreen'),
+    'edit_product': ('ui.edit_product_screen', 'EditProductScreen'),
+    'sales_history': ('ui.sales_history_screen', 'SalesHistoryScreen'),
+    'add_sale': ('ui.add_sale_screen', 'AddSaleScreen'),
+    'edit_sale': ('ui.edit_sale_screen', 'EditSaleScreen'),
+    'export': ('ui.export_dialog', 'run_export'),
+    'diagnostics': ('ui.diagnostics_dialog', 'DiagnosticsDialog'),
+}
+
+_loaded = {}
+
+# Время первой загрузки каждого экрана, с (для --profile-startup)
+load_times = {}
+
+
+def screen_class(name):
+    """Возвращает класс экрана, импортируя его модуль при первом обращении"""
+    screen = _loaded.get(name)
+    if screen is None:
+        module_name, attribute = SCREENS[name]
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        load_times[name] = time.perf_counter() - started
+        screen = _loaded[name] = getattr(module, attribute)
+    return screen
+
+
+def create_screen(name, *args, **kwargs):
+    """Создает экран по имени: create_screen('partners', session)"""
+    return screen_class(name)(*args, **kwargs)
+
+
+def is_screen(widget, name):
+    """Проверяет тип экрана, не загружая его модуль: незагруженного экрана на форме нет"""
+    module_name, attribute = SCREENS[name]
+    module = sys.modules.get(module_name)
+    return module is not None and isinstance(widget, getattr(module, attribute))
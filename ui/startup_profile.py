@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """
+    Замер запуска приложения (--profile-startup): время импортов и шагов
+    инициализации до первой отрисовки окна входа. Без флага ничего не замеряет.
+    """
+
+    def __init__(self, enabled, started=None):
+        self.enabled = enabled
+        self.started = started if started is not None else time.perf_counter()
+        self.steps = []
+        self._first_paint = None
+
+    @contextmanager
+    def step(self, title):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((title, time.perf_counter() - started))
+
+    def watch_first_paint(self, widget):
+        """Печатает отчет после первой отрисовки widget"""
+        if not self.enabled:
+            return
+        from PyQt5.QtCore import QObject, QEvent, QTimer
+
+        profile = self
+
+        class FirstPaintFilter(QObject):
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Paint and profile._first_paint is None:
+                    profile._first_paint = time.perf_counter()
+                    watched.removeEventFilter(self)
+                    # Отчет - после того, как отрисовка завершится
+                    QTimer.singleShot(0, profile.print_report)
+                return False
+
+        self._paint_filter = FirstPaintFilter()
+        widget.installEventFilter(self._paint_filter)
+
+    def report_lines(self):
+        from ui import screens
+
+        lines = ["Профиль запуска, мс:"]
+        for title, seconds in self.steps:
+            lines.append(f"  {title:<40} {seconds * 1000:>8.1f}")
+        for name, seconds in screens.load_times.items():
+            lines.append(f"  {'  загрузка экрана ' + name:<40} {seconds * 1000:>8.1f}")
+        if self._first_paint is not None:
+            lines.append(f"  {'Первая отрисовка окна входа':<40} {(self._first_paint - self.started) * 1000:>8.1f}")
+        lines.append(f"  Загружено модулей: {len(sys.modules)}, "
+                     f"из них PyQt5: {sum(name.startswith('PyQt5') for name in sys.modules)}")
+        return lines
+
+    def print_report(self):
+        report = '\n'.join(self.report_lines())
+        if sys.stderr is not None:
+            print(report, file=sys.stderr)
+            return
+        # У собранного exe без консоли отчет сохраняется рядом с программой
+        path = os.path.join(os.path.dirname(sys.executable), 'startup_profile.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(report + '\n')
@@ -0,0 +1,88 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+
+class Column:
+    """Описание столбца таблицы: заголовок, индекс поля в строке и форматирование"""
+
+    def __init__(self, title, field, formatter=None, alignment=None, tooltip=None):
+        self.title = title
+        self.field = field
+        self.formatter = formatter  # formatter(значение) -> текст ячейки
+        self.alignment = alignment
+        self.tooltip = tooltip  # tooltip(строка) -> текст подсказки
+
+    def format(self, value):
+        if self.formatter is not None:
+            return self.formatter(value)
+        return "" if value is None else str(value)
+
+
+class RowTableModel(QAbstractTableModel):
+    """
+    Модель только для чтения над результатом запроса. Строки хранятся как есть,
+    кортежами из базы, а текст ячеек формируется в data() только для видимых строк.
+    """
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self._rows = []
+
+    def set_rows(self, rows):
+        """Заменяет все строки модели"""
+        self.beginResetModel()
+        self._rows = rows if isinstance(rows, list) else list(rows)
+        self.endResetModel()
+
+    def row_at(self, row):
+        """Возвращает исходный кортеж строки или None"""
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].title
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self._rows[index.row()]
+        column = self.columns[index.column()]
+
+        if role == Qt.DisplayRole:
+            return column.format(row[column.field])
+        if role == Qt.UserRole:
+            # Исходное значение используется для сортировки
+            return row[column.field]
+        if role == Qt.TextAlignmentRole:
+            return column.alignment
+        if role == Qt.ToolTipRole and column.tooltip is not None:
+            return column.tooltip(row)
+        return None
+
+
+class RowFilterProxyModel(QSortFilterProxyModel):
+    """Сортировка по исходным значениям и фильтр по тексту всех столбцов"""
+
+    def __init__(self, source_model, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source_model)
+        self.setSortRole(Qt.UserRole)
+        self.setFilterKeyColumn(-1)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+    def row_at(self, proxy_row):
+        """Возвращает исходный кортеж строки по номеру строки в представлении"""
+        source_index = self.mapToSource(self.index(proxy_row, 0))
+        if not source_index.isValid():
+            return None
+        return self.sourceModel().row_at(source_index.row())